@@ -1,18 +1,17 @@
 import ctypes
 import json
 import os
-import shutil
 import sys
 import threading
 import time
 from email.utils import parsedate_to_datetime  # WebView2 hands back RFC-date expiry strings
 from http.cookies import SimpleCookie
 from pathlib import Path
+from typing import Literal
 
-import webview
-from pinterest_dl import PinterestMedia
-
-from core import events
+from core import events, history, metrics, runner, startup, tracing
+from core.log_buffer import LogBuffer, SummaryPusher
+from core.session_pool import SessionPool
 from core.scrape_config import ScrapeConfig
 
 
@@ -34,20 +33,63 @@ class Api:
         self._window = None  # set by app.py on create_window
         self._stop = threading.Event()  # cooperative cancel flag, checked in both phase loops
         self._thread: threading.Thread | None = None  # the active run thread, or None when idle
+        self._history = history.HistoryStore(history.default_path())
+        self._sessions = SessionPool()  # HTTP connections kept warm across runs
+        self._logs = LogBuffer()  # the active run's console lines, paged in via get_logs
+        self._log_summary = SummaryPusher(self._push_log_summary)
+        self._phase: str | None = None  # tags log lines for the console's OK/SYS badge
+        port = metrics.env_port()
+        if port is not None:
+            try:
+                metrics.serve(port)  # PDL_METRICS: no UI for it, like PDL_TRACE
+            except OSError as e:  # port taken or privileged: diagnostics never block startup
+                if sys.stderr is not None:  # the windowed build has no console
+                    print(f"[warn] Metrics disabled: port {port}: {e}", file=sys.stderr)
 
     def set_window(self, window) -> None:
         """Receive the window handle so the run thread can push events into JS."""
         self._window = window
 
     def _emit(self, event: events.Event) -> None:
-        """Push one RunEvent into the frontend. Runs on the background thread."""
+        """Route one RunEvent to the frontend. Runs on the background thread.
+
+        Log lines are not pushed one by one: they go into the ring buffer and the
+        console hears about them through a rate-capped `logs` summary, then fetches the
+        rows it shows. A terminal event flushes that summary first, so the run's last
+        lines are in place when it ends.
+        """
+        with metrics.EMIT.time():
+            self._route(event)
+
+    def _route(self, event: events.Event) -> None:
+        kind = event["type"]
+        if kind == "progress":
+            self._phase = event["phase"]
+        elif kind == "log":
+            self._logs.append(event["level"], event["message"], self._phase)
+            self._log_summary.notify()
+            return
+        elif kind in ("done", "error"):
+            if kind == "error":
+                self._logs.append("error", event["message"])
+            self._phase = None
+            self._logs.flush()
+            self._log_summary.flush()
+        self._push(event)
+
+    def _push_log_summary(self) -> None:
+        self._push(events.log_summary(**self._logs.summary()))
+
+    def _push(self, event: events.Event) -> None:
+        """Push one event into the frontend."""
         if self._window is None:
             return
         # Double-encode: inner dumps -> a JSON string; outer dumps -> a safe JS string
         # literal, so log text with quotes/newlines can't break the evaluate_js call.
         payload = json.dumps(json.dumps(event))
         try:
-            self._window.evaluate_js(f"window.__pdl_emit({payload})")
+            with tracing.span("evaluate_js", "bridge", type=event["type"]):
+                self._window.evaluate_js(f"window.__pdl_emit({payload})")
         except Exception:
             # the only known case is "WebView has been destroyed",
             # which can happen if the run thread is still winding down while the user closes the app
@@ -55,252 +97,41 @@ class Api:
 
     def start_run(self, config: dict) -> dict:
         """Validate a run request and launch it on a daemon thread. Returns immediately."""
-        mode = str(config.get("mode", "scrape"))
-        save_cache = bool(config.get("save_cache", False))
-        skip_download = bool(config.get("skip_download", False))
-
-        url = str(config.get("url", "")).strip()
-        if not url:
-            label = {"download": "A cache JSON file", "search": "A search query"}.get(
-                mode, "Source URL"
-            )
-            self._emit(events.error(f"{label} is required."))
-            return {"success": False}
-
-        if mode == "download" and not Path(url).is_file():
-            self._emit(events.error(f"Cache file not found: {url}"))
-            return {"success": False}
-
-        # Metadata-only only applies when scraping; download mode ignores both flags.
-        if mode != "download" and skip_download and not save_cache:  # would produce nothing
-            self._emit(events.error("Skip download requires Save metadata cache to be enabled."))
-            return {"success": False}
-
         if self._thread is not None and self._thread.is_alive():  # ensure single run at a time.
             self._emit(events.error("A run is already in progress. Please wait for it to finish."))
             return {"success": False}
 
-        res_w, res_h = config["min_resolution"]  # JS sends [w, h]; unpack asserts length 2 at runt
-
-        # Cap concurrency at the boundary so a bad/forged payload can't spawn a thread storm
-        # (and going past the shared HTTP pool size of 10 only churns connections anyway).
-        max_workers = max(1, min(16, int(config.get("max_workers", 8))))
-
-        scrape_config = ScrapeConfig(
-            url=url,
-            mode=mode,
-            num=int(config["num"]),
-            output_dir=str(config["output_dir"]),
-            min_resolution=(int(res_w), int(res_h)),
-            delay=float(config["delay"]),
-            timeout=float(config.get("timeout", 10.0)),
-            max_workers=max_workers,
-            cookies=(str(config.get("cookies", "")).strip() or None),
-            ensure_alt=bool(config.get("ensure_alt", False)),
-            ffmpeg_path=(str(config.get("ffmpeg_path", "")).strip() or None),
-            download_streams=bool(config["download_streams"]),
-            skip_remux=bool(config.get("skip_remux", False)),
-            caption_from_title=bool(config.get("caption_from_title", False)),
-            caption=str(config.get("caption", "none")),
-            save_cache=save_cache,
-            cache_path=(str(config.get("cache_path", "")).strip() or None),
-            skip_download=skip_download,
-        )
+        self._logs.reset()  # the console starts empty for each run, as the frontend does
+        self._phase = None
+        try:
+            scrape_config = ScrapeConfig.from_payload(config)
+        except ValueError as e:
+            self._emit(events.error(str(e)))
+            return {"success": False}
 
         self._stop.clear()  # reset any leftover cancel from a previous run
         self._thread = threading.Thread(target=self._run, args=(scrape_config,), daemon=True)
         self._thread.start()
         return {"success": True}
 
+    def get_logs(self, offset: int = 0, limit: int = 200, level: str | None = None) -> dict:
+        """A page of the current run's console lines; see LogBuffer.get for positions."""
+        return self._logs.get(int(offset), max(1, min(int(limit), 500)), level)
+
     def terminate(self) -> None:
         """Signal the active run to stop, if any. The run thread will check this between items."""
         self._stop.set()
 
     def _run(self, config: ScrapeConfig) -> None:
-        """Execute one run on the background thread, emitting events.
-
-        Two shapes: download mode loads media from a cache JSON and downloads it;
-        scrape/search mode scrapes Pinterest, optionally saves a cache JSON, and
-        optionally stops there (metadata only) instead of downloading.
-        """
-        from pinterest_dl import PinterestDL
-        from pinterest_dl.download import USER_AGENT, MediaDownloader
-
-        from core.downloader import (
-            apply_captions,
-            load_cache,
-            resolve_cache_path,
-            run_api_scrape,
-            run_api_search,
-            run_download,
-            save_cache,
-            thumbnail_data_uri,
-        )
-
-        self._emit(events.log("info", f"Starting run in '{config.mode}' mode..."))
-        # Initialized up front so the cancel/except paths can report partial counts even if
-        # never reach the download phase (media_list may not exists there)
-        scraped = 0
-        downloaded = 0
-        videos = 0
-        failed = 0
-        saved = 0
+        """Execute one run on the background thread, emitting events into the window."""
         try:
-            with events.forward_logs(self._emit):
-                downloader = MediaDownloader(
-                    user_agent=USER_AGENT, timeout=config.timeout, max_retries=3
-                )
-
-                # === acquire media: load a cache file, or scrape Pinterest ===
-                if config.mode == "download":
-                    if self._stop.is_set():
-                        raise events.RunCancelled()
-                    self._emit(events.log("info", f"Loading cache file: {config.url}"))
-                    media_list = load_cache(Path(config.url))
-                    scraped = len(media_list)
-                    if scraped == 0:
-                        self._emit(events.log("warn", "Cache file contains no records."))
-                    else:
-                        self._emit(events.log("info", f"Loaded {scraped} records from cache."))
-                else:
-                    scraper = PinterestDL.with_api(
-                        timeout=config.timeout, ensure_alt=config.ensure_alt
-                    )
-                    # Cookies are optional; required only for private boards. Bad path/format
-                    # raises here and surfaces as a run error rather than failing silently.
-                    if config.cookies:
-                        scraper.with_cookies_path(config.cookies)
-                        self._emit(events.log("info", f"Using cookies: {config.cookies}"))
-
-                    def on_progress(media):
-                        nonlocal scraped
-                        if self._stop.is_set():
-                            raise events.RunCancelled()
-                        scraped += 1
-                        self._emit(events.progress("scrape", scraped, config.num))
-
-                    if config.mode == "scrape":
-                        self._emit(
-                            events.log(
-                                "info", f"Scraping up to {config.num} items from {config.url}"
-                            )
-                        )
-                        media_list = run_api_scrape(scraper, config, on_progress)
-                    elif config.mode == "search":
-                        self._emit(
-                            events.log(
-                                "info", f"Searching '{config.url}' for up to {config.num} items"
-                            )
-                        )
-                        media_list = run_api_search(scraper, config, on_progress)
-                    else:
-                        raise ValueError(f"Unsupported mode: {config.mode}")
-
-                    if scraped == 0:
-                        # The most common silent failure: bad URL/query, or missing/expired
-                        # cookies for a private board. Flag it instead of reporting a clean run.
-                        self._emit(
-                            events.log(
-                                "warn",
-                                "No media found. Check the URL/query, or your cookies for "
-                                "private boards.",
-                            )
-                        )
-                    else:
-                        self._emit(events.log("info", f"Scraped {scraped} media items."))
-
-                    # === optionally persist the scraped records for later reuse ===
-                    if config.save_cache:
-                        cache_path = resolve_cache_path(config.cache_path, config.output_dir)
-                        save_cache(media_list, cache_path)
-                        saved = len(media_list)
-                        self._emit(events.log("info", f"Saved {saved} records to {cache_path}"))
-
-                    # === metadata-only: stop before downloading ===
-                    if config.skip_download:
-                        self._emit(events.done(scraped, downloaded, videos, saved))
-                        return
-
-                # === ffmpeg guard: ===
-                # downgrade videos -> images if remux needed but unavailable
-                download_streams = config.download_streams
-                if download_streams and not config.skip_remux:
-                    ffmpeg = self.check_ffmpeg(config.ffmpeg_path)
-                    if not ffmpeg["found"]:
-                        download_streams = False
-                        self._emit(
-                            events.log(
-                                "warn", "FFmpeg not found; downloading images instead of videos"
-                            )
-                        )
-                    elif config.ffmpeg_path:
-                        # The library invokes bare "ffmpeg" via subprocess, so a custom path is
-                        # only honored if its directory is on PATH for the remux step.
-                        ffmpeg_dir = str(Path(str(ffmpeg["path"])).parent)
-                        path_entries = os.environ.get("PATH", "").split(os.pathsep)
-                        if ffmpeg_dir not in path_entries:
-                            os.environ["PATH"] = (
-                                ffmpeg_dir + os.pathsep + os.environ.get("PATH", "")
-                            )
-                            self._emit(events.log("info", f"Using ffmpeg: {ffmpeg['path']}"))
-
-                # === download phase ===
-                total = len(media_list)
-                self._emit(events.log("info", f"Downloading {total} files to {config.output_dir}"))
-                self._emit(events.progress("download", 0, total))  # flip phase label to Downloading
-
-                # `completed` is the running count of finished files (successes + failures), so
-                # the bar still reaches total when files are skipped; `downloaded` counts only
-                # successes. With concurrent downloads, callbacks fire in completion order.
-                def on_file_downloaded(completed: int, media: PinterestMedia):
-                    nonlocal downloaded, videos
-                    downloaded += 1
-                    is_video_file = download_streams and media.video_stream is not None
-                    if is_video_file:
-                        videos += 1
-                    self._emit(events.progress("download", completed, total))
-                    # Preview the file just written to disk; a video stream has no still to show.
-                    thumbnail = "" if is_video_file else thumbnail_data_uri(media.local_path)
-                    self._emit(events.media(thumbnail, is_video_file))
-
-                def on_file_failed(completed: int, media: PinterestMedia, exc: Exception):
-                    nonlocal failed
-                    failed += 1
-                    self._emit(
-                        events.log("warn", f"Skipped {media.id}: {type(exc).__name__}: {exc}")
-                    )
-                    self._emit(events.progress("download", completed, total))
-
-                run_download(
-                    media_list,
-                    downloader,
-                    Path(config.output_dir),
-                    download_streams,
-                    config.skip_remux,
-                    config.max_workers,
-                    on_file_downloaded,
-                    on_file_failed,
-                    lambda: self._stop.is_set(),
-                )
-                if self._stop.is_set():  # cancelled between files
-                    raise events.RunCancelled()
-
-                summary = f"Downloaded {downloaded} files ({videos} videos)"
-                if failed:
-                    summary += f", {failed} skipped"
-                self._emit(events.log("info", summary + "."))
-
-                # === captions: write sidecars / embed EXIF for the downloaded files ===
-                if config.caption != "none":
-                    apply_captions(media_list, Path(config.output_dir), config.caption)
-                    self._emit(events.log("info", f"Wrote captions ({config.caption})"))
-
-                self._emit(events.done(scraped, downloaded, videos, saved))
-        except events.RunCancelled:
-            self._emit(events.log("info", "Run cancelled by user."))
-            self._emit(events.done(scraped, downloaded, videos, saved))
-        except Exception as e:
-            self._emit(events.error(f"An unexpected error occurred: {str(e)}"))
+            runner.execute(
+                config,
+                self._emit,
+                self._stop.is_set,
+                sessions=self._sessions,
+                history_store=self._history,
+            )
         finally:
             self._stop.clear()  # ensure reset for the next run, even if this one errored out
             self._thread = None  # mark no active run
@@ -317,6 +148,8 @@ class Api:
         if self._window is None:
             return {"success": False, "path": "", "message": "Window not initialized."}
 
+        import webview
+
         login_window = webview.create_window(
             "Login to Pinterest",
             "https://www.pinterest.com/login/",
@@ -360,7 +193,7 @@ class Api:
             }
 
         target = self._file_dialog(
-            webview.FileDialog.SAVE,
+            "SAVE",
             directory=_EXE_DIR,
             save_filename="cookies.json",
             file_types=("JSON File (*.json)", "All files (*.*)"),
@@ -436,26 +269,65 @@ class Api:
 
     def get_core_version(self) -> str:
         """Get the version of the embedded pinterest-dl core."""
-        # Import and call __version__ here to avoid importing pinterest_dl at the module level.
-        from pinterest_dl import __version__
+        # The frontend asks for this on load; reading the installed metadata avoids importing
+        # the whole pinterest_dl scraper stack before the first run needs it.
+        from importlib.metadata import PackageNotFoundError, version
 
-        return __version__
+        try:
+            return version("pinterest-dl")
+        except PackageNotFoundError:
+            # Frozen builds may not ship dist-info; fall back to the (slower) import.
+            from pinterest_dl import __version__
+
+            return __version__
+
+    def report_first_paint(self, ms_since_paint: float) -> None:
+        """Record the frontend's first paint, measured in JS as ms before this call."""
+        startup.mark("first paint", at=startup.elapsed() - float(ms_since_paint) / 1000)
+        startup.finish()
+
+    def get_startup_report(self) -> dict:
+        """Per-import and per-phase startup timings, in ms since app start."""
+        return startup.report()
+
+    def prewarm(self, timeout: float = 10.0, cookies: str | None = None) -> None:
+        """Open connections for the saved settings in the background, before any run."""
+        # Normalized like ScrapeConfig.from_payload, so the first run reuses these sessions.
+        threading.Thread(
+            target=self._sessions.prewarm,
+            args=(float(timeout), (cookies or "").strip() or None),
+            daemon=True,
+        ).start()
+
+    def get_session_stats(self) -> dict:
+        """Connection reuse across every run so far."""
+        return self._sessions.stats()
+
+    def list_runs(self, limit: int = 50, offset: int = 0) -> list[dict]:
+        """Past runs from the history store, newest first."""
+        return self._history.recent(limit, offset)
+
+    def compare_runs(self, base_id: str, other_id: str) -> dict:
+        """Per-metric change between two past runs (ids or unique id prefixes)."""
+        try:
+            return {"success": True, **self._history.compare(base_id, other_id)}
+        except KeyError as e:
+            return {"success": False, "message": f"No such run: {e.args[0]}"}
 
     def check_ffmpeg(self, custom_path: str | None = None) -> dict[str, bool | str]:
         """Resolve ffmpeg for the GUI's video-remux feature.
 
-        Checks a custom override first, then PATH. `shutil.which` validates that
-        the target exists and is executable, so the frontend can show
-        Found / Not found without shelling out itself.
+        Checks a custom override first, then PATH (the same lookup the run uses), so
+        the frontend can show Found / Not found without shelling out itself.
         """
-        path = shutil.which(custom_path) if custom_path else shutil.which("ffmpeg")
+        path = runner.resolve_ffmpeg(custom_path)
         if path is None:
             return {"found": False, "path": ""}
         return {"found": True, "path": path}
 
     def _file_dialog(
         self,
-        dialog_type: int,
+        dialog_type: Literal["OPEN", "SAVE", "FOLDER"],
         directory: str,
         save_filename: str = "",
         file_types: tuple[str, ...] = (),
@@ -463,8 +335,10 @@ class Api:
         """Run a native file dialog and return a single path, or "" if cancelled."""
         if self._window is None:
             return ""
+        import webview  # app.py already loaded it; deferred so importing api stays light
+
         result = self._window.create_file_dialog(
-            dialog_type,
+            getattr(webview.FileDialog, dialog_type),
             directory=directory,
             save_filename=save_filename,
             file_types=file_types,
@@ -478,22 +352,36 @@ class Api:
         """Save-file dialog: where to write the metadata cache JSON."""
         target = Path(default_path) if default_path.strip() else Path(_EXE_DIR) / "metadata.json"
         return self._file_dialog(
-            webview.FileDialog.SAVE,
+            "SAVE",
             directory=str(target.parent),
             save_filename=target.name,
             file_types=("JSON File (*.json)", "All files (*.*)"),
         )
 
     def select_json_file(self, default_path: str = "") -> str:
-        """Open-file dialog: pick an existing cache JSON for Download mode."""
+        """Open-file dialog: pick an existing JSON file (e.g. cookies)."""
         start = Path(default_path.strip()) if default_path.strip() else Path(_EXE_DIR)
         directory = str(start.parent if start.suffix else start)
         return self._file_dialog(
-            webview.FileDialog.OPEN,
+            "OPEN",
             directory=directory,
             file_types=("JSON File (*.json)", "All files (*.*)"),
         )
 
+    def select_cache_source(self, default_path: str = "") -> str:
+        """Open-file dialog for Download mode: a cache JSON, or an archive from archive output."""
+        start = Path(default_path.strip()) if default_path.strip() else Path(_EXE_DIR)
+        directory = str(start.parent if start.suffix else start)
+        return self._file_dialog(
+            "OPEN",
+            directory=directory,
+            file_types=(
+                "Cache or archive (*.json;*.zip;*.tar)",
+                "JSON File (*.json)",
+                "All files (*.*)",
+            ),
+        )
+
     def select_folder(self, default_path: str = "") -> str:
         """Folder dialog: pick the output directory."""
         path = default_path.strip()
@@ -506,12 +394,12 @@ class Api:
         # Walk up to the nearest existing ancestor so the dialog has a valid starting point.
         while not resolved.exists() and resolved != resolved.parent:
             resolved = resolved.parent
-        return self._file_dialog(webview.FileDialog.FOLDER, directory=str(resolved))
+        return self._file_dialog("FOLDER", directory=str(resolved))
 
     def select_file(self, default_path: str = "") -> str:
         """Open-file dialog: pick any file (used for ffmpeg executable, cookies JSON, etc.)."""
         start = Path(default_path.strip()) if default_path.strip() else Path(_EXE_DIR)
         directory = str(start.parent if start.is_file() else start)
         return self._file_dialog(
-            webview.FileDialog.OPEN, directory=directory, file_types=("All files (*.*)",)
+            "OPEN", directory=directory, file_types=("All files (*.*)",)
         )
@@ -1,10 +1,10 @@
+from core import startup  # first: starts the startup clock
+
 import ctypes
+import multiprocessing
 import sys
-import webview
 from pathlib import Path
 
-from api import Api
-
 
 def _base_dir() -> Path:
     # Nuitka injects __nuitka_binary_dir at compile time; it points to the directory
@@ -19,8 +19,6 @@ def _base_dir() -> Path:
 _base = _base_dir()
 
 if sys.platform == "win32":
-    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("pinterest-dl.gui")
-
     # The windowed build has no console, so each ffmpeg child (spawned by pinterest_dl
     # to remux videos) opens its own console window -- visible as flashing cmd windows,
     # one per download worker. Default child processes to CREATE_NO_WINDOW so they stay
@@ -36,14 +34,37 @@ if sys.platform == "win32":
 
     subprocess.Popen.__init__ = _no_window_popen_init
 
-api = Api()
-window = webview.create_window(
-    "Pinterest-dl",
-    str(_base / "web" / "index.html"),
-    js_api=api,
-    width=1600,
-    height=1100,
-    min_size=(900, 640),
-)
-api.set_window(window)  # hand the bridge its handle so the run thread can push events into JS
-webview.start(icon=str(_base / "assets" / "icon.ico"))
+
+def main() -> None:
+    with startup.span("webview", "import"):
+        import webview
+
+    with startup.span("api", "import"):
+        from api import Api
+
+    if sys.platform == "win32":
+        ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("pinterest-dl.gui")
+
+    with startup.span("create window"):
+        api = Api()
+        window = webview.create_window(
+            "Pinterest-dl",
+            str(_base / "web" / "index.html"),
+            js_api=api,
+            width=1600,
+            height=1100,
+            min_size=(900, 640),
+        )
+    api.set_window(window)  # hand the bridge its handle so the run thread can push events into JS
+    # pywebview fires these on its GUI thread; first paint is reported back by the frontend.
+    window.events.shown += lambda: startup.mark("window shown")
+    window.events.loaded += lambda: startup.mark("page loaded")
+    startup.mark("gui loop start")
+    webview.start(icon=str(_base / "assets" / "icon.ico"))
+
+
+# Sharded downloads (core.shards) spawn processes that import this module as
+# __mp_main__, so nothing GUI is imported until main() runs.
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
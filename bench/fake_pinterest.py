@@ -0,0 +1,254 @@
+"""Local stand-in for the Pinterest API and CDN, for benchmarks.
+
+Serves synthetic board/search pages in the resource-API shape pinterest_dl parses,
+images (plus the CDN's small 236x rendition), and HLS playlists with their segments.
+Latency, per-connection bandwidth and error rate are configurable so runs can model a
+slow or flaky CDN reproducibly.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+_PAGE_END = "-end-"  # pinterest_dl stops paging when it sees this bookmark
+
+
+@dataclass
+class FakeProfile:
+    """What the fake serves and how badly it behaves."""
+
+    pins: int = 500
+    video_ratio: float = 0.0  # fraction of pins that carry an HLS stream
+    image_size: tuple[int, int] = (736, 1104)  # a typical Pinterest "orig" size
+    segments_per_video: int = 8
+    segment_bytes: int = 256 * 1024
+    latency_ms: float = 0.0  # added before every response
+    bandwidth_kbps: float = 0.0  # per-connection body throttle; 0 = unthrottled
+    error_rate: float = 0.0  # fraction of media requests answered with 503
+    seed: int = 0
+
+
+class FakePinterest:
+    """Owns the server thread; use as a context manager around a benchmark."""
+
+    def __init__(self, profile: FakeProfile) -> None:
+        self.profile = profile
+        self._random = random.Random(profile.seed)
+        self._random_lock = threading.Lock()
+        self.image_bytes = _synthetic_jpeg(profile.image_size, profile.seed)
+        width, height = profile.image_size
+        self.preview_bytes = _synthetic_jpeg((236, height * 236 // width), profile.seed)
+        self.segment_bytes = bytes(
+            random.Random(profile.seed).getrandbits(8) for _ in range(profile.segment_bytes)
+        )
+        self.requests = 0
+        self.errors = 0
+        self._counter_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self  # type: ignore[attr-defined]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakePinterest":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count_request(self) -> None:
+        with self._counter_lock:
+            self.requests += 1
+
+    def should_fail(self) -> bool:
+        if self.profile.error_rate <= 0:
+            return False
+        with self._random_lock:
+            failed = self._random.random() < self.profile.error_rate
+        if failed:
+            with self._counter_lock:
+                self.errors += 1
+        return failed
+
+    def pin(self, index: int) -> dict:
+        """One pin in the react_grid_pin shape ResponseParser reads."""
+        width, height = self.profile.image_size
+        pin_id = 10_000_000 + index
+        item = {
+            "id": str(pin_id),
+            "auto_alt_text": f"synthetic pin {index}",
+            "title": f"Pin {index}",
+            "images": {
+                "orig": {
+                    "url": f"{self.base_url}/originals/{pin_id}.jpg",
+                    "width": width,
+                    "height": height,
+                }
+            },
+        }
+        # Deterministic per index, so every run sees the same mix regardless of timing.
+        if random.Random(self.profile.seed + index).random() < self.profile.video_ratio:
+            item["videos"] = {
+                "video_list": {
+                    "V_HLSV4": {
+                        "url": f"{self.base_url}/video/{pin_id}.m3u8",
+                        "width": width,
+                        "height": height,
+                        "duration": self.profile.segments_per_video * 4000,
+                    }
+                }
+            }
+        return item
+
+    def page(self, bookmarks: list[str], page_size: int) -> tuple[list[dict], list[str]]:
+        """Serve a page of pins; bookmarks carry the offset as "o:<n>"."""
+        offset = 0
+        for bookmark in bookmarks:
+            if bookmark.startswith("o:"):
+                offset = int(bookmark[2:])
+        end = min(offset + page_size, self.profile.pins)
+        items = [self.pin(i) for i in range(offset, end)]
+        return items, [_PAGE_END if end >= self.profile.pins else f"o:{end}"]
+
+
+def _synthetic_jpeg(size: tuple[int, int], seed: int) -> bytes:
+    """A decodable JPEG with enough entropy to compress to a realistic file size."""
+    from PIL import Image
+
+    noise = random.Random(seed).randbytes(64 * 64 * 3)
+    tile = Image.frombytes("RGB", (64, 64), noise).resize(size, Image.Resampling.BILINEAR)
+    buffer = BytesIO()
+    tile.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse behaves like the CDN
+
+    @property
+    def fake(self) -> FakePinterest:
+        return self.server.fake  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:
+        fake = self.fake
+        fake.count_request()
+        if fake.profile.latency_ms:
+            time.sleep(fake.profile.latency_ms / 1000)
+
+        url = urlsplit(self.path)
+        path = url.path
+        if path == "/":
+            self._send(200, b"ok", "text/html", headers={"Set-Cookie": "csrftoken=bench"})
+        elif path == "/resource/BoardResource/get/":
+            self._send_resource({"id": "bench-board", "pin_count": fake.profile.pins}, [])
+        elif path in ("/resource/BoardFeedResource/get/", "/resource/BaseSearchResource/get/"):
+            options = json.loads(parse_qs(url.query)["data"][0])["options"]
+            items, bookmarks = fake.page(options.get("bookmarks") or [], options["page_size"])
+            data = {"results": items} if "Search" in path else items
+            self._send_resource(data, bookmarks)
+        elif path.startswith("/originals/"):
+            self._send_media(fake.image_bytes, "image/jpeg")
+        elif path.startswith("/236x/"):  # the small rendition core.previews asks for
+            self._send_media(fake.preview_bytes, "image/jpeg")
+        elif path.startswith("/video/") and path.endswith(".m3u8"):
+            pin_id = path[len("/video/") : -len(".m3u8")]
+            self._send(200, self._playlist(pin_id), "application/vnd.apple.mpegurl")
+        elif path.startswith("/video/") and path.endswith(".ts"):
+            self._send_media(fake.segment_bytes, "video/mp2t")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _playlist(self, pin_id: str) -> bytes:
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-TARGETDURATION:4",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for index in range(self.fake.profile.segments_per_video):
+            lines += ["#EXTINF:4.0,", f"{self.fake.base_url}/video/{pin_id}/{index:05d}.ts"]
+        lines.append("#EXT-X-ENDLIST")
+        return ("\n".join(lines) + "\n").encode("ascii")
+
+    def _send_resource(self, data: object, bookmarks: list[str]) -> None:
+        body = {
+            "resource": {"options": {"bookmarks": bookmarks}},
+            "resource_response": {"status": "success", "data": data},
+        }
+        self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _send_media(self, body: bytes, content_type: str) -> None:
+        if self.fake.should_fail():
+            self._send(503, b"unavailable", "text/plain")
+            return
+        # Single byte ranges, as the CDN serves them (header probes, size fallbacks).
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and int(match[1]) < len(body):
+            start = int(match[1])
+            end = min(int(match[2] or len(body) - 1), len(body) - 1)
+            content_range = f"bytes {start}-{end}/{len(body)}"
+            self._send(
+                206,
+                body[start : end + 1],
+                content_type,
+                throttle=True,
+                headers={"Content-Range": content_range},
+            )
+            return
+        self._send(200, body, content_type, throttle=True)
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        throttle: bool = False,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        kbps = self.fake.profile.bandwidth_kbps
+        if not throttle or kbps <= 0:
+            self.wfile.write(body)
+            return
+        chunk = max(1024, int(kbps * 1024 / 20))  # ~20 writes per second at the target rate
+        for start in range(0, len(body), chunk):
+            self.wfile.write(body[start : start + chunk])
+            time.sleep(chunk / (kbps * 1024))
+
+    do_HEAD = do_GET
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def route_pinterest_dl(base_url: str) -> None:
+    """Point pinterest_dl's resource endpoints at the fake server.
+
+    Endpoint's URLs are class attributes computed from the real host at import time,
+    so each one is rewritten; there is no other hook for the API base.
+    """
+    from pinterest_dl.api.endpoints import Endpoint
+
+    real_base = "https://www.pinterest.com"
+    for name, value in list(vars(Endpoint).items()):
+        if isinstance(value, str) and value.startswith(real_base):
+            setattr(Endpoint, name, base_url + value[len(real_base) :])
@@ -0,0 +1,350 @@
+"""Benchmark the run pipeline end to end against the local fake Pinterest.
+
+Usage (from the repo root):
+    python -m bench.run --out bench/results.json
+    python -m bench.run --workers 4,8,16 --latency-ms 40 --bandwidth-kbps 2048
+    python -m bench.run --out new.json --compare bench/results.json
+
+Each scenario drives the same code the app runs (run_api_scrape, run_download,
+thumbnail_data_uri, runner.execute with a bridge-style sink) and records throughput
+and latency percentiles, plus the per-record memory of the run's media store. Results
+are JSON keyed by scenario, so two files taken on different commits can be compared
+with --compare.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench.fake_pinterest import FakePinterest, FakeProfile, route_pinterest_dl
+from core import events, runner
+from core.scrape_config import ScrapeConfig
+
+_BOARD_URL = "https://www.pinterest.com/bench/board/"  # only parsed; requests go to the fake
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _config(output_dir: Path, num: int, workers: int, videos: bool) -> ScrapeConfig:
+    return ScrapeConfig(
+        url=_BOARD_URL,
+        num=num,
+        output_dir=str(output_dir),
+        min_resolution=(0, 0),
+        delay=0.0,
+        download_streams=videos,
+        skip_remux=True,  # binary concat; keeps the benchmark independent of ffmpeg
+        max_workers=workers,
+    )
+
+
+def bench_scrape(fake: FakePinterest, num: int) -> tuple[dict, list]:
+    from pinterest_dl import PinterestDL
+
+    from core.downloader import run_api_scrape
+
+    scraper = PinterestDL.with_api(timeout=30)
+    gaps: list[float] = []
+    last = time.perf_counter()
+
+    def on_progress(media) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+    start = time.perf_counter()
+    media_list = run_api_scrape(scraper, _config(Path("."), num, 1, False), on_progress)
+    wall = time.perf_counter() - start
+    return {
+        "items": len(media_list),
+        "wall_s": round(wall, 4),
+        "items_per_s": round(len(media_list) / wall, 2) if wall else 0.0,
+        # A gap per item; page fetches show up as the long tail.
+        "item_gap": _percentiles(gaps),
+    }, media_list
+
+
+def bench_download(
+    media_list: list, workers: int, videos: bool, workdir: Path
+) -> tuple[dict, list[Path]]:
+    from pinterest_dl.download import USER_AGENT, MediaDownloader
+
+    from core import downloader as downloader_module
+    from core.downloader import run_download
+
+    downloader = MediaDownloader(user_agent=USER_AGENT, timeout=30, max_retries=3)
+    durations: list[float] = []
+    durations_lock = threading.Lock()
+    # run_download goes through download_media, which sends HLS streams past
+    # MediaDownloader.download; time that instead so videos are counted too.
+    download = downloader_module.download_media
+
+    def timed_download(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return download(*args, **kwargs)
+        finally:
+            with durations_lock:
+                durations.append(time.perf_counter() - started)
+
+    downloader_module.download_media = timed_download
+    output_dir = workdir / f"download_w{workers}"
+    ok = 0
+    failed = 0
+
+    def on_done(completed, media) -> None:
+        nonlocal ok
+        ok += 1
+
+    def on_failed(completed, media, exc) -> None:
+        nonlocal failed
+        failed += 1
+
+    start = time.perf_counter()
+    try:
+        paths = run_download(
+            media_list, downloader, output_dir, videos, True, workers, on_done, on_failed,
+            lambda: False,
+        )
+    finally:
+        downloader_module.download_media = download
+    wall = time.perf_counter() - start
+    total_bytes = sum(path.stat().st_size for path in paths)
+    return {
+        "workers": workers,
+        "files": ok,
+        "failed": failed,
+        "bytes": total_bytes,
+        "wall_s": round(wall, 4),
+        "files_per_s": round(ok / wall, 2) if wall else 0.0,
+        "mb_per_s": round(total_bytes / wall / 1e6, 3) if wall else 0.0,
+        "file_latency": _percentiles(durations),
+    }, paths
+
+
+def bench_thumbnails(paths: list[Path], limit: int) -> dict:
+    from core.downloader import thumbnail_data_uri
+
+    samples: list[float] = []
+    encoded = 0
+    for path in paths[:limit]:
+        started = time.perf_counter()
+        encoded += len(thumbnail_data_uri(path))
+        samples.append(time.perf_counter() - started)
+    return {
+        "files": len(samples),
+        "per_file": _percentiles(samples),
+        "avg_uri_bytes": round(encoded / len(samples)) if samples else 0,
+    }
+
+
+def bench_events(media_list: list, workers: int, workdir: Path) -> dict:
+    """Full download-mode run with a sink that encodes like Api._emit does."""
+    from core.downloader import save_cache
+
+    cache = workdir / "events_cache.json"
+    save_cache(media_list, cache)
+    config = _config(workdir / "events_out", len(media_list), workers, False)
+    config.mode = "download"
+    config.url = str(cache)
+
+    emit_costs: list[float] = []
+    counts: dict[str, int] = {}
+    bridge_bytes = 0
+
+    def bridge_sink(event: events.Event) -> None:
+        nonlocal bridge_bytes
+        started = time.perf_counter()
+        payload = json.dumps(json.dumps(event))  # the double encode evaluate_js receives
+        bridge_bytes += len(f"window.__pdl_emit({payload})")
+        emit_costs.append(time.perf_counter() - started)
+        counts[event["type"]] = counts.get(event["type"], 0) + 1
+
+    start = time.perf_counter()
+    runner.execute(config, bridge_sink, lambda: False, thumbnails=True)
+    wall = time.perf_counter() - start
+    return {
+        "wall_s": round(wall, 4),
+        "events": sum(counts.values()),
+        "by_type": counts,
+        "emit_encode": _percentiles(emit_costs),
+        "bridge_bytes": bridge_bytes,
+        "files_per_s": round(len(media_list) / wall, 2) if wall else 0.0,
+    }
+
+
+def bench_memory(fake: FakePinterest, records: int) -> dict:
+    """Bytes per record held for a run: a PinterestMedia list vs. the run's MediaStore."""
+    import tracemalloc
+
+    from pinterest_dl import PinterestMedia
+
+    from core.media_store import MediaStore
+
+    def make(index: int) -> PinterestMedia:
+        pin = fake.pin(index)
+        orig = pin["images"]["orig"]
+        media = PinterestMedia(
+            int(pin["id"]),
+            orig["url"],
+            pin["auto_alt_text"],
+            f"https://www.pinterest.com/pin/{pin['id']}/",
+            (orig["width"], orig["height"]),
+        )
+        media.set_local_path(Path("downloads") / f"{pin['id']}.jpg")  # as after download
+        return media
+
+    def measure(build) -> int:
+        tracemalloc.start()
+        held = build()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+        return used
+
+    as_list = measure(lambda: [make(i) for i in range(records)])
+    as_store = measure(lambda: MediaStore(make(i) for i in range(records)))
+    return {
+        "records": records,
+        "list_bytes_per_record": round(as_list / records),
+        "store_bytes_per_record": round(as_store / records),
+        "saving_pct": round((1 - as_store / as_list) * 100, 1) if as_list else 0.0,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _flatten(data: dict, prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """Side-by-side of every numeric metric present in both result files."""
+    now = _flatten(current["results"])
+    before = _flatten(baseline["results"])
+    lines = [
+        f"{'metric':<48} {baseline['meta']['commit']:>12} {current['meta']['commit']:>12}  change"
+    ]
+    for name in sorted(now.keys() & before.keys()):
+        old, new = before[name], now[name]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        lines.append(f"{name:<48} {old:>12.3f} {new:>12.3f}  {change}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pins", type=int, default=300)
+    parser.add_argument("--workers", default="1,4,8,16", help="Comma-separated pool sizes")
+    parser.add_argument("--video-ratio", type=float, default=0.0)
+    parser.add_argument("--segments", type=int, default=8, help="HLS segments per video")
+    parser.add_argument("--segment-kb", type=int, default=256)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--bandwidth-kbps", type=float, default=0.0, help="Per connection")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--thumbnails", type=int, default=100, help="Files to thumbnail")
+    parser.add_argument("--memory-records", type=int, default=20000, help="Records to size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    profile = FakeProfile(
+        pins=args.pins,
+        video_ratio=args.video_ratio,
+        segments_per_video=args.segments,
+        segment_bytes=args.segment_kb * 1024,
+        latency_ms=args.latency_ms,
+        bandwidth_kbps=args.bandwidth_kbps,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    worker_counts = [int(value) for value in args.workers.split(",") if value.strip()]
+    videos = args.video_ratio > 0
+    results: dict = {}
+
+    with FakePinterest(profile) as fake, tempfile.TemporaryDirectory() as td:
+        route_pinterest_dl(fake.base_url)
+        workdir = Path(td)
+
+        results["scrape"], media_list = bench_scrape(fake, args.pins)
+        print(f"scrape: {results['scrape']['items_per_s']} items/s", file=sys.stderr)
+
+        paths: list[Path] = []
+        for workers in worker_counts:
+            result, paths = bench_download(media_list, workers, videos, workdir)
+            results[f"download_w{workers}"] = result
+            print(f"download w={workers}: {result['files_per_s']} files/s", file=sys.stderr)
+
+        images = [path for path in paths if path.suffix.lower() == ".jpg"]
+        results["thumbnail"] = bench_thumbnails(images, args.thumbnails)
+        print(f"thumbnail: {results['thumbnail']['per_file']['p50_ms']} ms p50", file=sys.stderr)
+
+        results["events"] = bench_events(media_list, max(worker_counts), workdir)
+        summary = f"events: {results['events']['events']} in {results['events']['wall_s']}s"
+        print(summary, file=sys.stderr)
+        results["memory"] = bench_memory(fake, args.memory_records)
+        memory = results["memory"]
+        print(
+            f"memory: {memory['list_bytes_per_record']} -> "
+            f"{memory['store_bytes_per_record']} bytes/record",
+            file=sys.stderr,
+        )
+        results["server"] = {"requests": fake.requests, "errors_injected": fake.errors}
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "profile": vars(profile),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(compare(report, baseline), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
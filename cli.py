@@ -0,0 +1,452 @@
+"""Headless entry point: runs the same pipeline as the GUI without pywebview.
+
+Usage:
+    python cli.py run https://www.pinterest.com/user/board/ -n 100 -o ./downloads
+    python cli.py run --config job.json --json
+    python cli.py serve --port 8765
+    python cli.py watch boards.json
+    python cli.py relayout ./downloads --to hash
+    python cli.py history list
+    python cli.py history compare <base-id> <other-id>
+
+A config file is a JSON object in the same shape the frontend sends to `start_run`
+(see RunPayload in frontend/src/lib/api.ts); flags given on the command line override it.
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import threading
+from pathlib import Path
+from typing import TextIO
+
+from core import events, history, runner
+from core.scrape_config import ARCHIVES, DOWNLOAD_ORDERS, LAYOUTS, ScrapeConfig
+
+# Mirrors the GUI's defaults (run.svelte.ts / settings.svelte.ts) so a bare invocation
+# behaves like pressing Execute with a fresh config.
+_DEFAULTS = {
+    "mode": "scrape",
+    "num": 1,
+    "output_dir": "./downloads",
+    "min_resolution": [0, 0],
+    "delay": 0.2,
+    "timeout": 10.0,
+    "max_workers": 8,
+    "download_streams": False,
+}
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_CANCELLED = 130  # conventional status for a run stopped by Ctrl+C
+
+
+class TerminalSink:
+    """Renders run events as human-readable lines; progress redraws in place on a tty."""
+
+    def __init__(self, out: TextIO = sys.stdout, err: TextIO = sys.stderr) -> None:
+        self._out = out
+        self._err = err
+        self._live = out.isatty()
+        self._progress_shown = False
+
+    def __call__(self, event: events.Event) -> None:
+        kind = event["type"]
+        if kind == "progress":
+            if self._live:
+                line = f"{event['phase']}: {event['current']}/{event['total']}"
+                self._out.write(f"\r{line:<40}")
+                self._out.flush()
+                self._progress_shown = True
+            return
+        if kind == "media":
+            return  # counts arrive with `done`; a line per file would drown the log
+        self._end_progress()
+        if kind == "log":
+            stream = self._out if event["level"] == "info" else self._err
+            stream.write(f"[{event['level']}] {event['message']}\n")
+        elif kind == "done":
+            self._out.write(
+                f"Done: scraped {event['scraped']}, downloaded {event['downloaded']} "
+                f"({event['videos']} videos), saved {event['saved']}\n"
+            )
+        elif kind == "error":
+            self._err.write(f"[error] {event['message']}\n")
+        self._out.flush()
+
+    def _end_progress(self) -> None:
+        if self._progress_shown:
+            self._out.write("\n")
+            self._progress_shown = False
+
+
+class JsonLinesSink:
+    """Writes each run event as one JSON object per line, the same payloads the GUI receives."""
+
+    def __init__(self, out: TextIO = sys.stdout) -> None:
+        self._out = out
+
+    def __call__(self, event: events.Event) -> None:
+        self._out.write(json.dumps(event) + "\n")
+        self._out.flush()
+
+
+def build_payload(args: argparse.Namespace) -> dict:
+    """Layer defaults, then the config file, then explicit flags into one RunPayload dict."""
+    payload = dict(_DEFAULTS)
+    if args.config:
+        loaded = json.loads(Path(args.config).read_text(encoding="utf-8"))
+        if not isinstance(loaded, dict):
+            raise ValueError(f"Config file must contain a JSON object: {args.config}")
+        payload.update(loaded)
+
+    overrides = {
+        "url": args.url,
+        "mode": args.mode,
+        "num": args.num,
+        "output_dir": args.output,
+        "min_resolution": args.min_resolution,
+        "delay": args.delay,
+        "timeout": args.timeout,
+        "max_workers": args.workers,
+        "processes": args.processes,
+        "cookies": args.cookies,
+        "ensure_alt": args.ensure_alt,
+        "ffmpeg_path": args.ffmpeg,
+        "download_streams": args.videos,
+        "skip_remux": args.skip_remux,
+        "caption": args.caption,
+        "caption_from_title": args.caption_from_title,
+        "save_cache": args.save_cache,
+        "cache_path": args.cache_path,
+        "skip_download": args.skip_download,
+        "dry_run": args.dry_run,
+        "probe_resolution": args.probe,
+        "verify": args.verify,
+        "resume": args.resume,
+        "download_order": args.order,
+        "layout": args.layout,
+        "skip_existing": args.skip_existing,
+        "archive": args.archive,
+        "archive_max_mb": args.archive_max_mb,
+        "trace_path": args.trace,
+    }
+    payload.update({key: value for key, value in overrides.items() if value is not None})
+    return payload
+
+
+def _resolution(value: str) -> list[int]:
+    try:
+        width, height = value.lower().split("x")
+        return [int(width), int(height)]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+
+
+def run_command(args: argparse.Namespace) -> int:
+    sink = JsonLinesSink() if args.json else TerminalSink()
+    try:
+        config = ScrapeConfig.from_payload(build_payload(args))
+    except (OSError, ValueError, KeyError) as e:
+        sink(events.error(str(e)))
+        return EXIT_ERROR
+
+    outcome: list[str] = []  # the terminal event type, recorded from the run thread
+
+    def emit(event: events.Event) -> None:
+        if event["type"] in ("done", "error"):
+            outcome.append(event["type"])
+        sink(event)
+
+    # Run on a worker thread so the main thread stays free to turn Ctrl+C into the same
+    # cooperative cancel the GUI's Stop button uses.
+    stop = threading.Event()
+    store = None if args.no_history else history.HistoryStore(history.default_path())
+    thread = threading.Thread(
+        target=runner.execute,
+        args=(config, emit, stop.is_set, False),
+        kwargs={"history_store": store},
+        daemon=True,
+    )
+    thread.start()
+    while thread.is_alive():
+        try:
+            thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            if stop.is_set():
+                return EXIT_CANCELLED  # second Ctrl+C: abandon in-flight downloads
+            stop.set()
+
+    if outcome and outcome[-1] == "error":
+        return EXIT_ERROR
+    return EXIT_CANCELLED if stop.is_set() else EXIT_OK
+
+
+def _add_metrics_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--metrics",
+        type=int,
+        metavar="PORT",
+        help="Serve live Prometheus metrics on localhost:PORT (0 picks a free port)",
+    )
+
+
+def _add_run_parser(subparsers) -> None:
+    parser = subparsers.add_parser("run", help="Run one scrape/search/download job")
+    parser.add_argument(
+        "url", nargs="?", help="Pin/board URL, search query, or cache JSON (download mode)"
+    )
+    parser.add_argument("--config", help="JSON file with run options (RunPayload shape)")
+    parser.add_argument("--mode", choices=["scrape", "search", "download"])
+    parser.add_argument("-n", "--num", type=int, help="Maximum number of items to scrape")
+    parser.add_argument("-o", "--output", help="Output directory")
+    parser.add_argument(
+        "--min-resolution", type=_resolution, metavar="WxH", help="e.g. 512x512"
+    )
+    parser.add_argument("--delay", type=float, help="Seconds between scrape requests")
+    parser.add_argument("--timeout", type=float, help="Per-request timeout in seconds")
+    parser.add_argument("--workers", type=int, help="Concurrent downloads (1-16)")
+    parser.add_argument(
+        "--processes", type=int, help="Download mode: split the cache across N processes"
+    )
+    parser.add_argument("--cookies", help="Cookies JSON for private boards")
+    parser.add_argument("--ffmpeg", help="Path to a custom ffmpeg executable")
+    parser.add_argument(
+        "--caption", choices=["none", "txt", "json", "metadata"], help="Caption output"
+    )
+    parser.add_argument("--cache-path", help="Where to write the metadata cache JSON")
+    parser.add_argument(
+        "--order", choices=DOWNLOAD_ORDERS, help="Which files to download first (default: scrape)"
+    )
+    parser.add_argument(
+        "--layout", choices=LAYOUTS, help="Output folder layout (default: flat)"
+    )
+    parser.add_argument(
+        "--archive", choices=ARCHIVES, help="Write into zip/tar archives, not loose files"
+    )
+    parser.add_argument(
+        "--archive-max-mb", type=int, metavar="MB", help="Size cap per archive (default: 2048)"
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE", help="Write a Chrome trace (chrome://tracing, Perfetto)"
+    )
+    _add_metrics_argument(parser)
+    for flag, help_text in (
+        ("--videos", "Download video streams instead of their cover images"),
+        ("--skip-remux", "Keep raw .ts streams instead of remuxing to MP4"),
+        ("--ensure-alt", "Drop media without alt text"),
+        ("--caption-from-title", "Use the pin title as the caption"),
+        ("--save-cache", "Save scraped records to a metadata cache JSON"),
+        ("--skip-download", "Scrape and save the cache only"),
+        ("--dry-run", "Report total size and expected time instead of downloading"),
+        ("--probe", "Check each image's real resolution from its header before downloading"),
+        ("--skip-existing", "Don't re-download files already in the output folder"),
+        ("--verify", "Check each downloaded file's integrity and re-fetch corrupt ones"),
+        ("--resume", "Checkpoint the scrape so an interrupted one can continue"),
+    ):
+        parser.add_argument(flag, action=argparse.BooleanOptionalAction, help=help_text)
+    parser.add_argument(
+        "--json", action="store_true", help="Emit JSON-lines events instead of text"
+    )
+    parser.add_argument(
+        "--no-history", action="store_true", help="Don't record this run in the run history"
+    )
+    parser.set_defaults(handler=run_command)
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    from core.service import serve
+
+    if args.host not in ("127.0.0.1", "localhost", "::1"):
+        # There is no authentication: anyone who can reach the port can start downloads.
+        print(f"[warn] Serving on {args.host}; the API is unauthenticated.", file=sys.stderr)
+    server = serve(args.host, args.port)
+    if args.prewarm:
+        sessions = server.service.sessions
+        threading.Thread(
+            target=sessions.prewarm, args=(_DEFAULTS["timeout"], args.cookies), daemon=True
+        ).start()
+    print(f"Listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return EXIT_OK
+
+
+def _add_serve_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "serve", help="Accept jobs over a local HTTP API and stream events (SSE)"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: localhost)")
+    parser.add_argument("--port", type=int, default=8765, help="Bind port (default: 8765)")
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="Open connections to Pinterest and its CDN before the first job",
+    )
+    parser.add_argument("--cookies", help="Cookies JSON the prewarmed sessions are built for")
+    _add_metrics_argument(parser)
+    parser.set_defaults(handler=serve_command)
+
+
+def watch_command(args: argparse.Namespace) -> int:
+    from core import watch
+
+    sink = JsonLinesSink() if args.json else TerminalSink()
+    try:
+        # num only has to validate: a check syncs every pin above the board's cursor.
+        boards = watch.load_boards(args.boards, _DEFAULTS)
+        cursors = watch.CursorStore(args.state or watch.default_state_path())
+        store = None if args.no_history else history.HistoryStore(history.default_path())
+        watcher = watch.Watcher(boards, sink, cursors, args.rate, args.jitter, store)
+    except (OSError, ValueError, KeyError) as e:
+        sink(events.error(str(e)))
+        return EXIT_ERROR
+
+    sink(events.log("info", f"Watching {len(boards)} board(s); Ctrl+C to stop."))
+    # Same shape as run_command: the watcher runs on a worker thread so Ctrl+C on the
+    # main thread can stop it cooperatively between (or during) downloads.
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop, args.once), daemon=True)
+    thread.start()
+    while thread.is_alive():
+        try:
+            thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            if stop.is_set():
+                return EXIT_CANCELLED  # second Ctrl+C: abandon in-flight downloads
+            stop.set()
+    return EXIT_OK
+
+
+def _add_watch_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "watch", help="Keep a list of boards mirrored, downloading new pins as they appear"
+    )
+    parser.add_argument("boards", help="JSON file listing the boards and their intervals")
+    parser.add_argument(
+        "--state", help="Cursor file (default: watch.json in the user state dir)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=30.0,
+        help="Pinterest API requests per minute across all boards (default: 30)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.1,
+        help="Randomize each interval by up to this fraction (default: 0.1)",
+    )
+    parser.add_argument("--once", action="store_true", help="Check every board once and exit")
+    parser.add_argument(
+        "--json", action="store_true", help="Emit JSON-lines events instead of text"
+    )
+    parser.add_argument(
+        "--no-history", action="store_true", help="Don't record syncs in the run history"
+    )
+    _add_metrics_argument(parser)
+    parser.set_defaults(handler=watch_command)
+
+
+def relayout_command(args: argparse.Namespace) -> int:
+    from core import layout
+
+    root = Path(args.dir)
+    if not root.is_dir():
+        print(f"[error] Not a directory: {root}", file=sys.stderr)
+        return EXIT_ERROR
+    counts = layout.migrate(root, args.to, dry_run=args.dry_run)
+    verb = "Would move" if args.dry_run else "Moved"
+    print(
+        f"{verb} {counts['moved']} files; {counts['in_place']} already in place, "
+        f"{counts['conflicts']} left because the destination exists, "
+        f"{counts['ignored']} not named after a pin."
+    )
+    return EXIT_OK
+
+
+def _add_relayout_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "relayout", help="Move an existing output folder's files into another layout"
+    )
+    parser.add_argument("dir", help="Output folder to reorganize")
+    parser.add_argument("--to", choices=LAYOUTS, required=True, help="Target layout")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what would be moved"
+    )
+    parser.set_defaults(handler=relayout_command)
+
+
+def history_command(args: argparse.Namespace) -> int:
+    store = history.HistoryStore(args.file or history.default_path())
+    if args.action == "list":
+        records = store.recent(args.limit)
+        print(json.dumps(records, indent=2) if args.json else history.format_table(records))
+        return EXIT_OK
+    expected = 1 if args.action == "show" else 2
+    if len(args.ids) != expected:
+        print(f"[error] {args.action} needs {expected} run id(s)", file=sys.stderr)
+        return EXIT_ERROR
+    try:
+        if args.action == "show":
+            result: object = store.get(args.ids[0])
+            if result is None:
+                raise KeyError(args.ids[0])
+        else:
+            result = store.compare(*args.ids)
+    except KeyError as e:
+        print(f"[error] No such run (or ambiguous id prefix): {e.args[0]}", file=sys.stderr)
+        return EXIT_ERROR
+    if args.json or args.action == "show":
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{'metric':<22} {result['base']:>14} {result['other']:>14}  change")
+        for name, metric in result["metrics"].items():
+            change = "n/a" if metric["change_pct"] is None else f"{metric['change_pct']:+.1f}%"
+            print(f"{name:<22} {metric['base']:>14.3f} {metric['other']:>14.3f}  {change}")
+    return EXIT_OK
+
+
+def _add_history_parser(subparsers) -> None:
+    parser = subparsers.add_parser("history", help="List, show or compare past runs")
+    parser.add_argument("action", choices=["list", "show", "compare"])
+    parser.add_argument("ids", nargs="*", help="Run ids or unique id prefixes")
+    parser.add_argument("-n", "--limit", type=int, default=20, help="Runs to list")
+    parser.add_argument("--file", help="History file (default: PDL_HISTORY or user state dir)")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON")
+    parser.set_defaults(handler=history_command)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pinterest-dl-gui", description="Headless Pinterest downloader"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_run_parser(subparsers)
+    _add_serve_parser(subparsers)
+    _add_watch_parser(subparsers)
+    _add_relayout_parser(subparsers)
+    _add_history_parser(subparsers)
+    args = parser.parse_args(argv)
+    if getattr(args, "metrics", None) is not None:
+        from core import metrics
+
+        try:
+            server = metrics.serve(args.metrics)
+        except OSError as e:  # port taken or privileged: the run goes ahead without metrics
+            print(f"[warn] Metrics disabled: port {args.metrics}: {e}", file=sys.stderr)
+        else:
+            port = server.server_address[1]
+            print(f"Metrics on http://127.0.0.1:{port}/metrics", file=sys.stderr)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # a frozen build's shard processes start here (core.shards)
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Archive output: downloads streamed into a rolling set of size-capped zip or tar files,
+each ending with a manifest that works as a Download-mode cache.
+"""
+
+import json
+import os
+import queue
+import re
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+from . import tracing
+from .atomic import fsync_dir, fsync_file, temp_path
+from .media_store import cache_record
+from .scrape_config import ScrapeConfig
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+
+ARCHIVE_FORMATS = {"zip": ".zip", "tar": ".tar"}
+MANIFEST = "manifest.json"
+_PART = re.compile(r"^(?P<stem>.+)_(?P<part>\d{4})$")
+# Files queued for the writer at most; past this, download callbacks wait for it.
+_BACKLOG = 64
+
+
+def archive_stem(config: ScrapeConfig) -> str:
+    """A file-name stem for the run's archives: the board path, query or cache name."""
+    if config.mode == "download":
+        return Path(config.url).stem
+    if config.mode == "search":
+        text = "search " + config.url
+    else:
+        text = " ".join(part for part in urlsplit(config.url).path.split("/") if part)
+    return re.sub(r"[^\w-]+", "_", text).strip("_") or "pins"
+
+
+class ArchiveWriter:
+    """Single writer thread appending staged files to rolling archives.
+
+    add() may be called from any thread; it blocks when the writer falls _BACKLOG files
+    behind. close() flushes the queue, writes the last manifest and returns the
+    archives written. A write error stops the writer and is re-raised by the next add()
+    or by close().
+    """
+
+    def __init__(self, output_dir: Path, stem: str, fmt: str, max_bytes: int) -> None:
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Invalid archive format: {fmt!r}")
+        self.output_dir = output_dir
+        self.stem = stem
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.archives: list[Path] = []
+        self._queue: queue.Queue[tuple | None] = queue.Queue(maxsize=_BACKLOG)
+        self._error: BaseException | None = None
+        self._archive: zipfile.ZipFile | tarfile.TarFile | None = None
+        self._path = output_dir  # the open part's final name and the temp name it is
+        self._temp = output_dir  # written under; both set by _open()
+        self._size = 0
+        self._manifest: list[dict[str, Any]] = []
+        self._thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, media: "PinterestMedia", arcname: str, sidecars: dict[str, bytes]) -> None:
+        """Queue `media`'s staged file (its local_path) to be stored as `arcname`."""
+        if self._error is not None:
+            raise self._error
+        self._queue.put((media.local_path, arcname, sidecars, cache_record(media)))
+
+    def close(self) -> list[Path]:
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.archives
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                item[0].unlink(missing_ok=True)  # drain; the staging folder goes anyway
+                continue
+            try:
+                with tracing.span("archive", "io", file=item[1]):
+                    self._write(*item)
+            except BaseException as e:
+                self._error = e
+        try:
+            self._finish()
+        except BaseException as e:
+            self._error = self._error or e
+
+    def _write(self, path: Path, arcname: str, sidecars: dict[str, bytes], record: dict) -> None:
+        size = path.stat().st_size + sum(len(data) for data in sidecars.values())
+        if self._archive is not None and self._size + size > self.max_bytes:
+            self._finish()  # roll over; an oversized file still gets an archive of its own
+        if self._archive is None:
+            self._open()
+        self._add_file(path, arcname)
+        for name, data in sidecars.items():
+            self._add_bytes(name, data)
+        path.unlink()
+        self._size += size
+        record["file"] = arcname
+        self._manifest.append(record)
+
+    def _open(self) -> None:
+        part = len(self.archives) + 1
+        self._path = self.output_dir / f"{self.stem}_{part:04d}{ARCHIVE_FORMATS[self.fmt]}"
+        # Written under a temp name until its manifest is in (core.atomic), so a crash
+        # never leaves a part that looks finished but has no central directory.
+        self._temp = temp_path(self._path)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "zip":
+            # Media is already compressed; deflating it again costs CPU for ~nothing.
+            self._archive = zipfile.ZipFile(self._temp, "w", zipfile.ZIP_STORED)
+        else:
+            self._archive = tarfile.open(self._temp, "w")
+        self._size = 0
+        self._manifest = []
+
+    def _add_file(self, path: Path, arcname: str) -> None:
+        if isinstance(self._archive, zipfile.ZipFile):
+            self._archive.write(path, arcname)
+        else:
+            self._archive.add(path, arcname)
+
+    def _add_bytes(self, name: str, data: bytes) -> None:
+        if isinstance(self._archive, zipfile.ZipFile):
+            self._archive.writestr(name, data, zipfile.ZIP_DEFLATED)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            with tempfile.SpooledTemporaryFile() as buffer:
+                buffer.write(data)
+                buffer.seek(0)
+                self._archive.addfile(info, buffer)
+
+    def _finish(self) -> None:
+        if self._archive is None:
+            return
+        self._add_bytes(MANIFEST, json.dumps(self._manifest, indent=4).encode("utf-8"))
+        self._archive.close()
+        self._archive = None
+        fsync_file(self._temp)
+        os.replace(self._temp, self._path)
+        fsync_dir(self.output_dir)
+        self.archives.append(self._path)
+
+
+def is_archive(path: Path) -> bool:
+    return path.suffix.lower() in ARCHIVE_FORMATS.values()
+
+
+def archive_set(path: Path) -> list[Path]:
+    """All parts of the rolling set `path` belongs to, in order (just `path` if none)."""
+    match = _PART.match(path.stem)
+    if match is None:
+        return [path]
+    pattern = re.compile(re.escape(match["stem"]) + r"_\d{4}" + re.escape(path.suffix) + "$")
+    return sorted(p for p in path.parent.iterdir() if pattern.match(p.name))
+
+
+def read_manifest(path: Path) -> list[dict[str, Any]]:
+    """The manifest records of one archive. Raises ValueError if it has none."""
+    try:
+        if path.suffix.lower() == ".zip":
+            with zipfile.ZipFile(path) as archive:
+                data = archive.read(MANIFEST)
+        else:
+            with tarfile.open(path) as archive:
+                member = archive.extractfile(MANIFEST)
+                if member is None:
+                    raise KeyError(MANIFEST)
+                data = member.read()
+    except KeyError:
+        raise ValueError(f"{path.name} has no {MANIFEST}; was it written by archive mode?")
+    return json.loads(data)
+
+
+def cleanup_staging(staging: Path) -> None:
+    shutil.rmtree(staging, ignore_errors=True)
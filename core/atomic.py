@@ -0,0 +1,184 @@
+"""Atomic output files: written under a temp name and renamed into place once whole, with
+the fsyncs batched off the download threads (Flusher).
+"""
+
+import os
+import secrets
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+from . import tracing
+
+PARTIAL_DIR = ".pdl-partial"
+TEMP_SUFFIX = ".pdl-tmp"
+_ARCHIVE_STAGING = ".staging-"  # runner._download_target's prefix
+_BATCH = 64
+_DELAY = 0.25  # seconds a finished file may wait for its batch
+# Older than this and a temp file can't belong to a live run: a download that stops
+# writing for this long has long since hit its request timeout.
+_STALE_SECONDS = 15 * 60
+
+
+def temp_path(path: Path) -> Path:
+    """A unique hidden temp name next to `path`, for writing it before the rename."""
+    return path.with_name(f".{path.name}.{secrets.token_hex(4)}{TEMP_SUFFIX}")
+
+
+def fsync_file(path: Path) -> None:
+    # Windows' FlushFileBuffers needs a handle with write access.
+    fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(path: Path) -> None:
+    """Make the renames into `path` durable; a no-op on Windows, where NTFS journals them."""
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(
+    path: Path, mode: str = "w", encoding: str | None = None, durable: bool = True
+) -> Iterator[IO]:
+    """Open a temp file that replaces `path` when the block exits cleanly.
+
+    If the block raises, the temp file is removed and `path` is left as it was.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = temp_path(path)
+    try:
+        with open(temp, mode, encoding=encoding) as f:
+            yield f
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    if durable:
+        fsync_dir(path.parent)
+
+
+class Flusher:
+    """Background thread that syncs finished temp files and renames them into place.
+
+    commit() may be called from any thread. It returns a Future that resolves to the
+    final path once the file is durable under its final name, or holds the error.
+    close() commits whatever is still queued and stops the thread.
+    """
+
+    def __init__(self, batch: int = _BATCH, delay: float = _DELAY) -> None:
+        self.batch = batch
+        self.delay = delay
+        self._pending: list[tuple[Path, Path, Future]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="flusher", daemon=True)
+        self._thread.start()
+
+    def commit(self, temp: Path, final: Path) -> "Future[Path]":
+        future: Future[Path] = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Flusher is closed")
+            self._pending.append((temp, final, future))
+            self._cond.notify()
+        return future
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return  # closed and drained
+                deadline = time.monotonic() + self.delay
+                while len(self._pending) < self.batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+            self._flush(batch)
+
+    def _flush(self, batch: list[tuple[Path, Path, Future]]) -> None:
+        done: list[tuple[Path, Future]] = []
+        folders: set[Path] = set()
+        with tracing.span("flush", "io", files=len(batch)):
+            for temp, final, future in batch:
+                try:
+                    fsync_file(temp)
+                    final.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(temp, final)
+                except BaseException as e:
+                    future.set_exception(e)
+                    continue
+                folders.add(final.parent)
+                done.append((final, future))
+            for folder in folders:
+                try:
+                    fsync_dir(folder)
+                except OSError:
+                    pass  # the files are in place; only their rename's durability is at stake
+        for final, future in done:
+            future.set_result(final)
+
+
+def _stale(path: Path, cutoff: float) -> bool:
+    try:
+        return path.stat().st_mtime < cutoff
+    except OSError:
+        return False
+
+
+def sweep(root: Path) -> int:
+    """Remove temp files and partial downloads left in `root` by runs that crashed.
+
+    Checks `root` and its layout shard folders. Only entries untouched for
+    _STALE_SECONDS are removed, so another run writing to the same folder (a sharded
+    download's other processes, say) keeps its files. Returns how many were removed.
+    """
+    cutoff = time.time() - _STALE_SECONDS
+    removed = 0
+    folders = [root]
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        path = Path(entry.path)
+        if entry.is_dir() and entry.name.startswith(_ARCHIVE_STAGING):
+            if _stale(path, cutoff):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        elif entry.is_dir() and (entry.name == PARTIAL_DIR or len(entry.name) == 2):
+            folders.append(path)
+    for folder in folders:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                path = Path(entry.path)
+                temp = entry.name.endswith(TEMP_SUFFIX) or folder.name == PARTIAL_DIR
+                if entry.is_file() and temp and _stale(path, cutoff):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+    return removed
@@ -0,0 +1,106 @@
+"""Scrape checkpoints: a scrape's position saved after every page, so an interrupted
+scrape of the same source can resume from it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+from . import history
+from .atomic import atomic_write, fsync_dir
+from .media_store import cache_record
+from .scrape_config import ScrapeConfig
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+
+_VERSION = 1
+_MAX_AGE = 24 * 60 * 60  # seconds
+# The pagination bookmarks after the last saved page and how many lines of _RECORDS they
+# cover; replaced atomically once the records are synced.
+_STATE = "state.json"
+_RECORDS = "records.jsonl"  # one cache record per pin collected, appended page by page
+
+
+def checkpoint_dir() -> Path:
+    return history.state_dir() / "checkpoints"
+
+
+def source_key(config: ScrapeConfig) -> str:
+    """What makes two scrapes the same source, as a short stable hash."""
+    source = [
+        config.mode,
+        config.url.strip(),
+        list(config.min_resolution),
+        config.caption_from_title,
+        config.ensure_alt,
+        config.cookies or "",
+    ]
+    return hashlib.sha1(json.dumps(source).encode("utf-8")).hexdigest()[:16]
+
+
+class ScrapeCheckpoint:
+    """The saved position of one source's scrape."""
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+        # What load() found to resume from; empty means the scrape starts at page one.
+        self.bookmarks: list[str] = []
+        self.records: list[dict[str, Any]] = []
+        self._collected = 0
+
+    @classmethod
+    def for_config(cls, config: ScrapeConfig, root: Path | None = None) -> "ScrapeCheckpoint":
+        return cls((root or checkpoint_dir()) / source_key(config))
+
+    def load(self) -> int:
+        """Read the saved position into bookmarks and records; returns the pins restored."""
+        try:
+            state = json.loads((self.folder / _STATE).read_text(encoding="utf-8"))
+            if state.get("version") != _VERSION or time.time() - state["updated"] > _MAX_AGE:
+                return 0
+            bookmarks = [str(bookmark) for bookmark in state["bookmarks"]]
+            collected = int(state["collected"])
+            records = []
+            with open(self.folder / _RECORDS, "rb+") as f:
+                for _ in range(collected):
+                    records.append(json.loads(f.readline()))
+                f.truncate(f.tell())  # lines written after the last state.json
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+        self.bookmarks, self.records = bookmarks, records
+        self._collected = len(records)
+        return len(records)
+
+    def save(self, media: Sequence["PinterestMedia"], bookmarks: list[str]) -> None:
+        """Record one finished page: its new pins and the bookmarks that follow it."""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        records = self.folder / _RECORDS
+        mode = "ab" if self._collected else "wb"
+        if mode == "wb":
+            (self.folder / _STATE).unlink(missing_ok=True)  # it describes the old records
+        with open(records, mode) as f:
+            for item in media:
+                f.write(json.dumps(cache_record(item)).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if mode == "wb":
+            fsync_dir(self.folder)
+        self._collected += len(media)
+        state = {
+            "version": _VERSION,
+            "bookmarks": bookmarks,
+            "collected": self._collected,
+            "updated": time.time(),
+        }
+        with atomic_write(self.folder / _STATE, encoding="utf-8") as f:
+            json.dump(state, f)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.folder, ignore_errors=True)
+        self.bookmarks, self.records = [], []
+        self._collected = 0
@@ -0,0 +1,76 @@
+"""Download scheduling: the priority policies that pick which pin run_download submits next."""
+
+import heapq
+import itertools
+import math
+from collections.abc import Iterator, Sequence
+from typing import TYPE_CHECKING
+
+from .scrape_config import DOWNLOAD_ORDERS
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+
+# API scrapes set each pin's origin to its own pin page, which says nothing about where
+# it was found; those pins all count as one source for round_robin.
+_PIN_PAGE = "https://www.pinterest.com/pin/"
+
+
+def _is_video(media: "PinterestMedia", download_videos: bool) -> bool:
+    # Without video downloads a pin with a stream still saves its (small) cover image.
+    return download_videos and media.video_stream is not None
+
+
+def _size_key(media: "PinterestMedia", download_videos: bool) -> tuple[int, float]:
+    """Smallest expected download first.
+
+    Pins a pre-flight has sized (core.preflight, stored in the cache) go by bytes; the
+    rest follow, images by pixel area and then videos by duration. Unknown sizes sort
+    last within their kind rather than being treated as tiny.
+    """
+    size = getattr(media, "size", None)
+    if size is not None:
+        return 0, size
+    if _is_video(media, download_videos):
+        return 2, media.video_stream.duration or math.inf
+    width, height = media.resolution or (0, 0)
+    return 1, width * height or math.inf
+
+
+def _source(media: "PinterestMedia") -> str:
+    origin = media.origin or ""
+    return "" if origin.startswith(_PIN_PAGE) else origin
+
+
+def _keys(
+    media_list: Sequence["PinterestMedia"], order: str, download_videos: bool
+) -> list[tuple]:
+    if order == "images_first":
+        return [(_is_video(m, download_videos), i) for i, m in enumerate(media_list)]
+    if order == "smallest_first":
+        return [(*_size_key(m, download_videos), i) for i, m in enumerate(media_list)]
+    if order == "round_robin":
+        # The n-th pin of every source before the (n+1)-th of any; sources in the order
+        # they first appear.
+        ranks: dict[str, itertools.count] = {}
+        sources: dict[str, int] = {}
+        keys = []
+        for i, m in enumerate(media_list):
+            source = _source(m)
+            rank = next(ranks.setdefault(source, itertools.count()))
+            keys.append((rank, sources.setdefault(source, len(sources)), i))
+        return keys
+    raise ValueError(f"Invalid download order: {order!r}")
+
+
+def ordered(
+    media_list: Sequence["PinterestMedia"], order: str, download_videos: bool
+) -> Iterator["PinterestMedia"]:
+    """Yield `media_list` in `order` (one of DOWNLOAD_ORDERS), popping from a heap."""
+    if order == DOWNLOAD_ORDERS[0]:  # scrape order: nothing to rank
+        yield from media_list
+        return
+    heap = _keys(media_list, order, download_videos)
+    heapq.heapify(heap)
+    while heap:
+        yield media_list[heapq.heappop(heap)[-1]]
@@ -1,49 +1,245 @@
 import base64
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from contextlib import closing, contextmanager
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
-from typing import Callable, List, Optional, Sequence
+from typing import (
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from PIL import Image
 from pinterest_dl import ApiScraper, PinterestMedia
+from pinterest_dl.api.bookmark_manager import BookmarkManager
 from pinterest_dl.common import io
-from pinterest_dl.download import MediaDownloader
+from pinterest_dl.download import MediaDownloader, request_builder
+from pinterest_dl.exceptions import EmptyResponseError
 from pinterest_dl.scrapers import operations
 
+from . import metrics, tracing
+from .archive import archive_set, is_archive, read_manifest
+from .atomic import PARTIAL_DIR, Flusher, atomic_write, temp_path
+from .checkpoint import ScrapeCheckpoint
+from .download_order import ordered
+from .hls import ConcurrencyBudget, download_media
+from .layout import OutputIndex, expected_names, media_dir
+from .media_store import MediaStore, cache_record
 from .scrape_config import ScrapeConfig
+from .verify import CorruptFileError, Verifier
+
+# pinterest_dl's download logger, so events.forward_logs relays verification warnings too.
+logger = logging.getLogger("pinterest_dl.download")
+scrape_logger = logging.getLogger("pinterest_dl.scrape")
+# Checker threads beside the download workers; the checks are cheap next to a download.
+_CHECKERS = 4
+# Fresh downloads of a file that keeps failing verification before it counts as failed.
+_REFETCHES = 2
+_PAGE_SIZE = 50  # the most pins Pinterest's resource API returns per request
+_EMPTY_PAGES = 3  # consecutive empty board pages before a board scrape gives up
+_IDLE_SECONDS = 0.1  # longest run_download waits before calling on_idle
+
+
+def _collect(
+    source: Iterator[PinterestMedia],
+    num: int,
+    on_progress: Optional[Callable[[PinterestMedia], None]],
+) -> MediaStore:
+    # The library's scrape()/search() build a full PinterestMedia list; draining its
+    # iterators instead lets each pin be compacted as soon as it is reported.
+    store = MediaStore()
+    for media in itertools.islice(source, num):
+        store.append(media)
+        if on_progress is not None:
+            on_progress(media)
+    return store
+
+
+def _pages(
+    scraper: ApiScraper, config: ScrapeConfig, bookmarks: List[str]
+) -> Iterator[Tuple[List[PinterestMedia], List[str]]]:
+    """A scrape or search page by page, each with the bookmarks that fetch the next one.
+
+    The same paging as the library's iter_scrape and iter_search, which can only start
+    at page one. This one starts at `bookmarks`, so a checkpointed scrape can resume.
+    Empty `bookmarks` means page one, where a pin URL's own pin comes first. Pages are
+    not de-duplicated here; _collect_pages does that, including across a resume.
+    The last page's bookmarks hold "-end-"; pages that stop without it were cut short.
+    """
+    min_resolution = config.min_resolution
+    caption = config.caption_from_title
+    depth = 3  # bookmarks sent with each request, as the library does
+    retry_empty = False
+    query = config.url if config.mode == "search" else None
+    if query is None:
+        api = scraper._create_api(config.url)
+        query = api.query  # a search URL given to scrape mode
+    if query is not None:
+        if " " in query:
+            query = request_builder.url_encode(query)
+        scrape_logger.info(f"Starting search scrape for query: '{query}'")
+        api = scraper._create_api(f"https://www.pinterest.com/search/pins/?q={query}&rs=typed")
+        depth = 1
+
+        def fetch(manager: BookmarkManager):
+            return scraper._search_images(
+                api, _PAGE_SIZE, manager, min_resolution, caption_from_title=caption
+            )
+
+    elif api.is_pin:
+        if not bookmarks:
+            main = scraper._scrape_one_pin(api, min_resolution, caption)
+            yield ([main] if main is not None else []), []
+
+        def fetch(manager: BookmarkManager):
+            return scraper._get_images(
+                api, _PAGE_SIZE, manager, min_resolution, caption_from_title=caption
+            )
+
+    elif api.is_section:
+        if not api.section_slug:
+            scrape_logger.error("Section slug is not set in the API client")
+            return
+        board_id = api.get_board().get_board_id()
+        section_id = api.get_section_id_by_slug(board_id, api.section_slug)
+        if not section_id:
+            scrape_logger.warning(f"Section '{api.section_slug}' not found in board")
+            return
+        scrape_logger.info(f"Scraping section '{api.section_slug}' (ID: {section_id})")
+
+        def fetch(manager: BookmarkManager):
+            return scraper._get_section_images(
+                api, section_id, _PAGE_SIZE, manager, min_resolution, caption_from_title=caption
+            )
+
+    else:
+        board = api.get_board()
+        board_id = board.get_board_id()
+        scrape_logger.info(f"Scraping board (ID: {board_id}) with {board.get_pin_count()} pins")
+        retry_empty = True
+
+        def fetch(manager: BookmarkManager):
+            return scraper._get_images_with_retry(
+                api, _PAGE_SIZE, manager, min_resolution, board_id, caption
+            )
+
+    manager = BookmarkManager(depth)
+    manager.add_all(bookmarks)
+    empty = 0
+    while "-end-" not in manager.get():  # "-end-" marks the last page
+        try:
+            page, manager = fetch(manager)
+        except EmptyResponseError as e:
+            empty += 1
+            if not retry_empty or empty >= _EMPTY_PAGES:
+                scrape_logger.warning(f"Scraping interrupted: {e}")
+                return
+            time.sleep(config.delay)
+            continue
+        except ValueError as e:
+            scrape_logger.warning(f"Scraping interrupted: {e}")
+            return
+        empty = 0
+        yield page, list(manager.get())
+        if "-end-" not in manager.get():
+            time.sleep(config.delay)
+
+
+def _collect_pages(
+    checkpoint: ScrapeCheckpoint,
+    pages: Iterator[Tuple[List[PinterestMedia], List[str]]],
+    num: int,
+    on_progress: Optional[Callable[[PinterestMedia], None]],
+) -> MediaStore:
+    """_collect for a checkpointed scrape: restored pins first, then saved page by page.
+
+    The checkpoint is removed once the scrape finishes: `num` pins are collected, or a
+    page's bookmarks say it was the last. Pages that stop without that (_pages gives up
+    after an API error), a cancel (on_progress raising) or any other error leave it in
+    place for the next run.
+    """
+    store = MediaStore()
+    seen = set()
+    finished = "-end-" in checkpoint.bookmarks  # saved after the last page, then interrupted
+    records, checkpoint.records = checkpoint.records[:num], []
+    records.reverse()  # popped from the front, as in load_cache
+    while records:
+        record = records.pop()
+        store.add_dict(record)
+        seen.add(record["src"])
+        if on_progress is not None:
+            on_progress(store[len(store) - 1])
+    if len(store) < num:
+        for page, bookmarks in pages:
+            fresh = []
+            for media in page:
+                if media.src in seen:
+                    continue
+                seen.add(media.src)
+                store.append(media)
+                fresh.append(media)
+                if on_progress is not None:
+                    on_progress(media)
+                if len(store) >= num:
+                    break
+            if len(store) >= num:
+                break
+            checkpoint.save(fresh, bookmarks)
+            finished = "-end-" in bookmarks
+    if finished or len(store) >= num:
+        checkpoint.clear()
+    return store
 
 
 def run_api_scrape(
     scraper: ApiScraper,
     config: ScrapeConfig,
     on_progress: Optional[Callable[[PinterestMedia], None]],
-) -> List[PinterestMedia]:
-    """Run a pinterest-dl scrape operation"""
-    return scraper.scrape(
+    checkpoint: Optional[ScrapeCheckpoint] = None,
+) -> MediaStore:
+    """Run a pinterest-dl scrape operation, resuming from `checkpoint` if it was loaded"""
+    if checkpoint is not None:
+        pages = _pages(scraper, config, checkpoint.bookmarks)
+        return _collect_pages(checkpoint, pages, config.num, on_progress)
+    source = scraper.iter_scrape(
         url=config.url,
-        num=config.num,
         min_resolution=config.min_resolution,
         delay=config.delay,
         caption_from_title=config.caption_from_title,
-        on_progress=on_progress,
     )
+    return _collect(source, config.num, on_progress)
 
 
 def run_api_search(
     scraper: ApiScraper,
     config: ScrapeConfig,
     on_progress: Optional[Callable[[PinterestMedia], None]],
-) -> List[PinterestMedia]:
-    """Run a pinterest-dl search operation"""
-    return scraper.search(
+    checkpoint: Optional[ScrapeCheckpoint] = None,
+) -> MediaStore:
+    """Run a pinterest-dl search operation, resuming from `checkpoint` if it was loaded"""
+    if checkpoint is not None:
+        pages = _pages(scraper, config, checkpoint.bookmarks)
+        return _collect_pages(checkpoint, pages, config.num, on_progress)
+    source = scraper.iter_search(
         query=config.url,  # search mode repurposes the url field to carry the query string
-        num=config.num,
         min_resolution=config.min_resolution,
         delay=config.delay,
         caption_from_title=config.caption_from_title,
-        on_progress=on_progress,
     )
+    return _collect(source, config.num, on_progress)
 
 
 def resolve_cache_path(cache_path: str | None, output_dir: str) -> Path:
@@ -67,16 +263,37 @@ def resolve_cache_path(cache_path: str | None, output_dir: str) -> Path:
 
 
 def save_cache(media_list: Sequence[PinterestMedia], path: Path) -> None:
-    """Serialize scraped media records to JSON for later reuse by download mode."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    io.write_json([media.to_dict() for media in media_list], str(path), indent=4)
+    """Serialize scraped media records to JSON for later reuse by download mode.
+
+    Written one record at a time, so a MediaStore is never expanded into a full list
+    of dicts; the output matches json.dump(..., indent=4) of that list. The file is
+    replaced atomically, so a crash mid-write leaves the previous cache intact.
+    """
+    with atomic_write(path) as f:
+        f.write("[")
+        for index, media in enumerate(media_list):
+            record = json.dumps(cache_record(media), indent=4).replace("\n", "\n    ")
+            f.write(("," if index else "") + "\n    " + record)
+        f.write("\n]" if media_list else "]")
 
 
-def load_cache(path: Path) -> List[PinterestMedia]:
-    """Rebuild media records from a previously saved cache JSON."""
-    raw = io.read_json(str(path))
-    records = raw if isinstance(raw, list) else [raw]
-    return [PinterestMedia.from_dict(record) for record in records]
+def load_cache(path: Path) -> MediaStore:
+    """Rebuild media records from a previously saved cache JSON.
+
+    An archive written by archive mode also works: the manifests of every part of its
+    rolling set are read, in order.
+    """
+    if is_archive(path):
+        records = [r for part in archive_set(path) for r in read_manifest(part)]
+    else:
+        raw = io.read_json(str(path))
+        records = raw if isinstance(raw, list) else [raw]
+    store = MediaStore()
+    # Pop from the front as we go, so parsed dicts are freed while the store fills.
+    records.reverse()
+    while records:
+        store.add_dict(records.pop())
+    return store
 
 
 def run_download(
@@ -89,6 +306,13 @@ def run_download(
     on_file_downloaded: Callable[[int, PinterestMedia], None],
     on_file_failed: Callable[[int, PinterestMedia, Exception], None],
     should_cancel: Callable[[], bool],
+    on_active: Optional[Callable[[int], None]] = None,
+    order: str = "scrape",
+    layout: str = "flat",
+    existing: Optional[OutputIndex] = None,
+    on_file_skipped: Optional[Callable[[int, PinterestMedia], None]] = None,
+    verifier: Optional[Verifier] = None,
+    on_idle: Optional[Callable[[], None]] = None,
 ) -> List[Path]:
     """Download scraped media concurrently, reporting completions on the calling thread.
 
@@ -99,62 +323,294 @@ def run_download(
     A single file failing is reported via on_file_failed and skipped, so one bad pin does
     not abort the batch. Cancellation drops un-started downloads; in-flight ones run to
     completion since a blocking download can't be interrupted.
+
+    `on_active`, if given, is the one callback that runs on worker threads: it receives
+    the number of downloads in flight each time one starts (for peak-concurrency stats).
+
+    Every download holds one slot of a ConcurrencyBudget of `max_workers`; an HLS video
+    also borrows whichever slots are idle to fetch its segments in parallel (core.hls).
+    Files are downloaded into a hidden partial folder and a Flusher (core.atomic) moves
+    them to their final names once synced, so a final name never holds a partial file.
+
+    `order` picks which pins are submitted first (see core.download_order); only a small
+    window is ever queued, so an ordering takes effect as soon as workers free up.
+
+    Files go into `layout` under output_dir (see core.layout). With an `existing` index,
+    a pin whose file is already there is not downloaded: it gets that file as its local
+    path and is reported through on_file_skipped, on the calling thread like the rest.
+
+    With a `verifier` (core.verify), every downloaded file -- and every existing file it
+    has not already verified -- is checked on a separate small pool while downloads go
+    on. Only files that pass are reported; a corrupt one is deleted and downloaded again,
+    up to _REFETCHES times, before it is reported failed with a CorruptFileError.
+
+    `on_idle`, if given, is called on the calling thread after each batch of completions
+    and at least every _IDLE_SECONDS while nothing completes, for work the caller hands
+    back to this thread (core.previews' media events).
     """
     downloaded_paths: List[Path] = []
     if not media_list:
         return downloaded_paths
 
-    completed = 0
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_media = {
-            executor.submit(
-                downloader.download, media, output_dir, download_videos, skip_remux
-            ): media
-            for media in media_list
-        }
-        for future in as_completed(future_to_media):
+    active = 0
+    active_lock = threading.Lock()
+    budget = ConcurrencyBudget(max_workers)
+    flusher = Flusher()
+    partial = output_dir / PARTIAL_DIR
+
+    def fetch(media: PinterestMedia) -> "Future[Path]":
+        nonlocal active
+        with budget.slot():
             if should_cancel():
-                # Drop everything not yet started; in-flight futures still finish as the
-                # `with` block waits on shutdown. cancel() is a no-op on running futures.
-                for pending in future_to_media:
-                    pending.cancel()
-                break
-            media = future_to_media[future]
-            completed += 1
+                # Waited for a slot through a cancel (the executor runs more fetches than
+                # there are slots); don't start a download nobody will report.
+                raise CancelledError()
+            metrics.IN_FLIGHT.inc()
+            if on_active is not None:
+                with active_lock:
+                    active += 1
+                    on_active(active)
             try:
-                result = future.result()
-            except Exception as e:
-                on_file_failed(completed, media, e)  # warn + advance progress, then move on
-                continue
-            media.set_local_path(result)  # captioning reads local_path to find the saved file
-            downloaded_paths.append(result)
-            on_file_downloaded(completed, media)  # drives download progress + live videos tally
+                with tracing.span("download", "network", id=str(media.id)):
+                    staged = download_media(
+                        downloader, media, partial, download_videos, skip_remux, budget
+                    )
+            except BaseException:
+                for name in expected_names(media, download_videos):
+                    (partial / name).unlink(missing_ok=True)
+                raise
+            finally:
+                metrics.IN_FLIGHT.dec()
+                if on_active is not None:
+                    with active_lock:
+                        active -= 1
+        # Synced and renamed into place by the flusher before it counts as downloaded;
+        # the run thread waits on that, so the worker moves straight on to the next pin.
+        target = media_dir(output_dir, str(media.id), layout) / staged.name
+        return flusher.commit(staged, target)
+
+    completed = 0
+    pending = ordered(media_list, order, download_videos)
+    refetch: Deque[Tuple[PinterestMedia, int]] = deque()  # (media, attempt) failing checks
+    # Only a few batches are queued ahead of the workers, so a MediaStore materializes a
+    # window of pins at a time rather than one future + PinterestMedia per pin up front.
+    window = max_workers * 4
+    # The budget and the flusher close after the executor has waited out its workers, so
+    # no fetch can still be borrowing from the one or committing to the other.
+    with (
+        _partial_folder(partial),
+        closing(budget),
+        closing(flusher),
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+        ThreadPoolExecutor(
+            max_workers=min(max_workers, _CHECKERS), thread_name_prefix="verify"
+        ) as checkers,
+    ):
+        # Download and commit futures -> (media, attempt); check futures -> (media, path,
+        # attempt), where attempt 0 is a file from a previous run that was never verified.
+        in_flight: Dict[Future, Tuple[PinterestMedia, int]] = {}
+        committing: Dict[Future, Tuple[PinterestMedia, int]] = {}
+        checking: Dict[Future, Tuple[PinterestMedia, Path, int]] = {}
+
+        def top_up() -> None:
+            nonlocal completed
+            while len(in_flight) + len(committing) + len(checking) < window and not should_cancel():
+                if refetch:
+                    media, attempt = refetch.popleft()
+                    in_flight[executor.submit(fetch, media)] = (media, attempt)
+                    continue
+                media = next(pending, None)
+                if media is None:
+                    return
+                found = existing.find(expected_names(media, download_videos)) if existing else None
+                if found is not None:
+                    if verifier is not None and not verifier.is_verified(found):
+                        checking[checkers.submit(verifier.check, media, found)] = (media, found, 0)
+                        continue
+                    completed += 1
+                    media.set_local_path(found)  # still captioned like a fresh download
+                    metrics.FILES["skipped"].inc()
+                    if on_file_skipped is not None:
+                        on_file_skipped(completed, media)
+                    continue
+                in_flight[executor.submit(fetch, media)] = (media, 1)
+
+        def checked(future: Future) -> None:
+            nonlocal completed
+            media, path, attempt = checking.pop(future)
+            try:
+                reason = future.result()
+            except Exception as e:  # the check itself broke; don't hold the file hostage
+                reason = None
+                logger.warning(f"Could not verify {path.name}: {type(e).__name__}: {e}")
+            if reason is None:
+                verifier.passed(path)
+                completed += 1
+                media.set_local_path(path)
+                if attempt == 0:
+                    metrics.FILES["skipped"].inc()
+                    if on_file_skipped is not None:
+                        on_file_skipped(completed, media)
+                    return
+                downloaded_paths.append(path)
+                metrics.FILES["downloaded"].inc()
+                on_file_downloaded(completed, media)
+                return
+            final = attempt > _REFETCHES
+            verifier.failed(path, final)
+            if final:
+                completed += 1
+                metrics.FILES["failed"].inc()
+                on_file_failed(completed, media, CorruptFileError(reason))
+                return
+            logger.warning(f"{path.name} is corrupt ({reason}); downloading it again")
+            metrics.RETRIES.inc()
+            refetch.append((media, attempt + 1))
+
+        def report_queue() -> None:
+            # Pins neither finished, downloading nor being checked are waiting for a worker.
+            if metrics.is_enabled():
+                busy = metrics.IN_FLIGHT.value + len(checking)
+                metrics.QUEUE_DEPTH.set(max(len(media_list) - completed - busy, 0))
+
+        top_up()
+        while in_flight or committing or checking:
+            report_queue()
+            waiting = [*in_flight, *committing, *checking]
+            timeout = _IDLE_SECONDS if on_idle is not None else None
+            finished, _ = wait(waiting, timeout=timeout, return_when=FIRST_COMPLETED)
+            for reported, future in enumerate(finished):
+                metrics.UNREPORTED.set(len(finished) - reported)
+                if should_cancel():
+                    # Drop everything not yet started; in-flight futures still finish as
+                    # the `with` block waits on shutdown. cancel() is a no-op on running ones.
+                    # Commits are left alone: the flusher resolves them as it closes.
+                    for queued in [*in_flight, *checking]:
+                        queued.cancel()
+                    return downloaded_paths
+                if future in checking:
+                    checked(future)
+                    continue
+                if future in in_flight:
+                    media, attempt = in_flight.pop(future)
+                    try:
+                        commit = future.result()
+                    except Exception as e:
+                        completed += 1
+                        metrics.FILES["failed"].inc()
+                        on_file_failed(completed, media, e)  # warn + advance progress, move on
+                        continue
+                    committing[commit] = (media, attempt)  # reported once it is in place
+                    continue
+                media, attempt = committing.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    completed += 1
+                    metrics.FILES["failed"].inc()
+                    on_file_failed(completed, media, e)
+                    continue
+                if metrics.is_enabled():
+                    metrics.BYTES.inc(result.stat().st_size)
+                if verifier is not None:
+                    checking[checkers.submit(verifier.check, media, result)] = (
+                        media,
+                        result,
+                        attempt,
+                    )
+                    continue
+                completed += 1
+                media.set_local_path(result)  # captioning reads local_path to find the file
+                downloaded_paths.append(result)
+                metrics.FILES["downloaded"].inc()
+                on_file_downloaded(completed, media)  # drives progress + live videos tally
+            metrics.UNREPORTED.set(0)
+            if on_idle is not None:
+                on_idle()
+            top_up()
+    metrics.QUEUE_DEPTH.set(0)
     return downloaded_paths
 
 
-def thumbnail_data_uri(path: Path, max_edge: int = 104) -> str:
-    """Build a small base64 JPEG data URI from a downloaded image, for the preview strip.
+@contextmanager
+def _partial_folder(path: Path) -> Iterator[None]:
+    """Remove run_download's partial folder afterwards, unless something is still in it."""
+    try:
+        yield
+    finally:
+        try:
+            path.rmdir()
+        except OSError:
+            pass  # never created, or holding another run's downloads
 
-    The app page is served over http://127.0.0.1, so it can't load file:// paths, and
-    pointing an <img> at the remote source would re-download every image. A data URI of
-    the on-disk file avoids both. max_edge is 2x the 52px display box for retina sharpness.
-    Returns "" when the file isn't a decodable image (e.g. a video), so the caller can fall
-    back to a placeholder.
+
+def thumbnail_jpeg(source: Union[Path, BinaryIO], max_edge: int = 104) -> Optional[bytes]:
+    """Downscale an image file (or open binary stream) to a small JPEG for the preview strip.
+
+    max_edge is 2x the 52px display box for retina sharpness. Returns None when the
+    source isn't a decodable image (e.g. a video).
     """
+    from PIL import Image  # deferred: headless runs without previews never load Pillow
+
     try:
-        with Image.open(path) as img:
+        with tracing.span("thumbnail", "preview"), Image.open(source) as img:
             img.draft("RGB", (max_edge, max_edge))  # let the JPEG decoder downscale up front
             img = img.convert("RGB")
             img.thumbnail((max_edge, max_edge))
             buffer = BytesIO()
             img.save(buffer, format="JPEG", quality=80)
     except (OSError, ValueError):
-        return ""
-    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
-    return f"data:image/jpeg;base64,{encoded}"
+        return None
+    return buffer.getvalue()
+
 
+def jpeg_data_uri(data: bytes) -> str:
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
 
-def apply_captions(media_list: Sequence[PinterestMedia], output_dir: Path, caption: str) -> None:
+
+def thumbnail_data_uri(path: Path, max_edge: int = 104) -> str:
+    """Build a small base64 JPEG data URI from a downloaded image, for the preview strip.
+
+    The app page is served over http://127.0.0.1, so it can't load file:// paths, and
+    pointing an <img> at the remote source would re-download every image. A data URI of
+    the on-disk file avoids both. Returns "" when the file isn't a decodable image (e.g.
+    a video), so the caller can fall back to a placeholder. core.previews fetches a small
+    CDN rendition instead where it can, and only falls back to this.
+    """
+    data = thumbnail_jpeg(path, max_edge)
+    return jpeg_data_uri(data) if data is not None else ""
+
+
+def write_sidecars(media_list: Sequence[PinterestMedia], extension: str) -> None:
+    """Write a .txt (alt text) or .json (full record) caption next to each downloaded file.
+
+    Same files as pinterest_dl's add_captions_to_file, but beside each file rather than
+    all in one folder, so sidecars follow a sharded layout. Each is written to a temp
+    name and synced and renamed in batches by a Flusher (core.atomic).
+    """
+    commits: List[Future] = []
+    with closing(Flusher()) as flusher:
+        for media in media_list:
+            if media.local_path is None:
+                continue
+            data = sidecar_bytes(media, extension)
+            if data is not None:
+                final = media.local_path.with_suffix(f".{extension}")
+                temp = temp_path(final)
+                temp.write_bytes(data)
+                commits.append(flusher.commit(temp, final))
+    for commit in commits:
+        commit.result()  # raise the first failure, as a direct write would have
+
+
+def sidecar_bytes(media: PinterestMedia, extension: str) -> Optional[bytes]:
+    """The contents of `media`'s .txt or .json sidecar; None when a .txt would be empty."""
+    if extension == "json":
+        return json.dumps(media.to_dict(), indent=4).encode("utf-8")
+    return media.alt.encode("utf-8") if media.alt else None
+
+
+def apply_captions(media_list: Sequence[PinterestMedia], caption: str) -> None:
     """Write captions for downloaded media: txt/json sidecars or embedded EXIF.
 
     Requires each media's local_path to be set (done by run_download). verbose=True
@@ -163,9 +619,10 @@ def apply_captions(media_list: Sequence[PinterestMedia], output_dir: Path, capti
     """
     if caption == "none":
         return
-    if caption in ("txt", "json"):
-        operations.add_captions_to_file(media_list, output_dir, caption, verbose=True)
-    elif caption == "metadata":
-        operations.add_captions_to_meta(media_list, verbose=True)
-    else:
-        raise ValueError(f"Invalid caption mode: {caption!r}")
+    with tracing.span("captions", "captions", mode=caption):
+        if caption in ("txt", "json"):
+            write_sidecars(media_list, caption)
+        elif caption == "metadata":
+            operations.add_captions_to_meta(media_list, verbose=True)
+        else:
+            raise ValueError(f"Invalid caption mode: {caption!r}")
@@ -2,12 +2,14 @@ import logging
 from contextlib import contextmanager
 from typing import Any, Callable, Iterator, Literal
 
+from . import metrics
+
 # Heterogenous wire payloads (str/int/bool vals).
 Event = dict[str, Any]
 Sink = Callable[[Event], None]
 
 LogLevel = Literal["info", "warn", "error"]
-Phase = Literal["scrape", "download"]
+Phase = Literal["scrape", "estimate", "download"]
 
 
 def progress(phase: Phase, current: int, total: int) -> Event:
@@ -18,6 +20,11 @@ def log(level: LogLevel, message: str) -> Event:
     return {"type": "log", "level": level, "message": message}
 
 
+def log_summary(total: int, warn: int, error: int) -> Event:
+    # Sent by the GUI bridge instead of per-line `log` events; the console pages lines in.
+    return {"type": "logs", "total": total, "warn": warn, "error": error}
+
+
 def media(thumbnail: str, is_video: bool) -> Event:
     # isVideo (camelCase) matches the RunEvent contract the frontend reads off the wire.
     return {"type": "media", "thumbnail": thumbnail, "isVideo": is_video}
@@ -60,8 +67,9 @@ class LogForwarder(logging.Handler):
     def emit(self, record: logging.LogRecord) -> None:
         try:
             # getMessage render %-style args; record.msg along would not
-            event = log(_level_name(record.levelno), record.getMessage())
-            self.sink(event)
+            level = _level_name(record.levelno)
+            metrics.LOG_RECORDS[level].inc()
+            self.sink(log(level, record.getMessage()))
         except Exception:
             self.handleError(record)  # logging's own path; never bubble into the run thread
 
@@ -0,0 +1,228 @@
+"""Persistent run history: one JSON line per finished run, for spotting slowdowns over time.
+
+Each record keeps the run's config, outcome and counts (what the `done` event carries),
+plus what only the run itself can see: per-phase wall time, bytes written, files/s,
+failure reasons and the peak number of downloads in flight. The store is append-only
+JSONL so a crash mid-write can cost at most the last line.
+"""
+
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterator
+
+from . import events
+from .scrape_config import ScrapeConfig
+
+# Numeric fields compared by HistoryStore.compare, as dotted paths into a record.
+_METRICS = (
+    "counts.scraped",
+    "counts.downloaded",
+    "counts.failed",
+    "bytes",
+    "duration_s",
+    "phases.scrape",
+    "phases.download",
+    "files_per_s",
+    "mb_per_s",
+    "scrape_items_per_s",
+    "peak_workers",
+)
+
+
+def state_dir() -> Path:
+    """Per-user directory for files the app keeps between runs."""
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    else:
+        base = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+    return base / "pinterest-dl"
+
+
+def default_path() -> Path:
+    """PDL_HISTORY if set, else the per-user state directory."""
+    override = os.environ.get("PDL_HISTORY", "").strip()
+    if override:
+        return Path(override)
+    return state_dir() / "history.jsonl"
+
+
+def failure_reason(exc: Exception) -> str:
+    """Bucket a download failure: the HTTP status when there is one, else the type."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return f"HTTP {status}" if status else type(exc).__name__
+
+
+class RunRecorder:
+    """Collects one run's statistics; runner.execute feeds it as the run goes."""
+
+    def __init__(self, config: ScrapeConfig) -> None:
+        self.config = config
+        self.id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.bytes = 0
+        self.failed = 0
+        self.failures: Counter[str] = Counter()
+        self.cancelled = False
+        self.peak_workers = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(self.phases.get(name, 0.0) + time.perf_counter() - start, 4)
+
+    def file_done(self, path: Path | None) -> None:
+        try:
+            self.bytes += path.stat().st_size if path is not None else 0
+        except OSError:
+            pass  # removed or renamed already; count the file, not its size
+
+    def file_failed(self, exc: Exception) -> None:
+        self.failed += 1
+        self.failures[failure_reason(exc)] += 1
+
+    def in_flight(self, active: int) -> None:
+        """run_download's on_active hook; called on worker threads."""
+        with self._lock:
+            self.peak_workers = max(self.peak_workers, active)
+
+    def add_shard(self, record: dict) -> None:
+        """Fold in the run record of one core.shards process, which has its own recorder."""
+        self.bytes += record["bytes"]
+        self.failed += record["counts"]["failed"]
+        self.failures.update(record["failures"])
+        self.peak_workers += record["peak_workers"]  # the shards download side by side
+
+    def record(self, terminal: events.Event) -> dict:
+        """The history record for this run, given its terminal done/error event."""
+        duration = time.perf_counter() - self._started
+        if terminal["type"] == "error":
+            outcome = "error"
+        else:
+            outcome = "cancelled" if self.cancelled else "done"
+        counts = {
+            key: terminal.get(key, 0) for key in ("scraped", "downloaded", "videos", "saved")
+        }
+        counts["failed"] = self.failed
+        download_s = self.phases.get("download", 0.0)
+        scrape_s = self.phases.get("scrape", 0.0)
+        config = asdict(self.config)
+        config["cookies"] = bool(config["cookies"])  # whether auth was used, not where it lives
+        return {
+            "id": self.id,
+            "started_at": self.started_at,
+            "duration_s": round(duration, 4),
+            "outcome": outcome,
+            "error": terminal.get("message") if outcome == "error" else None,
+            "config": config,
+            "counts": counts,
+            "phases": self.phases,
+            "bytes": self.bytes,
+            "files_per_s": round(counts["downloaded"] / download_s, 3) if download_s else 0.0,
+            "mb_per_s": round(self.bytes / download_s / 1e6, 3) if download_s else 0.0,
+            "scrape_items_per_s": round(counts["scraped"] / scrape_s, 3) if scrape_s else 0.0,
+            "failures": dict(self.failures),
+            "peak_workers": self.peak_workers,
+        }
+
+
+class HistoryStore:
+    """Append-only JSONL file of run records, newest last on disk."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line)
+
+    def _read(self) -> list[dict]:
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # a torn last line from a crash; the rest is still good
+        return records
+
+    def recent(self, limit: int = 50, offset: int = 0) -> list[dict]:
+        """Records newest first."""
+        records = self._read()
+        records.reverse()
+        return records[offset : offset + limit]
+
+    def download_rate(self, runs: int = 20) -> float | None:
+        """Median download throughput in bytes/s over the last `runs` completed downloads."""
+        rates = [
+            r["bytes"] / r["phases"]["download"]
+            for r in self.recent(runs * 5)
+            if r.get("outcome") == "done"
+            and r.get("bytes")
+            and r.get("phases", {}).get("download")
+        ][:runs]
+        return statistics.median(rates) if rates else None
+
+    def get(self, run_id: str) -> dict | None:
+        """A record by id, or by unique id prefix."""
+        matches = [r for r in self._read() if str(r.get("id", "")).startswith(run_id)]
+        return matches[0] if len(matches) == 1 else None
+
+    def compare(self, base_id: str, other_id: str) -> dict:
+        """Metric-by-metric change from one run to another. Raises KeyError for unknown ids."""
+        base, other = self.get(base_id), self.get(other_id)
+        if base is None or other is None:
+            raise KeyError(base_id if base is None else other_id)
+        metrics = {}
+        for name in _METRICS:
+            old, new = _lookup(base, name), _lookup(other, name)
+            change = round((new - old) / old * 100, 1) if old else None
+            metrics[name] = {"base": old, "other": new, "change_pct": change}
+        return {"base": base["id"], "other": other["id"], "metrics": metrics}
+
+
+def _lookup(record: dict, dotted: str) -> float:
+    value: object = record
+    for part in dotted.split("."):
+        value = value.get(part, 0) if isinstance(value, dict) else 0
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def format_table(records: list[dict]) -> str:
+    """Compact listing for the CLI."""
+    lines = [
+        f"{'id':<12}  {'started':<16}  {'mode':<8}  {'outcome':<9}"
+        f"  {'files':>6}  {'failed':>6}  {'MB':>8}  {'files/s':>8}  {'workers':>7}"
+    ]
+    for r in records:
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(r.get("started_at", 0)))
+        counts = r.get("counts", {})
+        lines.append(
+            f"{r.get('id', ''):<12}  {started:<16}  {r.get('config', {}).get('mode', ''):<8}"
+            f"  {r.get('outcome', ''):<9}  {counts.get('downloaded', 0):>6}"
+            f"  {counts.get('failed', 0):>6}  {r.get('bytes', 0) / 1e6:>8.1f}"
+            f"  {r.get('files_per_s', 0):>8.2f}  {r.get('peak_workers', 0):>7}"
+        )
+    return "\n".join(lines)
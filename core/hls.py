@@ -0,0 +1,219 @@
+"""HLS video downloads whose segments are fetched in parallel within the run's shared
+concurrency budget and streamed into ffmpeg in order.
+"""
+
+import logging
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from . import tracing
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+    from pinterest_dl.download import MediaDownloader
+    from pinterest_dl.download.video.hls_processor import HlsProcessor
+
+# The library's own logger for this step, so events.forward_logs still relays the warning.
+logger = logging.getLogger("pinterest_dl.download.http_client")
+
+
+class ConcurrencyBudget:
+    """A fixed number of download slots shared by file workers and borrowed segment fetches."""
+
+    def __init__(self, slots: int) -> None:
+        self.slots = slots
+        self._semaphore = threading.BoundedSemaphore(slots)
+        self._lock = threading.Lock()
+        self._helpers: ThreadPoolExecutor | None = None
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one slot for the duration of a file download (blocks until one is free)."""
+        self._semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    def borrow(self, fn: Callable[..., None], *args) -> Future | None:
+        """Run `fn` on a helper thread if a slot is idle right now, else return None."""
+        if not self._semaphore.acquire(blocking=False):
+            return None
+        try:
+            return self._executor().submit(self._run_borrowed, fn, *args)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def _run_borrowed(self, fn: Callable[..., None], *args) -> None:
+        try:
+            fn(*args)
+        finally:
+            self._semaphore.release()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._helpers is None:
+                # A borrower holds a slot itself, so at most slots - 1 helpers can run.
+                self._helpers = ThreadPoolExecutor(
+                    max_workers=max(self.slots - 1, 1), thread_name_prefix="hls-segment"
+                )
+            return self._helpers
+
+    def close(self) -> None:
+        with self._lock:
+            if self._helpers is not None:
+                self._helpers.shutdown(wait=True)
+                self._helpers = None
+
+
+def download_media(
+    downloader: "MediaDownloader",
+    media: "PinterestMedia",
+    output_dir: Path,
+    download_videos: bool,
+    skip_remux: bool,
+    budget: ConcurrencyBudget | None = None,
+) -> Path:
+    """MediaDownloader.download, with HLS streams fetched by download_stream instead."""
+    stream = media.video_stream
+    if download_videos and stream is not None and Path(stream.url).suffix.lower() != ".mp4":
+        output_dir.mkdir(parents=True, exist_ok=True)
+        target = output_dir / f"{media.id}.mp4"
+        hls = downloader.http_client.hls_processor
+        return download_stream(hls, stream.url, target, skip_remux, budget)
+    return downloader.download(media, output_dir, download_videos, skip_remux)
+
+
+def download_stream(
+    hls: "HlsProcessor",
+    url: str,
+    output_path: Path,
+    skip_remux: bool,
+    budget: ConcurrencyBudget | None = None,
+) -> Path:
+    """Download an HLS stream to `output_path`; same outputs as HttpClient.download_streams."""
+    from pinterest_dl.exceptions import HlsDownloadError
+
+    playlist = hls.fetch_playlist(url)
+    base_uri = playlist.base_uri or url.rsplit("/", 1)[0] + "/"
+    if playlist.is_variant:
+        media_url = hls.resolve_variant(playlist, base_uri)
+        playlist = hls.fetch_playlist(media_url)
+        base_uri = playlist.base_uri or media_url.rsplit("/", 1)[0] + "/"
+
+    init = hls.get_init_section(playlist, base_uri)
+    segments = hls.enumerate_segments(playlist, base_uri)
+    with tempfile.TemporaryDirectory(prefix="pdl-hls-") as td:
+        temp_dir = Path(td)
+        jobs = ([init] if init is not None else []) + segments
+        paths = ([temp_dir / "init.mp4"] if init is not None else []) + [
+            temp_dir / f"segment_{index:05d}.ts" for index in range(len(segments))
+        ]
+
+        def fetch(index: int) -> None:
+            segment = jobs[index]
+            raw = hls.download_segment(segment.uri, segment.byte_offset, segment.byte_length)
+            hls.write_segment_file(paths[index], hls.decrypt(segment, raw))  # init: no-op
+
+        _fetch_all(fetch, len(jobs), budget)
+
+        # fMP4 (has init) -> .mp4. Plain TS (no init) -> .ts
+        suffix = ".mp4" if init is not None else ".ts"
+        if skip_remux:
+            final = output_path.with_suffix(suffix)
+            with final.open("wb") as out:
+                _copy_segments(paths, out)
+            return final
+
+        output_mp4 = output_path.with_suffix(".mp4")
+        try:
+            _pipe_to_ffmpeg(paths, suffix, ["-c", "copy"], output_mp4, "remux to mp4")
+        except HlsDownloadError:
+            logger.warning("Remux failed, re-encoding video (this may take longer)...")
+            reencode = ["-c:v", "libx264", "-preset", "medium", "-crf", "23"]
+            reencode += ["-c:a", "aac", "-b:a", "128k"]
+            _pipe_to_ffmpeg(paths, suffix, reencode, output_mp4, "re-encode to mp4")
+        return output_mp4
+
+
+def _fetch_all(fetch: Callable[[int], None], count: int, budget: ConcurrencyBudget | None) -> None:
+    """Fetch segments 0..count-1, lending each to a borrowed slot when one is idle.
+
+    The calling worker fetches whatever it cannot lend out, so a video still progresses
+    at one connection when the budget is fully used by other files.
+    """
+    failed = threading.Event()
+    lent: list[Future] = []
+
+    def on_done(future: Future) -> None:
+        if future.exception() is not None:
+            failed.set()
+
+    try:
+        for index in range(count):
+            if failed.is_set():
+                break  # a lent segment failed; its exception is raised below
+            future = budget.borrow(fetch, index) if budget is not None else None
+            if future is None:
+                fetch(index)
+            else:
+                future.add_done_callback(on_done)
+                lent.append(future)
+    finally:
+        # Helpers write into the temp directory; it must outlive them even on failure.
+        wait(lent)
+    for future in lent:
+        future.result()
+
+
+def _copy_segments(paths: list[Path], out) -> None:
+    for path in paths:
+        with path.open("rb") as segment:
+            shutil.copyfileobj(segment, out)
+
+
+def _pipe_to_ffmpeg(
+    paths: list[Path], suffix: str, codec_args: list[str], output_mp4: Path, phase: str
+) -> None:
+    """Feed the segments to ffmpeg over stdin in order and write `output_mp4`.
+
+    Invokes bare "ffmpeg" like the library does, so runner's custom-path handling
+    (prepending its directory to PATH) applies here too.
+    """
+    from pinterest_dl.exceptions import HlsDownloadError
+
+    input_format = ["-f", "mpegts"] if suffix == ".ts" else []
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", *input_format, "-i", "pipe:0"]
+    cmd += [*codec_args, output_mp4.absolute().as_posix()]
+    with tracing.span(f"ffmpeg {phase}", "ffmpeg"), tempfile.TemporaryFile() as stderr:
+        try:
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr
+            )
+        except OSError as e:
+            raise HlsDownloadError(f"ffmpeg {phase} could not start: {e}") from e
+        try:
+            _copy_segments(paths, proc.stdin)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its exit code and stderr say why
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            returncode = proc.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            tail = "\n".join(stderr.read().decode("utf-8", "replace").strip().splitlines()[-60:])
+            raise HlsDownloadError(
+                f"ffmpeg {phase} failed with exit code {returncode}.\n"
+                f"Command: {' '.join(cmd[:5])}...\n"
+                f"Error output:\n{tail}"
+            )
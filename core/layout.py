@@ -0,0 +1,120 @@
+"""Output folder layouts (flat, or sharded into subfolders by pin id or hash), and an
+index of the files already in an output folder.
+"""
+
+import hashlib
+import os
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .scrape_config import LAYOUTS
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+
+_SHARD_NAME = re.compile(r"[0-9a-f]{2}")
+
+
+def shard(pin_id: str, layout: str) -> str:
+    """The subfolder for `pin_id` under `layout`; "" for flat."""
+    if layout == "flat":
+        return ""
+    if layout == "id":
+        return pin_id[-2:].rjust(2, "0")
+    if layout == "hash":
+        return hashlib.md5(pin_id.encode("utf-8")).hexdigest()[:2]
+    raise ValueError(f"Invalid layout: {layout!r} (expected one of {', '.join(LAYOUTS)})")
+
+
+def media_dir(root: Path, pin_id: str, layout: str) -> Path:
+    name = shard(pin_id, layout)
+    return root / name if name else root
+
+
+def expected_names(media: "PinterestMedia", download_videos: bool) -> tuple[str, ...]:
+    """File names MediaDownloader.download can give this pin, mirroring its naming."""
+    if download_videos and media.video_stream is not None:
+        return f"{media.id}.mp4", f"{media.id}.ts"  # HLS is .ts when remuxing is skipped
+    ext = Path(media.src).suffix.lower() or ".jpg"
+    return (f"{media.id}{ext}",)
+
+
+def _files(root: Path) -> Iterator[tuple[str, os.DirEntry]]:
+    """(shard, entry) for every file in `root` and its shard-named subfolders."""
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.is_file():
+            yield "", entry
+        elif entry.is_dir() and _SHARD_NAME.fullmatch(entry.name):
+            with os.scandir(entry.path) as shard_entries:
+                for inner in shard_entries:
+                    if inner.is_file():
+                        yield entry.name, inner
+
+
+class OutputIndex:
+    """File names present under an output folder (flat or sharded), from one scan."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._shards: dict[str, str] = {}  # file name -> shard ("" for the root itself)
+
+    @classmethod
+    def scan(cls, root: Path) -> "OutputIndex":
+        index = cls(root)
+        for name, entry in _files(root):
+            index._shards[entry.name] = name
+        return index
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+    def find(self, names: tuple[str, ...]) -> Path | None:
+        """Where the first of `names` that exists is, in whichever layout it was saved."""
+        for name in names:
+            shard_name = self._shards.get(name)
+            if shard_name is not None:
+                return self.root / shard_name / name if shard_name else self.root / name
+        return None
+
+
+def migrate(root: Path, layout: str, dry_run: bool = False) -> dict[str, int]:
+    """Move pin files and their sidecars under `root` into `layout`.
+
+    Only files named after a pin id (digits, then any extensions) are moved; caches and
+    anything else are left alone. A file whose destination already exists is skipped
+    rather than overwritten. Empty shard folders are removed afterwards.
+    """
+    if layout not in LAYOUTS:  # validate before moving anything
+        raise ValueError(f"Invalid layout: {layout!r} (expected one of {', '.join(LAYOUTS)})")
+    counts = {"moved": 0, "in_place": 0, "conflicts": 0, "ignored": 0}
+    for current, entry in list(_files(root)):
+        pin_id = entry.name.split(".", 1)[0]
+        if not pin_id.isdigit():
+            counts["ignored"] += 1
+            continue
+        target = shard(pin_id, layout)
+        if target == current:
+            counts["in_place"] += 1
+            continue
+        destination = media_dir(root, pin_id, layout) / entry.name
+        if destination.exists():
+            counts["conflicts"] += 1
+            continue
+        if not dry_run:
+            destination.parent.mkdir(exist_ok=True)
+            os.replace(entry.path, destination)
+        counts["moved"] += 1
+    if counts["moved"] and not dry_run:
+        for entry in os.scandir(root):
+            if entry.is_dir() and _SHARD_NAME.fullmatch(entry.name):
+                try:
+                    os.rmdir(entry.path)  # only succeeds when empty
+                except OSError:
+                    pass
+    return counts
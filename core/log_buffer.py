@@ -0,0 +1,143 @@
+"""Bounded per-run log storage for the GUI console, paged in by the frontend via Api.get_logs.
+
+Lines that fall off the ring can be kept in a spill file (PDL_LOG_FILE).
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, TextIO
+
+from . import events
+
+_LEVELS: tuple[events.LogLevel, ...] = ("info", "warn", "error")
+
+
+def levels_from(minimum: str | None) -> tuple[str, ...]:
+    """Levels at or above `minimum` ("warn" -> warn + error); everything for None/"info"."""
+    if minimum in _LEVELS:
+        return _LEVELS[_LEVELS.index(minimum) :]  # type: ignore[arg-type]
+    return _LEVELS
+
+
+class LogBuffer:
+    """Thread-safe ring of the current run's log lines, indexed from the run's start."""
+
+    def __init__(self, capacity: int = 5000, spill_path: str | None = None) -> None:
+        self.capacity = capacity
+        self.spill_path = spill_path if spill_path is not None else os.environ.get("PDL_LOG_FILE")
+        self._lock = threading.Lock()
+        self._lines: deque[dict] = deque(maxlen=capacity)
+        self._evicted: Counter[str] = Counter()  # per level, so filtered offsets stay stable
+        self._totals: Counter[str] = Counter()
+        self._started = time.monotonic()
+        self._spill: TextIO | None = None
+
+    def reset(self) -> None:
+        """Start a new run: clear the ring and counters, and roll the spill file forward."""
+        with self._lock:
+            self._lines.clear()
+            self._evicted.clear()
+            self._totals.clear()
+            self._started = time.monotonic()
+            if self.spill_path and self._spill is None:
+                try:
+                    self._spill = open(self.spill_path, "a", encoding="utf-8")
+                except OSError:
+                    self.spill_path = None  # unwritable; keep the in-memory ring only
+            if self._spill is not None:
+                self._spill.write(f"--- run started {time.strftime('%Y-%m-%d %H:%M:%S')} ---\n")
+
+    def append(self, level: events.LogLevel, message: str, phase: str | None = None) -> None:
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            if len(self._lines) == self.capacity:
+                self._evicted[self._lines[0]["level"]] += 1
+            self._lines.append(
+                {"t": round(elapsed, 3), "level": level, "phase": phase, "message": message}
+            )
+            self._totals[level] += 1
+            if self._spill is not None:
+                self._spill.write(f"[{elapsed:9.3f}] {level.upper():<5} {message}\n")
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._spill is not None:
+                self._spill.flush()
+
+    def summary(self) -> dict:
+        """Counts per level, for the rate-capped `logs` event."""
+        with self._lock:
+            return {
+                "total": sum(self._totals.values()),
+                "warn": self._totals["warn"],
+                "error": self._totals["error"],
+            }
+
+    def get(self, offset: int = 0, limit: int = 200, level: str | None = None) -> dict:
+        """Up to `limit` lines from position `offset` among lines at or above `level`.
+
+        Positions count every matching line since the run started, so they stay stable
+        as the ring wraps; `start` is the first position still held in memory. A negative
+        offset counts back from the end (-limit = the latest lines).
+        """
+        wanted = levels_from(level)
+        with self._lock:
+            evicted = sum(self._evicted[name] for name in wanted)
+            kept = [line for line in self._lines if line["level"] in wanted]
+        total = evicted + len(kept)
+        if offset < 0:
+            offset = max(total + offset, 0)
+        begin = max(offset - evicted, 0)
+        lines = kept[begin : max(offset + limit - evicted, 0)]
+        return {
+            "total": total,
+            "start": evicted,
+            "offset": evicted + begin,
+            "lines": lines,
+        }
+
+
+class SummaryPusher:
+    """Rate-caps `logs` summary events: at most one per `interval`, the last never lost.
+
+    notify() is called per appended line from any thread. The first line in a quiet
+    period is pushed immediately; later ones arm a single timer that pushes once the
+    interval has passed, so a flood of lines costs one bridge call per interval.
+    """
+
+    def __init__(self, push: Callable[[], None], interval: float = 0.25) -> None:
+        self._push = push
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last = 0.0
+        self._timer: threading.Timer | None = None
+
+    def notify(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                return  # a push is already scheduled and will include this line
+            wait = self._last + self.interval - time.monotonic()
+            if wait > 0:
+                self._timer = threading.Timer(wait, self._fire)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+            self._last = time.monotonic()
+        self._push()
+
+    def flush(self) -> None:
+        """Push now (e.g. before a terminal event) and cancel any scheduled push."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._last = time.monotonic()
+        self._push()
+
+    def _fire(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._last = time.monotonic()
+        self._push()
@@ -0,0 +1,145 @@
+"""Compact in-memory storage for a run's media records, handing out PinterestMedia
+objects one at a time.
+"""
+
+import functools
+import sys
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+
+# Every scraped pin's origin is its own pin page, so it is stored only when it differs.
+_PIN_URL = "https://www.pinterest.com/pin/{}/"
+
+
+class MediaRecord:
+    """One pin, stripped to its fields. `origin` is None when it is the derived pin URL
+    and "" when the pin genuinely has none; `video` is (url, width, height, duration).
+    `size` is the download's size in bytes once a pre-flight has measured it."""
+
+    __slots__ = ("id", "src", "alt", "origin", "width", "height", "video", "local_path", "size")
+
+    def __init__(self, media: "PinterestMedia") -> None:
+        self.id = media.id
+        self.src = media.src
+        # Alt text repeats a lot (empty, "image", board-wide captions); share one copy.
+        self.alt = sys.intern(media.alt) if isinstance(media.alt, str) else media.alt
+        if media.origin is None:
+            self.origin: str | None = ""
+        elif media.origin == _PIN_URL.format(media.id):
+            self.origin = None
+        else:
+            self.origin = media.origin
+        self.width, self.height = media.resolution or (0, 0)
+        stream = media.video_stream
+        self.video = (
+            None
+            if stream is None
+            else (stream.url, stream.resolution[0], stream.resolution[1], stream.duration)
+        )
+        self.local_path = str(media.local_path) if media.local_path is not None else None
+        self.size: int | None = getattr(media, "size", None)
+
+
+@functools.cache
+def _stored_media_class():
+    """StoredMedia, built on first use so importing this module doesn't import pinterest_dl."""
+    from pinterest_dl import PinterestMedia
+    from pinterest_dl.domain.media import VideoStreamInfo
+
+    class StoredMedia(PinterestMedia):
+        """A PinterestMedia materialized from a MediaRecord.
+
+        Setting the local path writes through to the record, so run_download's
+        `media.set_local_path` survives the object being dropped right after.
+        """
+
+        def __init__(self, record: MediaRecord) -> None:
+            if record.origin is None:
+                origin = _PIN_URL.format(record.id)
+            else:
+                origin = record.origin or None
+            video = None
+            if record.video is not None:
+                url, width, height, duration = record.video
+                video = VideoStreamInfo(url=url, resolution=(width, height), duration=duration)
+            super().__init__(
+                record.id, record.src, record.alt, origin, (record.width, record.height), video
+            )
+            if record.local_path is not None:
+                self.local_path = Path(record.local_path)
+            self.size = record.size
+            self._record = record
+
+        def set_local_path(self, path: str | Path) -> None:
+            super().set_local_path(path)
+            self._record.local_path = str(path)
+
+    return StoredMedia
+
+
+def cache_record(media: "PinterestMedia") -> dict[str, Any]:
+    """`media` as a cache-file record: PinterestMedia.to_dict plus its size, if measured."""
+    record = media.to_dict()
+    size = getattr(media, "size", None)
+    if size is not None:
+        record["size"] = size
+    return record
+
+
+class MediaStore(Sequence):
+    """Append-only Sequence[PinterestMedia] backed by MediaRecords."""
+
+    def __init__(self, media: Iterable["PinterestMedia"] = ()) -> None:
+        self._records: list[MediaRecord] = []
+        self.extend(media)
+
+    def append(self, media: "PinterestMedia") -> None:
+        self._records.append(MediaRecord(media))
+
+    def extend(self, media: Iterable["PinterestMedia"]) -> None:
+        for item in media:
+            self.append(item)
+
+    def add_dict(self, data: dict[str, Any]) -> None:
+        """Add a cache-file record without keeping the parsed dict around."""
+        from pinterest_dl import PinterestMedia
+
+        self.append(PinterestMedia.from_dict(data))
+        size = data.get("size")
+        self._records[-1].size = int(size) if size is not None else None
+
+    def set_size(self, index: int, size: int | None) -> None:
+        self._records[index].size = size
+
+    def resolution(self, index: int) -> tuple[int, int]:
+        record = self._records[index]
+        return record.width, record.height
+
+    def set_resolution(self, index: int, width: int, height: int) -> None:
+        record = self._records[index]
+        record.width, record.height = width, height
+
+    def subset(self, indices: Iterable[int]) -> "MediaStore":
+        """A store of the pins at `indices`, sharing their records (updates show in both)."""
+        subset = MediaStore()
+        subset._records = [self._records[index] for index in indices]
+        return subset
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index):  # int -> PinterestMedia, slice -> list of them
+        stored_media = _stored_media_class()
+        if isinstance(index, slice):
+            return [stored_media(record) for record in self._records[index]]
+        return stored_media(self._records[index])
+
+    def __iter__(self):
+        # Yield from the records directly rather than Sequence's index loop.
+        stored_media = _stored_media_class()
+        for record in self._records:
+            yield stored_media(record)
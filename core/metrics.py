@@ -0,0 +1,167 @@
+"""Optional live metrics, served in the Prometheus text format; updates cost nothing
+beyond a flag check while they are off.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+_NOOP = nullcontext()
+_enabled = False
+_lock = threading.Lock()  # guards read-modify-write updates from worker threads
+_registry: list["_Metric"] = []
+
+
+def env_port() -> int | None:
+    """Metrics port from PDL_METRICS, for entry points without their own flag.
+
+    0 counts as unset: those entry points (the GUI) have nowhere to show a picked port.
+    """
+    value = os.environ.get("PDL_METRICS", "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, **labels: str) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.value = 0.0
+        _registry.append(self)
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [(self.name, self.value)]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1) -> None:
+        if not _enabled:
+            return
+        with _lock:
+            self.value += amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        if _enabled:
+            self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        if not _enabled:
+            return
+        with _lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+
+class Summary(_Metric):
+    """Count and total seconds of a timed operation (a Prometheus summary, no quantiles)."""
+
+    kind = "summary"
+
+    def __init__(self, name: str, help_text: str, **labels: str) -> None:
+        super().__init__(name, help_text, **labels)
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        if not _enabled:
+            return
+        with _lock:
+            self.value += seconds
+            self.count += 1
+
+    def time(self):
+        """Time a block; a shared no-op context manager while metrics are off."""
+        if not _enabled:
+            return _NOOP
+        return self._timed()
+
+    @contextmanager
+    def _timed(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [(self.name + "_sum", self.value), (self.name + "_count", self.count)]
+
+
+RUN_ACTIVE = Gauge("pdl_run_active", "1 while a run is executing")
+SCRAPED = Counter("pdl_scrape_pins_total", "Pins collected by scrape and search runs")
+SCRAPE_TARGET = Gauge("pdl_scrape_target", "Pins the current scrape asks for")
+QUEUE_DEPTH = Gauge("pdl_download_queue_depth", "Pins waiting for a download worker")
+IN_FLIGHT = Gauge("pdl_download_in_flight", "Downloads in progress")
+# Finished downloads the run thread has not yet reported (preview rendering, events).
+UNREPORTED = Gauge("pdl_download_unreported", "Finished downloads waiting to be reported")
+BYTES = Counter("pdl_download_bytes_total", "Bytes of downloaded files")
+FILES = {
+    result: Counter("pdl_download_files_total", "Files by outcome", result=result)
+    for result in ("downloaded", "failed", "skipped")
+}
+RETRIES = Counter("pdl_download_retries_total", "Re-downloads of files that failed verification")
+THUMBNAILS = Summary("pdl_thumbnail_seconds", "Time spent rendering download previews")
+EMIT = Summary("pdl_bridge_emit_seconds", "Time the GUI bridge spends delivering an event")
+LOG_RECORDS = {
+    level: Counter("pdl_log_records_total", "Library log records by level", level=level)
+    for level in ("info", "warn", "error")
+}
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: list[str] = []
+    described: set[str] = set()
+    with _lock:
+        for metric in _registry:
+            if metric.name not in described:
+                described.add(metric.name)
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+            labels = ",".join(f'{key}="{value}"' for key, value in metric.labels.items())
+            for name, value in metric.samples():
+                text = str(int(value)) if float(value).is_integer() else repr(value)
+                lines.append(f"{name}{{{labels}}} {text}" if labels else f"{name} {text}")
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # a scrape every few seconds would flood stderr
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Turn metrics on and serve them from a daemon thread; port 0 picks a free one."""
+    global _enabled
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    _enabled = True
+    return server
@@ -0,0 +1,200 @@
+"""Pre-flight size estimate: how many bytes a download is, measured with HEAD requests
+and HLS playlists before committing to it.
+"""
+
+import heapq
+import math
+import shutil
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Sequence
+from urllib.parse import urljoin
+
+from . import events
+
+if TYPE_CHECKING:
+    import requests
+    from pinterest_dl import PinterestMedia
+
+_LARGEST = 10  # items listed in the report
+
+
+@dataclass
+class Estimate:
+    sizes: list[int | None]  # bytes per pin, in media_list order; None when unknown
+    measured: int = 0  # pins sized from a response header
+    estimated: int = 0  # HLS videos sized from their playlists
+    largest: list[tuple[int, str]] = field(default_factory=list)  # (bytes, pin id)
+
+    @property
+    def total(self) -> int:
+        return sum(size for size in self.sizes if size is not None)
+
+    @property
+    def unknown(self) -> int:
+        return sum(size is None for size in self.sizes)
+
+
+def _content_length(response: "requests.Response") -> int | None:
+    # Content-Range "bytes 0-0/12345" carries the full size of a range response.
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    if total.isdigit():
+        return int(total)
+    length = response.headers.get("Content-Length", "")
+    return int(length) if length.isdigit() and response.status_code == 200 else None
+
+
+def remote_size(session: "requests.Session", url: str, timeout: float) -> int | None:
+    """Size of the resource at `url` without fetching its body; None if it won't say."""
+    response = session.head(url, timeout=timeout, allow_redirects=True)
+    response.raise_for_status()
+    size = _content_length(response)
+    if size is not None:
+        return size
+    with session.get(url, timeout=timeout, headers={"Range": "bytes=0-0"}, stream=True) as r:
+        r.raise_for_status()
+        return _content_length(r)
+
+
+def _stream_size(session: "requests.Session", url: str, timeout: float) -> int | None:
+    import m3u8  # pinterest_dl's own playlist parser
+
+    def load(playlist_url: str) -> "m3u8.M3U8":
+        response = session.get(playlist_url, timeout=timeout)
+        response.raise_for_status()
+        return m3u8.loads(response.text, uri=playlist_url)
+
+    playlist = load(url)
+    bandwidth = 0
+    if playlist.is_variant:
+        # The variant HlsProcessor.resolve_variant downloads: the highest bandwidth.
+        variants = [p for p in playlist.playlists if p.stream_info and p.stream_info.bandwidth]
+        if not variants:
+            return None
+        best = max(variants, key=lambda p: p.stream_info.bandwidth)
+        bandwidth = best.stream_info.bandwidth
+        url = urljoin(url, best.uri)
+        playlist = load(url)
+    if not playlist.segments:
+        return None
+    if bandwidth:
+        seconds = sum(segment.duration or 0 for segment in playlist.segments)
+        return int(bandwidth / 8 * seconds)
+    first = remote_size(session, urljoin(url, playlist.segments[0].uri), timeout)
+    return first * len(playlist.segments) if first is not None else None
+
+
+def _size(
+    session: "requests.Session", media: "PinterestMedia", download_videos: bool, timeout: float
+) -> tuple[int | None, bool]:
+    """(bytes, whether that is an estimate) for what downloading `media` would fetch."""
+    stream = media.video_stream
+    if download_videos and stream is not None:
+        if Path(stream.url).suffix.lower() == ".mp4":
+            return remote_size(session, stream.url, timeout), False
+        return _stream_size(session, stream.url, timeout), True
+    return remote_size(session, media.src, timeout), False
+
+
+def estimate(
+    media_list: Sequence["PinterestMedia"],
+    session: "requests.Session",
+    download_videos: bool,
+    max_workers: int,
+    timeout: float,
+    should_cancel: Callable[[], bool],
+    on_progress: Callable[[int], None],
+) -> Estimate:
+    """Size every pin in `media_list`. A pin whose request fails counts as unknown."""
+    result = Estimate(sizes=[None] * len(media_list))
+    largest: list[tuple[int, str]] = []  # min-heap of the biggest seen so far
+
+    def record(index: int, future: Future) -> None:
+        try:
+            size, estimated = future.result()
+        except Exception:
+            return
+        if size is None:
+            return
+        result.sizes[index] = size
+        if estimated:
+            result.estimated += 1
+        else:
+            result.measured += 1
+        entry = (size, str(media_list[index].id))
+        if len(largest) < _LARGEST:
+            heapq.heappush(largest, entry)
+        else:
+            heapq.heappushpop(largest, entry)
+
+    def size_of(index: int) -> tuple[int | None, bool]:
+        return _size(session, media_list[index], download_videos, timeout)
+
+    run_bounded(size_of, len(media_list), max_workers, should_cancel, record, on_progress)
+    result.largest = sorted(largest, reverse=True)
+    return result
+
+
+def run_bounded(
+    fn: Callable[[int], object],
+    count: int,
+    max_workers: int,
+    should_cancel: Callable[[], bool],
+    on_result: Callable[[int, Future], None],
+    on_progress: Callable[[int], None],
+) -> None:
+    """Call fn(0..count-1) on a thread pool; on_result(index, future) runs on this thread.
+
+    Only a bounded window is queued at a time, like run_download, so a 30k-pin list never
+    becomes 30k futures. Raises RunCancelled once should_cancel() turns true.
+    """
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preflight") as pool:
+        pending: dict[Future, int] = {}
+        indices = iter(range(count))
+        try:
+            while True:
+                while len(pending) < max_workers * 2 and not should_cancel():
+                    index = next(indices, None)
+                    if index is None:
+                        break
+                    pending[pool.submit(fn, index)] = index
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    on_result(pending.pop(future), future)
+                    completed += 1
+                    on_progress(completed)
+        finally:
+            for future in pending:
+                future.cancel()
+    if should_cancel():
+        raise events.RunCancelled()
+
+
+def free_space(path: Path) -> int | None:
+    """Free bytes on the volume `path` is (or would be created) on."""
+    for candidate in (path, *path.resolve().parents):
+        if candidate.exists():
+            return shutil.disk_usage(candidate).free
+    return None
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1000:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.1f} TB"
+
+
+def format_duration(seconds: float) -> str:
+    if not math.isfinite(seconds):
+        return "unknown"
+    minutes, secs = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s" if minutes else f"{secs}s"
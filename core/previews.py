@@ -0,0 +1,187 @@
+"""Preview-strip thumbnails from Pinterest's small CDN rendition of each pin.
+
+Renditions are fetched on a small pool and session of their own, and cached on disk
+by URL; a pin without one falls back to decoding its downloaded file.
+"""
+
+import hashlib
+import os
+import queue
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+from . import events, history, metrics, tracing
+from .atomic import atomic_write
+from .downloader import jpeg_data_uri, thumbnail_jpeg
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+
+_VARIANT = "236x"
+# A CDN image path starts with its rendition: /originals/ab/cd/ef/<hash>.jpg, /736x/...
+_RENDITION = re.compile(r"^/(?:originals|\d+x(?:\d+_RS)?)/")
+_WORKERS = 2
+_CACHE_BYTES = 64 * 1024 * 1024  # ~16k thumbnails
+# Once the downloads are done, how long unfinished previews may hold up the done event.
+_GRACE_SECONDS = 5.0
+
+
+def cache_dir() -> Path:
+    return history.state_dir() / "previews"
+
+
+def small_variant(url: str) -> str | None:
+    """`url` with its CDN rendition swapped for the small one, or None if it has none."""
+    parts = urlsplit(url)
+    if not _RENDITION.match(parts.path):
+        return None
+    path = _RENDITION.sub(f"/{_VARIANT}/", parts.path, count=1)
+    return urlunsplit(parts._replace(path=path))
+
+
+def prune(folder: Path, max_bytes: int) -> int:
+    """Delete the least recently used previews until `folder` fits in max_bytes."""
+    entries = []
+    try:
+        with os.scandir(folder) as listing:
+            for entry in listing:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return 0
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class PreviewFetcher:
+    """Builds each downloaded file's media event once its preview is ready.
+
+    Everything but the fetches runs on the run thread. add() is called as each download
+    finishes and returns at once. drain() emits the media events whose previews are
+    ready. close() gives unfinished previews up to _GRACE_SECONDS, or none once the run
+    is cancelled. Any still queued then are emitted without a preview. Every download
+    thus gets exactly one media event, and all of them precede the run's done event.
+
+    With `keep_files` off (archive output, whose staged files are deleted once
+    archived), a pin is decoded from its file only when it has no CDN rendition, and
+    then right away in add(), before the file is handed to the archive.
+    """
+
+    def __init__(
+        self,
+        emit: events.Sink,
+        timeout: float,
+        should_cancel: Callable[[], bool],
+        keep_files: bool = True,
+        folder: Path | None = None,
+        workers: int = _WORKERS,
+    ) -> None:
+        import requests
+        from pinterest_dl.download import USER_AGENT
+
+        self._emit = emit
+        self._timeout = timeout
+        self._should_cancel = should_cancel
+        self._keep_files = keep_files
+        self._folder = folder or cache_dir()
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = USER_AGENT
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="preview")
+        self._pending: dict[Future, bool] = {}  # -> is_video
+        self._lock = threading.Lock()
+        self._ready: queue.SimpleQueue[events.Event] = queue.SimpleQueue()
+        self._pool.submit(prune, self._folder, _CACHE_BYTES)
+
+    def add(self, media: "PinterestMedia", is_video: bool) -> None:
+        path = media.local_path if not is_video else None
+        if not self._keep_files and (not media.src or small_variant(media.src) is None):
+            with metrics.THUMBNAILS.time():
+                data = thumbnail_jpeg(path) if path is not None else None
+            self._emit(events.media(jpeg_data_uri(data) if data else "", is_video))
+            return
+        if not self._keep_files:
+            path = None  # gone by the time a failed fetch would fall back to it
+        with self._lock:
+            future = self._pool.submit(self._deliver, media.src, path, is_video)
+            self._pending[future] = is_video
+        # Outside the lock: a future that is already done runs the callback right here.
+        future.add_done_callback(self._forget)
+
+    def drain(self) -> None:
+        """Emit the media events whose previews are ready."""
+        while True:
+            try:
+                event = self._ready.get_nowait()
+            except queue.Empty:
+                return
+            self._emit(event)
+
+    def close(self) -> None:
+        with self._lock:
+            pending = dict(self._pending)
+        if not self._should_cancel():
+            wait(pending, timeout=_GRACE_SECONDS)
+        for future, is_video in pending.items():
+            if future.cancel():
+                self._ready.put(events.media("", is_video))
+        self._pool.shutdown(wait=True)
+        self._session.close()
+        self.drain()
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(future, None)
+
+    def _deliver(self, src: str | None, path: Path | None, is_video: bool) -> None:
+        with metrics.THUMBNAILS.time():
+            data = self._cdn_thumbnail(src) if src else None
+            if data is None and path is not None:
+                data = thumbnail_jpeg(path)
+        self._ready.put(events.media(jpeg_data_uri(data) if data else "", is_video))
+
+    def _cdn_thumbnail(self, src: str) -> bytes | None:
+        import requests
+
+        url = small_variant(src)
+        if url is None:
+            return None
+        cached = self._folder / f"{hashlib.sha1(url.encode()).hexdigest()}.jpg"
+        try:
+            data = cached.read_bytes()
+            os.utime(cached)  # marks it recently used for prune()
+            return data
+        except OSError:
+            pass
+        try:
+            with tracing.span("preview fetch", "preview"):
+                response = self._session.get(url, timeout=self._timeout)
+                response.raise_for_status()
+        except requests.RequestException:
+            return None
+        data = thumbnail_jpeg(BytesIO(response.content))
+        if data is not None:
+            try:
+                with atomic_write(cached, "wb", durable=False) as f:
+                    f.write(data)
+            except OSError:
+                pass  # an unwritable state folder only costs the cache
+        return data
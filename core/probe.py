@@ -0,0 +1,109 @@
+"""Header probe: real image dimensions from ranged reads of the first few KB of each
+file, so pins below min_resolution are dropped before they are downloaded.
+"""
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+from .media_store import MediaStore
+from .preflight import run_bounded
+
+if TYPE_CHECKING:
+    import requests
+
+_CHUNK = 4096
+# Ranges grow 4 KB, 16 KB, 64 KB... Each one is read in full, so the connection goes back
+# to the pool; stop once this much has not revealed the dimensions (the pin is kept).
+_FIRST_RANGE = 4096
+_MAX_BYTES = 84 * 1024
+
+
+@dataclass
+class ProbeResult:
+    kept: MediaStore  # the pins to download, sharing records with the probed store
+    measured: int = 0
+    corrected: int = 0  # measured dimensions that differed from the metadata
+    dropped: int = 0
+    unknown: int = 0  # not probed: a request failed or the header never parsed
+
+
+def image_size(session: "requests.Session", url: str, timeout: float) -> tuple[int, int] | None:
+    """(width, height) from the start of the image at `url`, or None if not decodable."""
+    from PIL import ImageFile  # deferred like thumbnail_data_uri's import
+
+    parser = ImageFile.Parser()
+    start, length = 0, _FIRST_RANGE
+    while start < _MAX_BYTES:
+        headers = {"Range": f"bytes={start}-{start + length - 1}"}
+        with session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            # A server that ignores Range answers 200 with the whole file; closing the
+            # response once the header has parsed still stops that transfer early.
+            ranged = response.status_code == 206
+            for chunk in response.iter_content(_CHUNK):
+                try:
+                    parser.feed(chunk)
+                except OSError:
+                    return None
+                if parser.image is not None and not ranged:
+                    return parser.image.size
+            if parser.image is not None:
+                return parser.image.size
+            if not ranged or int(response.headers.get("Content-Length", 0)) < length:
+                return None  # the whole file was read without a decodable header
+        start, length = start + length, length * 4
+    return None
+
+
+def probe(
+    store: MediaStore,
+    session: "requests.Session",
+    min_resolution: tuple[int, int],
+    download_videos: bool,
+    max_workers: int,
+    timeout: float,
+    should_cancel: Callable[[], bool],
+    on_progress: Callable[[int, int], None],
+) -> ProbeResult:
+    """Measure every image pin in `store`, update its resolution and filter by size.
+
+    Pins that download a video stream are not probed. A failed probe keeps the pin.
+    on_progress gets (probed, to probe).
+    """
+    min_width, min_height = min_resolution
+    keep = [True] * len(store)
+    result = ProbeResult(kept=store)
+    targets = [
+        index
+        for index, media in enumerate(store)
+        if not (download_videos and media.video_stream is not None)
+    ]
+
+    def measure(target: int) -> tuple[int, int] | None:
+        return image_size(session, store[targets[target]].src, timeout)
+
+    def record(target: int, future: Future) -> None:
+        index = targets[target]
+        try:
+            size = future.result()
+        except Exception:
+            size = None
+        if size is None:
+            result.unknown += 1
+            return
+        result.measured += 1
+        if store.resolution(index) != size:
+            result.corrected += 1
+            store.set_resolution(index, *size)
+        if size[0] < min_width or size[1] < min_height:
+            keep[index] = False
+            result.dropped += 1
+
+    def progress(done: int) -> None:
+        on_progress(done, len(targets))
+
+    run_bounded(measure, len(targets), max_workers, should_cancel, record, progress)
+    if result.dropped:
+        result.kept = store.subset(index for index, kept in enumerate(keep) if kept)
+    return result
@@ -0,0 +1,628 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Callable, Iterator, Sequence
+
+from . import atomic, events, history, metrics, preflight, probe, tracing
+from .scrape_config import ScrapeConfig
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+    from pinterest_dl.download import MediaDownloader
+
+    from .archive import ArchiveWriter
+    from .previews import PreviewFetcher
+    from .session_pool import SessionPool
+
+
+def resolve_ffmpeg(custom_path: str | None = None) -> str | None:
+    """Resolve ffmpeg for the video-remux step: a custom override first, then PATH.
+
+    `shutil.which` validates that the target exists and is executable. Returns None
+    when neither resolves.
+    """
+    return shutil.which(custom_path) if custom_path else shutil.which("ffmpeg")
+
+
+def _tracing_sink(emit: events.Sink, path: str) -> events.Sink:
+    """Wrap `emit` so the trace file is written just before the terminal event goes out."""
+
+    def sink(event: events.Event) -> None:
+        if event["type"] in ("done", "error") and tracing.is_enabled():
+            try:
+                written = tracing.stop(path)
+                emit(events.log("info", f"Wrote trace to {written}"))
+            except OSError as e:
+                emit(events.log("warn", f"Could not write trace to {path}: {e}"))
+        emit(event)
+
+    return sink
+
+
+def _metrics_sink(emit: events.Sink) -> events.Sink:
+    """Wrap `emit` so the run's gauges drop back to idle when its terminal event goes out."""
+
+    def sink(event: events.Event) -> None:
+        if event["type"] in ("done", "error"):
+            for gauge in (metrics.RUN_ACTIVE, metrics.SCRAPE_TARGET, metrics.QUEUE_DEPTH):
+                gauge.set(0)
+            metrics.UNREPORTED.set(0)
+        emit(event)
+
+    return sink
+
+
+def _history_sink(
+    emit: events.Sink, recorder: history.RunRecorder, store: history.HistoryStore
+) -> events.Sink:
+    """Wrap `emit` so the run's history record is appended before its terminal event."""
+
+    def sink(event: events.Event) -> None:
+        if event["type"] in ("done", "error"):
+            try:
+                store.append(recorder.record(event))
+            except OSError as e:
+                emit(events.log("warn", f"Could not update run history: {e}"))
+        emit(event)
+
+    return sink
+
+
+def _reuse_sink(emit: events.Sink, sessions: "SessionPool") -> events.Sink:
+    """Wrap `emit` so this run's connection reuse is logged before its terminal event."""
+    before = sessions.stats()
+
+    def sink(event: events.Event) -> None:
+        if event["type"] in ("done", "error"):
+            after = sessions.stats()
+            sent = after["requests"] - before["requests"]
+            opened = after["connections"] - before["connections"]
+            if sent > 0:
+                reused = max(sent - opened, 0)
+                emit(
+                    events.log(
+                        "info",
+                        f"HTTP: {sent} requests over {opened} new connections "
+                        f"({reused / sent:.0%} reused)",
+                    )
+                )
+        emit(event)
+
+    return sink
+
+
+@contextmanager
+def _download_target(
+    config: ScrapeConfig, emit: events.Sink
+) -> Iterator["tuple[Path, ArchiveWriter | None]"]:
+    """Where run_download saves files, and the archive writer that takes them from there.
+
+    Without archive output that is just output_dir. With it, files are staged in a hidden
+    folder under output_dir that is removed, with anything left in it, once the writer
+    has closed its last archive -- on success, cancellation or error alike.
+    """
+    output_dir = Path(config.output_dir)
+    if config.archive == "none":
+        yield output_dir, None
+        return
+    from .archive import ArchiveWriter, archive_stem, cleanup_staging
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=output_dir))
+    stem = archive_stem(config)
+    writer = ArchiveWriter(output_dir, stem, config.archive, config.archive_max_mb * 2**20)
+    try:
+        yield staging, writer
+    finally:
+        try:
+            archives = writer.close()
+        finally:
+            cleanup_staging(staging)
+    if archives:
+        emit(events.log("info", f"Wrote {len(archives)} archive(s): {stem}_*.{config.archive}"))
+
+
+@contextmanager
+def _previews(
+    thumbnails: bool, config: ScrapeConfig, emit: events.Sink, should_cancel: Callable[[], bool]
+) -> "Iterator[PreviewFetcher | None]":
+    """A PreviewFetcher for the download phase; closing it emits its last media events."""
+    if not thumbnails:
+        yield None
+        return
+    from .previews import PreviewFetcher
+
+    keep_files = config.archive == "none"
+    previews = PreviewFetcher(emit, config.timeout, should_cancel, keep_files)
+    try:
+        yield previews
+    finally:
+        previews.close()
+
+
+def _report_estimate(
+    emit: events.Sink,
+    result: "preflight.Estimate",
+    config: ScrapeConfig,
+    history_store: history.HistoryStore | None,
+) -> None:
+    fmt = preflight.format_bytes
+    total = result.total
+    summary = f"Total: {fmt(total)} for {len(result.sizes)} files ({result.measured} measured"
+    if result.estimated:
+        summary += f", {result.estimated} videos estimated from their playlists"
+    if result.unknown:
+        summary += f", {result.unknown} unknown -- the total is a lower bound"
+    emit(events.log("info", summary + ")"))
+    for size, pin_id in result.largest:
+        emit(events.log("info", f"  {fmt(size):>9}  {pin_id}"))
+
+    free = preflight.free_space(Path(config.output_dir))
+    if free is not None:
+        level = "warn" if total > free else "info"
+        emit(events.log(level, f"Free space in {config.output_dir}: {fmt(free)}"))
+
+    rate = history_store.download_rate() if history_store is not None else None
+    if rate:
+        eta = preflight.format_duration(total / rate)
+        emit(events.log("info", f"Expected download time: ~{eta} at {fmt(rate)}/s (recent runs)"))
+    else:
+        emit(events.log("info", "No past downloads in the run history to estimate time from."))
+
+
+# pinterest_dl internals with no hook of their own, spanned only while tracing is on.
+def _instrument_scraper(scraper) -> None:
+    for method in ("_get_images", "_search_images", "_get_section_images"):
+        tracing.instrument(scraper, method, "scrape page", "pagination")
+
+
+def _instrument_downloader(downloader: "MediaDownloader") -> None:
+    hls = downloader.http_client.hls_processor
+    tracing.instrument(hls, "fetch_playlist", "hls playlist", "network")
+    tracing.instrument(hls, "download_segment", "hls segment", "network")
+    # ffmpeg runs are spanned in core.hls, which pipes segments to it directly.
+
+
+def execute(
+    config: ScrapeConfig,
+    emit: events.Sink,
+    should_cancel: Callable[[], bool],
+    thumbnails: bool = True,
+    sessions: "SessionPool | None" = None,
+    history_store: history.HistoryStore | None = None,
+    media: "Sequence[PinterestMedia] | None" = None,
+    verify_delta: Path | None = None,
+    on_failed: "Callable[[PinterestMedia], None] | None" = None,
+) -> None:
+    """Execute one run on the calling thread, reporting everything through `emit`.
+
+    Two shapes: download mode loads media from a cache JSON and downloads it;
+    scrape/search mode scrapes Pinterest, optionally saves a cache JSON, and
+    optionally stops there (metadata only) instead of downloading. A dry run stops
+    after sizing the media instead (core.preflight) and stores the sizes in the cache.
+
+    Every outcome ends in exactly one `done` or `error` event, so any sink (the GUI
+    bridge, a terminal, a JSON-lines stream) can treat those as terminal. With
+    `thumbnails` on, each media event carries a preview (core.previews); with it off they
+    carry none and Pillow is never imported.
+    A long-lived caller can pass its `sessions` pool so HTTP connections stay warm
+    across runs (and each run logs how many it reused); otherwise fresh sessions are
+    built for this run.
+
+    With `config.trace_path` (or PDL_TRACE) set, the run records core.tracing spans and
+    writes them out right before its terminal event. With a `history_store`, the run's
+    statistics (phase times, bytes, failure reasons, peak concurrency) are appended to
+    it the same way.
+
+    `media`, if given, is used as the run's media instead of loading or scraping it (watch
+    mode hands over the new pins it found); the run then goes straight to downloading.
+    With `verify_delta`, the run's verification outcomes are saved there rather than in
+    the output folder's state file (see Verifier.save). `on_failed` is called with each
+    pin whose download was attempted and failed; pins a stage filtered out on purpose
+    (e.g. the resolution probe) are not reported.
+    """
+    # Deferred so importing this module (e.g. for a CLI --help) stays cheap.
+    from pinterest_dl import PinterestDL, PinterestMedia
+    from pinterest_dl.download import USER_AGENT, MediaDownloader
+
+    from .downloader import (
+        apply_captions,
+        load_cache,
+        resolve_cache_path,
+        run_api_scrape,
+        run_api_search,
+        run_download,
+        save_cache,
+        sidecar_bytes,
+    )
+    from .checkpoint import ScrapeCheckpoint
+    from .layout import OutputIndex
+    from .media_store import MediaStore
+    from .verify import Verifier, find_ffprobe
+
+    trace_path = config.trace_path or tracing.env_path()
+    if trace_path:
+        emit = _tracing_sink(emit, trace_path)
+        tracing.start()
+    recorder = history.RunRecorder(config)
+    if history_store is not None:
+        emit = _history_sink(emit, recorder, history_store)
+    if sessions is not None:
+        emit = _reuse_sink(emit, sessions)
+    if metrics.is_enabled():
+        emit = _metrics_sink(emit)
+        metrics.RUN_ACTIVE.set(1)
+
+    emit(events.log("info", f"Starting run in '{config.mode}' mode..."))
+    # Initialized up front so the cancel/except paths can report partial counts even if
+    # never reach the download phase (media_list may not exists there)
+    scraped = 0
+    downloaded = 0
+    videos = 0
+    failed = 0
+    skipped = 0
+    saved = 0
+    try:
+        with events.forward_logs(emit):
+            if sessions is not None:
+                downloader = sessions.downloader(config)
+            else:
+                downloader = MediaDownloader(
+                    user_agent=USER_AGENT, timeout=config.timeout, max_retries=3
+                )
+            if tracing.is_enabled():
+                _instrument_downloader(downloader)
+
+            # Whether videos will be downloaded as streams, for the pre-download passes (the
+            # ffmpeg guard below makes the same decision, with its log lines).
+            videos_wanted = config.download_streams and (
+                config.skip_remux or resolve_ffmpeg(config.ffmpeg_path) is not None
+            )
+
+            def size_up() -> None:
+                # Dry run: size every pin and report, instead of downloading anything.
+                total = len(media_list)
+                emit(events.log("info", f"Sizing {total} files (dry run)..."))
+                emit(events.progress("estimate", 0, total))
+                with recorder.phase("estimate"), tracing.span("estimate", files=total):
+                    result = preflight.estimate(
+                        media_list,
+                        downloader.http_client.session,
+                        videos_wanted,
+                        config.max_workers,
+                        config.timeout,
+                        should_cancel,
+                        lambda done: emit(events.progress("estimate", done, total)),
+                    )
+                if isinstance(media_list, MediaStore):
+                    for index, size in enumerate(result.sizes):
+                        media_list.set_size(index, size)
+                _report_estimate(emit, result, config, history_store)
+
+            def probe_images(media_list: "Sequence[PinterestMedia]") -> MediaStore:
+                # Real dimensions from each image's header; drop those below min_resolution.
+                store = media_list if isinstance(media_list, MediaStore) else MediaStore(media_list)
+                emit(events.log("info", "Probing image headers for their real dimensions..."))
+                with recorder.phase("probe"), tracing.span("probe", files=len(store)):
+                    result = probe.probe(
+                        store,
+                        downloader.http_client.session,
+                        config.min_resolution,
+                        videos_wanted,
+                        config.max_workers,
+                        config.timeout,
+                        should_cancel,
+                        lambda done, total: emit(events.progress("estimate", done, total)),
+                    )
+                summary = f"Probed {result.measured} images: {result.corrected} had wrong metadata"
+                if result.dropped:
+                    w, h = config.min_resolution
+                    summary += f", dropped {result.dropped} below {w}x{h}"
+                emit(events.log("info", summary + "."))
+                if result.unknown:
+                    emit(events.log("warn", f"Could not probe {result.unknown} images; kept them."))
+                return result.kept
+
+            # === acquire media: take it as given, load a cache file, or scrape Pinterest ===
+            if media is not None:
+                media_list = media
+                scraped = len(media_list)
+            elif config.mode == "download":
+                if should_cancel():
+                    raise events.RunCancelled()
+                emit(events.log("info", f"Loading cache file: {config.url}"))
+                with recorder.phase("load cache"), tracing.span("load cache"):
+                    media_list = load_cache(Path(config.url))
+                scraped = len(media_list)
+                if scraped == 0:
+                    emit(events.log("warn", "Cache file contains no records."))
+                else:
+                    emit(events.log("info", f"Loaded {scraped} records from cache."))
+            else:
+                # Cookies are optional; required only for private boards. Bad path/format
+                # raises here and surfaces as a run error rather than failing silently.
+                if sessions is not None:
+                    scraper = sessions.scraper(config)  # loads config.cookies itself
+                else:
+                    scraper = PinterestDL.with_api(
+                        timeout=config.timeout, ensure_alt=config.ensure_alt
+                    )
+                    if config.cookies:
+                        scraper.with_cookies_path(config.cookies)
+                if config.cookies:
+                    emit(events.log("info", f"Using cookies: {config.cookies}"))
+                if tracing.is_enabled():
+                    _instrument_scraper(scraper)
+
+                def on_progress(media):
+                    nonlocal scraped
+                    if should_cancel():
+                        raise events.RunCancelled()
+                    scraped += 1
+                    metrics.SCRAPED.inc()
+                    emit(events.progress("scrape", scraped, config.num))
+
+                metrics.SCRAPE_TARGET.set(config.num)
+                checkpoint = None
+                if config.resume:
+                    checkpoint = ScrapeCheckpoint.for_config(config)
+                    restored = checkpoint.load()
+                    if restored:
+                        emit(
+                            events.log(
+                                "info",
+                                f"Resuming an interrupted scrape: {restored} pins already "
+                                "collected",
+                            )
+                        )
+
+                if config.mode == "scrape":
+                    emit(events.log("info", f"Scraping up to {config.num} items from {config.url}"))
+                    with recorder.phase("scrape"), tracing.span("scrape", url=config.url):
+                        media_list = run_api_scrape(scraper, config, on_progress, checkpoint)
+                elif config.mode == "search":
+                    emit(
+                        events.log("info", f"Searching '{config.url}' for up to {config.num} items")
+                    )
+                    with recorder.phase("scrape"), tracing.span("search", query=config.url):
+                        media_list = run_api_search(scraper, config, on_progress, checkpoint)
+                else:
+                    raise ValueError(f"Unsupported mode: {config.mode}")
+
+                if scraped == 0:
+                    # The most common silent failure: bad URL/query, or missing/expired
+                    # cookies for a private board. Flag it instead of reporting a clean run.
+                    emit(
+                        events.log(
+                            "warn",
+                            "No media found. Check the URL/query, or your cookies for "
+                            "private boards.",
+                        )
+                    )
+                else:
+                    emit(events.log("info", f"Scraped {scraped} media items."))
+
+            # === measure before downloading: header probe, dry-run sizing ===
+            loaded = media_list
+            if config.probe_resolution:
+                media_list = probe_images(media_list)
+            if config.dry_run:
+                size_up()
+            measured = config.probe_resolution or config.dry_run
+            if media is None and config.mode == "download" and measured:
+                # Write the measurements back into the cache, dropped pins included.
+                cache = Path(config.url)
+                if cache.suffix.lower() == ".json":
+                    save_cache(loaded, cache)
+                    emit(events.log("info", f"Stored the measurements in {cache}"))
+
+            if media is None and config.mode != "download":
+                # === optionally persist the scraped records for later reuse ===
+                if config.save_cache:
+                    cache_path = resolve_cache_path(config.cache_path, config.output_dir)
+                    with recorder.phase("save cache"), tracing.span("save cache"):
+                        save_cache(media_list, cache_path)
+                    saved = len(media_list)
+                    emit(events.log("info", f"Saved {saved} records to {cache_path}"))
+
+                # === metadata-only: stop before downloading ===
+                if config.skip_download:
+                    emit(events.done(scraped, downloaded, videos, saved))
+                    return
+
+            if config.dry_run:
+                emit(events.done(scraped, downloaded, videos, saved))
+                return
+
+            # === sharded download: the shard processes take it from here ===
+            if config.processes > 1 and len(media_list) > 1:
+                from . import shards
+
+                total = len(media_list)
+                count = min(config.processes, total)
+                emit(events.log("info", f"Downloading {total} files in {count} processes"))
+                emit(events.progress("download", 0, total))
+                store = media_list if isinstance(media_list, MediaStore) else MediaStore(media_list)
+                with recorder.phase("download"), tracing.span("sharded download", shards=count):
+                    result = shards.run_sharded(config, store, emit, should_cancel, thumbnails)
+                for record in result.records:
+                    recorder.add_shard(record)
+                downloaded, videos = result.downloaded, result.videos
+                if result.errors:
+                    emit(events.error("; ".join(result.errors)))
+                    return
+                if should_cancel():
+                    raise events.RunCancelled()
+                summary = f"Downloaded {downloaded} files ({videos} videos)"
+                if result.failed:
+                    summary += f", {result.failed} skipped"
+                emit(events.log("info", summary + "."))
+                emit(events.done(scraped, downloaded, videos, saved))
+                return
+
+            # === ffmpeg guard: ===
+            # downgrade videos -> images if remux needed but unavailable
+            download_streams = config.download_streams
+            if download_streams and not config.skip_remux:
+                ffmpeg = resolve_ffmpeg(config.ffmpeg_path)
+                if ffmpeg is None:
+                    download_streams = False
+                    emit(
+                        events.log("warn", "FFmpeg not found; downloading images instead of videos")
+                    )
+                elif config.ffmpeg_path:
+                    # The library invokes bare "ffmpeg" via subprocess, so a custom path is
+                    # only honored if its directory is on PATH for the remux step.
+                    ffmpeg_dir = str(Path(ffmpeg).parent)
+                    path_entries = os.environ.get("PATH", "").split(os.pathsep)
+                    if ffmpeg_dir not in path_entries:
+                        os.environ["PATH"] = ffmpeg_dir + os.pathsep + os.environ.get("PATH", "")
+                        emit(events.log("info", f"Using ffmpeg: {ffmpeg}"))
+
+            # === download phase ===
+            # Temp files and partial downloads that crashed runs left behind (core.atomic).
+            swept = atomic.sweep(Path(config.output_dir))
+            if swept:
+                emit(events.log("info", f"Removed {swept} unfinished files left by an earlier run"))
+            existing = None
+            if config.skip_existing:
+                # One listing of the output folder up front instead of a stat per pin.
+                with recorder.phase("index"), tracing.span("index output"):
+                    existing = OutputIndex.scan(Path(config.output_dir))
+                emit(events.log("info", f"Found {len(existing)} files already in the output"))
+            total = len(media_list)
+            emit(events.log("info", f"Downloading {total} files to {config.output_dir}"))
+            emit(events.progress("download", 0, total))  # flip phase label to Downloading
+
+            # `completed` is the running count of finished files (successes + failures), so
+            # the bar still reaches total when files are skipped; `downloaded` counts only
+            # successes. With concurrent downloads, callbacks fire in completion order.
+            def on_file_downloaded(completed: int, media: PinterestMedia):
+                nonlocal downloaded, videos
+                downloaded += 1
+                recorder.file_done(media.local_path)
+                is_video_file = download_streams and media.video_stream is not None
+                if is_video_file:
+                    videos += 1
+                emit(events.progress("download", completed, total))
+                # The preview fetcher emits the media event once it has the pin's preview.
+                if previews is not None:
+                    previews.add(media, is_video_file)
+                    previews.drain()
+                else:
+                    emit(events.media("", is_video_file))
+                if writer is not None:
+                    archive(media)
+
+            def archive(media: PinterestMedia) -> None:
+                # Captions go in with the file, since nothing is left on disk to add them to.
+                arcname = media.local_path.relative_to(target_dir).as_posix()
+                sidecars = {}
+                if config.caption in ("txt", "json"):
+                    data = sidecar_bytes(media, config.caption)
+                    if data is not None:
+                        name = PurePosixPath(arcname).with_suffix(f".{config.caption}")
+                        sidecars[str(name)] = data
+                elif config.caption == "metadata":
+                    apply_captions([media], config.caption)
+                writer.add(media, arcname, sidecars)
+
+            def on_file_failed(completed: int, media: PinterestMedia, exc: Exception):
+                nonlocal failed
+                failed += 1
+                recorder.file_failed(exc)
+                if on_failed is not None:
+                    on_failed(media)
+                emit(events.log("warn", f"Skipped {media.id}: {type(exc).__name__}: {exc}"))
+                emit(events.progress("download", completed, total))
+
+            if config.download_order != "scrape":
+                emit(events.log("info", f"Download order: {config.download_order}"))
+
+            def on_file_skipped(completed: int, media: PinterestMedia):
+                nonlocal skipped
+                skipped += 1
+                emit(events.progress("download", completed, total))
+
+            verifier = None
+            if config.verify:
+                # Archive output verifies staged files, which are gone by the next run.
+                ffprobe = find_ffprobe(config.ffmpeg_path)
+                persist = config.archive == "none"
+                verifier = Verifier(Path(config.output_dir), ffprobe, persist=persist)
+
+            def report_verification(verifier: Verifier) -> None:
+                verifier.save(verify_delta)
+                line = f"Verified {verifier.checked} files"
+                if verifier.refetched:
+                    line += f"; re-fetched {verifier.refetched} corrupt"
+                if verifier.corrupt:
+                    line += f"; {verifier.corrupt} still corrupt after retries"
+                emit(events.log("info", line))
+                if verifier.videos_unchecked:
+                    emit(
+                        events.log(
+                            "warn",
+                            f"ffprobe not found; {verifier.videos_unchecked} videos were not "
+                            "checked",
+                        )
+                    )
+
+            download_span = tracing.span(
+                "download phase",
+                files=total,
+                workers=config.max_workers,
+                order=config.download_order,
+            )
+            with (
+                recorder.phase("download"),
+                download_span,
+                _download_target(config, emit) as (target_dir, writer),
+                _previews(thumbnails, config, emit, should_cancel) as previews,
+            ):
+                run_download(
+                    media_list,
+                    downloader,
+                    target_dir,
+                    download_streams,
+                    config.skip_remux,
+                    config.max_workers,
+                    on_file_downloaded,
+                    on_file_failed,
+                    should_cancel,
+                    on_active=recorder.in_flight,
+                    order=config.download_order,
+                    layout=config.layout,
+                    existing=existing,
+                    on_file_skipped=on_file_skipped,
+                    verifier=verifier,
+                    on_idle=previews.drain if previews is not None else None,
+                )
+            if verifier is not None:
+                report_verification(verifier)
+            if should_cancel():  # cancelled between files
+                raise events.RunCancelled()
+
+            summary = f"Downloaded {downloaded} files ({videos} videos)"
+            if failed:
+                summary += f", {failed} skipped"
+            if skipped:
+                summary += f", {skipped} already present"
+            emit(events.log("info", summary + "."))
+
+            # === captions: write sidecars / embed EXIF for the downloaded files ===
+            # (archive output has already stored them alongside each file)
+            if config.caption != "none" and config.archive == "none":
+                with recorder.phase("captions"):
+                    apply_captions(media_list, config.caption)
+                emit(events.log("info", f"Wrote captions ({config.caption})"))
+
+            emit(events.done(scraped, downloaded, videos, saved))
+    except events.RunCancelled:
+        recorder.cancelled = True
+        emit(events.log("info", "Run cancelled by user."))
+        emit(events.done(scraped, downloaded, videos, saved))
+    except Exception as e:
+        emit(events.error(f"An unexpected error occurred: {str(e)}"))
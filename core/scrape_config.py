@@ -1,4 +1,12 @@
 from dataclasses import dataclass
+from pathlib import Path
+
+# run_download scheduling policies (core.download_order); the first is the default.
+DOWNLOAD_ORDERS = ("scrape", "images_first", "smallest_first", "round_robin")
+# Output folder layouts (core.layout): everything in output_dir, or two-character shards.
+LAYOUTS = ("flat", "id", "hash")
+# Archive output (core.archive): loose files, or a rolling set of size-capped archives.
+ARCHIVES = ("none", "zip", "tar")
 
 
 @dataclass
@@ -13,6 +21,9 @@ class ScrapeConfig:
     download_streams: bool
     timeout: float = 10.0  # per-request timeout for both scrape and download
     max_workers: int = 8  # concurrent download threads; clamped 1-16 at the API boundary
+    # Download-mode only: split the cache across this many processes (core.shards), each
+    # with its own max_workers threads. Clamped 1-16 like max_workers.
+    processes: int = 1
     ensure_alt: bool = False  # strict alt-text: drop assets lacking captions
     # How media is acquired: "scrape"/"search" hit Pinterest; "download" loads a previously
     # saved cache JSON whose path is carried in `url`.
@@ -21,9 +32,119 @@ class ScrapeConfig:
     save_cache: bool = False
     cache_path: str | None = None  # empty -> auto metadata_<timestamp>.json under output_dir
     skip_download: bool = False  # scrape + save cache only; don't download media
+    # Size everything with HEAD requests and report totals instead of downloading
+    # (core.preflight); the sizes are stored in the cache.
+    dry_run: bool = False
+    # Read each image's real dimensions from its first few KB (core.probe) and apply
+    # min_resolution to those before downloading.
+    probe_resolution: bool = False
     caption_from_title: bool = False
     # Sidecar/EXIF caption output written after download: "none"/"txt"/"json"/"metadata".
     caption: str = "none"
     skip_remux: bool = False
     cookies: str | None = None
     ffmpeg_path: str | None = None
+    # Which pins the download workers take first; one of DOWNLOAD_ORDERS.
+    download_order: str = "scrape"
+    layout: str = "flat"  # one of LAYOUTS
+    # Don't re-download pins whose file is already in output_dir (in any layout).
+    skip_existing: bool = False
+    # Check every downloaded file's integrity and re-download corrupt ones (core.verify).
+    verify: bool = False
+    # Checkpoint the scrape, and continue an interrupted one of the same source (core.checkpoint).
+    resume: bool = False
+    # Stream downloads into <output_dir>/<name>_0001.zip (or .tar), ... instead of loose files.
+    archive: str = "none"  # one of ARCHIVES
+    archive_max_mb: int = 2048  # size cap per archive before rolling over to the next
+    trace_path: str | None = None  # write a Chrome trace of this run here (core.tracing)
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "ScrapeConfig":
+        """Validate a run request (the frontend's RunPayload shape) and build a config.
+
+        Shared by every entry point so a run means the same thing from the GUI, the CLI
+        or a config file. Raises ValueError with a user-facing message on bad input.
+        """
+        mode = str(payload.get("mode", "scrape"))
+        save_cache = bool(payload.get("save_cache", False))
+        skip_download = bool(payload.get("skip_download", False))
+
+        url = str(payload.get("url", "")).strip()
+        if not url:
+            label = {"download": "A cache JSON file", "search": "A search query"}.get(
+                mode, "Source URL"
+            )
+            raise ValueError(f"{label} is required.")
+
+        if mode == "download" and not Path(url).is_file():
+            raise ValueError(f"Cache file not found: {url}")
+
+        # Metadata-only only applies when scraping; download mode ignores both flags.
+        if mode != "download" and skip_download and not save_cache:  # would produce nothing
+            raise ValueError("Skip download requires Save metadata cache to be enabled.")
+
+        res_w, res_h = payload["min_resolution"]  # JS sends [w, h]; unpack asserts length 2
+
+        # Cap concurrency at the boundary so a bad/forged payload can't spawn a thread storm
+        # (and going past the shared HTTP pool size of 10 only churns connections anyway).
+        max_workers = max(1, min(16, int(payload.get("max_workers", 8))))
+        processes = max(1, min(16, int(payload.get("processes", 1))))
+        if processes > 1 and mode != "download":
+            raise ValueError("Multiple processes are only supported in Download mode.")
+
+        download_order = str(payload.get("download_order", "scrape"))
+        if download_order not in DOWNLOAD_ORDERS:
+            raise ValueError(
+                f"Unknown download order: {download_order} (expected one of "
+                f"{', '.join(DOWNLOAD_ORDERS)})."
+            )
+
+        layout = str(payload.get("layout", "flat"))
+        if layout not in LAYOUTS:
+            raise ValueError(
+                f"Unknown output layout: {layout} (expected one of {', '.join(LAYOUTS)})."
+            )
+
+        archive = str(payload.get("archive", "none"))
+        if archive not in ARCHIVES:
+            raise ValueError(
+                f"Unknown archive format: {archive} (expected one of {', '.join(ARCHIVES)})."
+            )
+        skip_existing = bool(payload.get("skip_existing", False))
+        if archive != "none" and skip_existing:  # nothing is left in the folder to find
+            raise ValueError("Skip existing files cannot be combined with archive output.")
+        archive_max_mb = int(payload.get("archive_max_mb", 2048))
+        if archive_max_mb < 1:
+            raise ValueError("Archive size cap must be at least 1 MB.")
+
+        return cls(
+            url=url,
+            mode=mode,
+            num=int(payload["num"]),
+            output_dir=str(payload["output_dir"]),
+            min_resolution=(int(res_w), int(res_h)),
+            delay=float(payload["delay"]),
+            timeout=float(payload.get("timeout", 10.0)),
+            max_workers=max_workers,
+            processes=processes,
+            cookies=(str(payload.get("cookies", "")).strip() or None),
+            ensure_alt=bool(payload.get("ensure_alt", False)),
+            ffmpeg_path=(str(payload.get("ffmpeg_path", "")).strip() or None),
+            download_streams=bool(payload["download_streams"]),
+            skip_remux=bool(payload.get("skip_remux", False)),
+            caption_from_title=bool(payload.get("caption_from_title", False)),
+            caption=str(payload.get("caption", "none")),
+            save_cache=save_cache,
+            cache_path=(str(payload.get("cache_path", "")).strip() or None),
+            skip_download=skip_download,
+            dry_run=bool(payload.get("dry_run", False)),
+            probe_resolution=bool(payload.get("probe_resolution", False)),
+            download_order=download_order,
+            layout=layout,
+            skip_existing=skip_existing,
+            verify=bool(payload.get("verify", False)),
+            resume=bool(payload.get("resume", False)),
+            archive=archive,
+            archive_max_mb=archive_max_mb,
+            trace_path=(str(payload.get("trace_path", "")).strip() or None),
+        )
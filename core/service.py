@@ -0,0 +1,330 @@
+import ipaddress
+import itertools
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Literal
+from urllib.parse import parse_qs, urlsplit
+
+from . import events, history, runner
+from .scrape_config import ScrapeConfig
+from .session_pool import SessionPool
+
+JobState = Literal["queued", "running", "done", "error", "cancelled"]
+
+# Per-subscriber backlog. A client that falls this far behind is disconnected rather than
+# letting one stalled reader grow the worker's memory without bound.
+_SUBSCRIBER_BACKLOG = 2048
+_KEEPALIVE_SECONDS = 15.0
+# Finished jobs kept for GET /runs; older ones are dropped (their runs stay in /history).
+_FINISHED_JOBS = 200
+_LOOPBACK_NAMES = ("localhost", "127.0.0.1", "[::1]")
+
+
+@dataclass
+class Job:
+    """One submitted run and its lifecycle, as reported by GET /runs."""
+
+    id: int
+    config: ScrapeConfig
+    state: JobState = "queued"
+    result: events.Event | None = None  # the terminal done/error event, once finished
+    submitted_at: float = field(default_factory=time.time)
+    stop: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "state": self.state,
+            "mode": self.config.mode,
+            "url": self.config.url,
+            "submitted_at": self.submitted_at,
+            "result": self.result,
+        }
+
+
+class RunService:
+    """Long-running worker that executes submitted runs one at a time.
+
+    Jobs queue in submission order and run on a single worker thread, the same
+    one-run-at-a-time rule the GUI enforces. Every event is fanned out to all
+    subscribers tagged with its job id. All jobs share one SessionPool, so HTTP
+    connections stay warm between jobs instead of being rebuilt per run. Only the
+    latest _FINISHED_JOBS finished jobs are kept.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: dict[int, Job] = {}
+        self._pending: queue.Queue[Job] = queue.Queue()
+        self._subscribers: set[queue.Queue[events.Event | None]] = set()
+        self.sessions = SessionPool()
+        self.history = history.HistoryStore(history.default_path())
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+
+    def submit(self, payload: dict) -> Job:
+        """Validate a run request and queue it. Raises ValueError on a bad payload."""
+        config = ScrapeConfig.from_payload(payload)
+        with self._lock:
+            job = Job(id=next(self._ids), config=config)
+            self._jobs[job.id] = job
+        self._pending.put(job)
+        return job
+
+    def terminate(self, job_id: int | None = None) -> bool:
+        """Cancel a job (or the running one when no id is given). Returns False if none."""
+        with self._lock:
+            if job_id is None:
+                job = next((j for j in self._jobs.values() if j.state == "running"), None)
+            else:
+                job = self._jobs.get(job_id)
+            if job is None or job.state not in ("queued", "running"):
+                return False
+        job.stop.set()  # a queued job sees this when dequeued and never starts
+        return True
+
+    def jobs(self) -> list[dict]:
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def job(self, job_id: int) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def subscribe(self) -> "queue.Queue[events.Event | None]":
+        subscriber: queue.Queue[events.Event | None] = queue.Queue(_SUBSCRIBER_BACKLOG)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: "queue.Queue[events.Event | None]") -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _broadcast(self, job: Job, event: events.Event) -> None:
+        tagged = {**event, "run": job.id}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(tagged)
+            except queue.Full:
+                # Too slow to keep up: drop it, and leave a None sentinel so its stream closes.
+                self.unsubscribe(subscriber)
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _set_state(self, job: Job, state: JobState) -> None:
+        with self._lock:
+            job.state = state
+            if state in ("queued", "running"):
+                return
+            finished = [j.id for j in self._jobs.values() if j.state not in ("queued", "running")]
+            for job_id in finished[:-_FINISHED_JOBS]:  # dicts keep submission order
+                del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job = self._pending.get()
+            if job.stop.is_set():
+                self._set_state(job, "cancelled")
+                self._broadcast(job, events.log("info", "Run cancelled before it started."))
+                continue
+            self._set_state(job, "running")
+
+            def emit(event: events.Event, job: Job = job) -> None:
+                if event["type"] in ("done", "error"):
+                    with self._lock:
+                        job.result = event
+                self._broadcast(job, event)
+
+            runner.execute(
+                job.config,
+                emit,
+                job.stop.is_set,
+                thumbnails=False,  # remote consumers read files off disk, not data URIs
+                sessions=self.sessions,
+                history_store=self.history,
+            )
+            if job.result is not None and job.result["type"] == "error":
+                self._set_state(job, "error")
+            else:
+                self._set_state(job, "cancelled" if job.stop.is_set() else "done")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes the service's small JSON/SSE API onto a RunService."""
+
+    server: "ServiceServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if not self._check_caller():
+            return
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if path == "/events":
+            self._stream_events()
+        elif path == "/runs":
+            self._send_json(200, self.server.service.jobs())
+        elif path == "/sessions":
+            self._send_json(200, self.server.service.sessions.stats())
+        elif path.startswith("/runs/") and path[len("/runs/") :].isdigit():
+            job = self.server.service.job(int(path[len("/runs/") :]))
+            if job is None:
+                self._send_json(404, {"success": False, "message": "No such run."})
+            else:
+                self._send_json(200, job)
+        elif path.startswith("/history"):
+            self._send_history(path, query)
+        else:
+            self._send_json(404, {"success": False, "message": "Not found."})
+
+    def _send_history(self, path: str, query: dict[str, str]) -> None:
+        store = self.server.service.history
+        try:
+            if path == "/history":
+                limit, offset = int(query.get("limit", 50)), int(query.get("offset", 0))
+                self._send_json(200, store.recent(limit, offset))
+            elif path == "/history/compare":
+                if "base" not in query or "other" not in query:
+                    raise ValueError("Compare needs ?base=<id>&other=<id>.")
+                self._send_json(200, store.compare(query["base"], query["other"]))
+            else:
+                record = store.get(path[len("/history/") :])
+                if record is None:
+                    self._send_json(404, {"success": False, "message": "No such run."})
+                else:
+                    self._send_json(200, record)
+        except KeyError as e:
+            self._send_json(404, {"success": False, "message": f"No such run: {e.args[0]}"})
+        except ValueError as e:
+            self._send_json(400, {"success": False, "message": str(e)})
+
+    def do_POST(self) -> None:
+        if not self._check_caller():
+            return
+        path = self.path.split("?", 1)[0].rstrip("/")
+        service = self.server.service
+        if path == "/runs":
+            if self.headers.get_content_type() != "application/json":
+                # Forms can't send it, so a cross-site page can't queue a job without CORS.
+                message = "Content-Type must be application/json."
+                self._send_json(415, {"success": False, "message": message})
+                return
+            try:
+                payload = self._read_json()
+                job = service.submit(payload)
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"success": False, "message": str(e)})
+                return
+            self._send_json(202, {"success": True, "id": job.id})
+        elif path == "/terminate":
+            self._send_json(200, {"success": service.terminate()})
+        elif path.startswith("/runs/") and path.endswith("/terminate"):
+            job_id = path[len("/runs/") : -len("/terminate")]
+            if not job_id.isdigit():
+                self._send_json(404, {"success": False, "message": "Not found."})
+                return
+            self._send_json(200, {"success": service.terminate(int(job_id))})
+        else:
+            self._send_json(404, {"success": False, "message": "Not found."})
+
+    def _check_caller(self) -> bool:
+        """Reject browser pages from other sites: DNS rebinding (Host) and CSRF (Origin).
+
+        Sends a 403 and returns False for a request that fails either check.
+        """
+        host, port = self.server.server_address[:2]
+        if _is_loopback(host):
+            allowed = {f"{name}:{port}" for name in (*_LOOPBACK_NAMES, host)}
+            if self.headers.get("Host", "").lower() not in allowed:
+                self._send_json(403, {"success": False, "message": "Unexpected Host header."})
+                return False
+        # A host bound off loopback is reached under names we can't know; the CLI warns.
+        origin = self.headers.get("Origin")
+        if origin is not None and not _is_loopback(urlsplit(origin).hostname or ""):
+            self._send_json(403, {"success": False, "message": "Cross-origin request."})
+            return False
+        return True
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object.")
+        return payload
+
+    def _send_json(self, status: int, body: object) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self) -> None:
+        """Stream every run event as server-sent events until the client disconnects."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")  # SSE holds the socket; no keep-alive reuse
+        self.end_headers()
+        self.close_connection = True
+
+        subscriber = self.server.service.subscribe()
+        sequence = itertools.count(1)
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")  # comment line; keeps proxies open
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    return  # dropped as a slow subscriber
+                message = (
+                    f"id: {next(sequence)}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                )
+                self.wfile.write(message.encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away
+        finally:
+            self.server.service.unsubscribe(subscriber)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # request lines would interleave with run output; events carry what matters
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+class ServiceServer(ThreadingHTTPServer):
+    daemon_threads = True  # SSE handlers block for the life of the stream
+
+    def __init__(self, address: tuple[str, int], service: RunService) -> None:
+        super().__init__(address, _Handler)
+        self.service = service
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765) -> ServiceServer:
+    """Build a service bound to host:port. Call serve_forever() on the result."""
+    return ServiceServer((host, port), RunService())
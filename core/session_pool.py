@@ -0,0 +1,213 @@
+"""Long-lived HTTP sessions shared by every run of one Api or service instance, rebuilt
+only when their timeout or cookies file changes.
+"""
+
+import functools
+import os
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .scrape_config import ScrapeConfig
+
+if TYPE_CHECKING:
+    import requests
+    from pinterest_dl import ApiScraper
+    from pinterest_dl.download import MediaDownloader
+
+# ScrapeConfig.from_payload clamps max_workers to 16; size each host's connection pool to
+# match, or urllib3 drops connections past its default 10 and every download beyond that
+# opens (and TLS-negotiates) a new one.
+_POOL_MAXSIZE = 16
+_CDN_URL = "https://i.pinimg.com/"
+
+
+@dataclass(frozen=True)
+class _Key:
+    timeout: float
+    cookies: str | None
+    cookies_mtime: float | None  # a re-captured cookies file at the same path counts as new
+
+
+def _key_for(timeout: float, cookies: str | None) -> _Key:
+    try:
+        mtime = os.path.getmtime(cookies) if cookies else None
+    except OSError:
+        mtime = None  # with_cookies_path reports the missing file when the run starts
+    return _Key(timeout, cookies, mtime)
+
+
+def _widen_pools(session: "requests.Session") -> None:
+    """Remount the session's adapters with a pool as large as the worker cap."""
+    from requests.adapters import HTTPAdapter
+
+    for prefix in ("http://", "https://"):
+        current = session.get_adapter(prefix)
+        adapter = HTTPAdapter(
+            max_retries=current.max_retries, pool_maxsize=_POOL_MAXSIZE, pool_block=False
+        )
+        session.mount(prefix, adapter)
+        current.close()
+
+
+def _pool_stats(session: "requests.Session") -> tuple[int, int]:
+    """(connections opened, requests sent) over the session's live urllib3 pools."""
+    connections = requests_sent = 0
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():  # keys() copies under the container's lock
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+    return connections, requests_sent
+
+
+class _Generation:
+    """The sessions built for one (timeout, cookies) setting."""
+
+    def __init__(self, key: _Key) -> None:
+        import requests
+        from pinterest_dl.download import USER_AGENT, MediaDownloader
+
+        self.key = key
+        self.downloader = MediaDownloader(
+            user_agent=USER_AGENT, timeout=key.timeout, max_retries=3
+        )
+        _widen_pools(self.downloader.http_client.session)
+        self.api_session = requests.Session()
+        _widen_pools(self.api_session)
+        self.default_cookies: dict | None = None
+        self._cookie_lock = threading.Lock()
+
+    def get_default_cookies(self, base_url: str) -> dict:
+        # Api fetches anonymous cookies with a bare requests.get on every client it builds;
+        # fetch them once per generation, over the pooled session.
+        with self._cookie_lock:
+            if self.default_cookies is None:
+                response = self.api_session.get(base_url, timeout=self.key.timeout)
+                self.default_cookies = response.cookies.get_dict()
+            return self.default_cookies
+
+    def sessions(self) -> list["requests.Session"]:
+        return [self.downloader.http_client.session, self.api_session]
+
+    def close(self) -> None:
+        for session in self.sessions():
+            session.close()
+
+
+class SessionPool:
+    """Thread-safe owner of the current session generation."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._generation: _Generation | None = None
+        # Totals carried over from closed generations, so stats() stays cumulative.
+        self._retired = (0, 0)
+
+    def _current(self, timeout: float, cookies: str | None) -> _Generation:
+        key = _key_for(timeout, cookies)
+        with self._lock:
+            if self._generation is None or self._generation.key != key:
+                if self._generation is not None:
+                    # Settings changed: drop the old connections rather than reuse them
+                    # with stale cookies or timeouts.
+                    connections, requests_sent = self._stats(self._generation)
+                    self._retired = (
+                        self._retired[0] + connections,
+                        self._retired[1] + requests_sent,
+                    )
+                    self._generation.close()
+                self._generation = _Generation(key)
+            return self._generation
+
+    def downloader(self, config: ScrapeConfig) -> "MediaDownloader":
+        return self._current(config.timeout, config.cookies).downloader
+
+    def scraper(self, config: ScrapeConfig) -> "ApiScraper":
+        """An ApiScraper for this run whose API clients all share the pooled session."""
+        generation = self._current(config.timeout, config.cookies)
+        scraper = _pooled_scraper_class()(generation, timeout=config.timeout)
+        scraper.ensure_alt = config.ensure_alt
+        if config.cookies:
+            scraper.with_cookies_path(config.cookies)
+        return scraper
+
+    def prewarm(self, timeout: float, cookies: str | None = None) -> None:
+        """Open connections to Pinterest and its CDN ahead of the first run.
+
+        Blocking; callers run it on a background thread. Network errors are swallowed,
+        since the first run will surface them properly.
+        """
+        from pinterest_dl.api.endpoints import Endpoint
+
+        generation = self._current(timeout, cookies)
+        try:
+            if not cookies:
+                generation.get_default_cookies(Endpoint._BASE)
+            generation.downloader.http_client.session.head(_CDN_URL, timeout=timeout)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _stats(generation: _Generation) -> tuple[int, int]:
+        totals = [0, 0]
+        for session in generation.sessions():
+            connections, requests_sent = _pool_stats(session)
+            totals[0] += connections
+            totals[1] += requests_sent
+        return totals[0], totals[1]
+
+    def stats(self) -> dict:
+        """Cumulative connection reuse since the pool was created."""
+        with self._lock:
+            connections, requests_sent = self._retired
+            if self._generation is not None:
+                live = self._stats(self._generation)
+                connections += live[0]
+                requests_sent += live[1]
+        reused = max(requests_sent - connections, 0)
+        return {
+            "connections": connections,
+            "requests": requests_sent,
+            "reused": reused,
+            "reuse_ratio": round(reused / requests_sent, 3) if requests_sent else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._generation is not None:
+                self._generation.close()
+                self._generation = None
+
+
+@functools.cache
+def _pooled_scraper_class():
+    """ApiScraper subclass whose _create_api swaps in the generation's shared session.
+
+    Built on first use so importing this module doesn't import pinterest_dl.
+    """
+    from pinterest_dl import ApiScraper
+    from pinterest_dl.api.api import Api
+    from pinterest_dl.api.endpoints import Endpoint
+
+    class PooledApiScraper(ApiScraper):
+        def __init__(self, generation: _Generation, **kwargs) -> None:
+            super().__init__(**kwargs)
+            self._generation = generation
+
+        def _create_api(self, url: str) -> Api:
+            generation = self._generation
+            cookies = self.cookies or generation.get_default_cookies(Endpoint._BASE)
+            api = Api(url, cookies, timeout=self.timeout, dump=self.dump)
+            shared = generation.api_session
+            # Api set up its own session (User-Agent, pws-handler header, cookies); carry
+            # that onto the shared one and drop the private session before it connects.
+            shared.headers.update(api._session.headers)
+            shared.cookies.update(api._session.cookies)
+            api._session.close()
+            api._session = shared
+            return api
+
+    return PooledApiScraper
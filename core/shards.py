@@ -0,0 +1,174 @@
+"""Sharded download mode: a large cache split across several worker processes, whose
+events the parent relays as a single run.
+"""
+
+import multiprocessing
+import shutil
+import tempfile
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from queue import Empty
+from typing import Any, Callable
+
+from . import events, metrics
+from .media_store import MediaStore
+from .scrape_config import ScrapeConfig
+
+# How often the relay loop checks for cancellation and dead shards while idle.
+_POLL_SECONDS = 0.2
+# After the run, how long a shard gets to exit on its own before it is terminated.
+_JOIN_SECONDS = 10.0
+
+
+@dataclass
+class ShardResult:
+    downloaded: int = 0
+    videos: int = 0
+    failed: int = 0
+    errors: list[str] = field(default_factory=list)
+    records: list[dict[str, Any]] = field(default_factory=list)  # each shard's run record
+
+
+class _RelayedHistory:
+    """Stands in for a HistoryStore in a shard: the run record goes to the parent."""
+
+    def __init__(self, index: int, queue: Any) -> None:
+        self._index = index
+        self._queue = queue
+
+    def append(self, record: dict) -> None:
+        self._queue.put((self._index, "record", record))
+
+    def download_rate(self, runs: int = 20) -> float | None:
+        return None  # only dry runs ask, and those never reach a shard
+
+
+def _shard_main(
+    index: int, config: ScrapeConfig, queue: Any, stop: Any, thumbnails: bool, delta: Path
+) -> None:
+    """Entry point of a shard process."""
+    from . import runner  # deferred: runner imports this module
+
+    def emit(event: events.Event) -> None:
+        queue.put((index, "event", event))
+
+    history = _RelayedHistory(index, queue)
+    runner.execute(
+        config, emit, stop.is_set, thumbnails, history_store=history, verify_delta=delta
+    )
+
+
+def run_sharded(
+    config: ScrapeConfig,
+    store: MediaStore,
+    emit: events.Sink,
+    should_cancel: Callable[[], bool],
+    thumbnails: bool,
+) -> ShardResult:
+    """Download `store` in config.processes processes; returns once all have finished.
+
+    The shard processes only download. A probe or dry run has already happened in the
+    parent, and history, tracing and cache write-back stay with the parent too.
+    """
+    from .downloader import save_cache
+    from .verify import merge_deltas
+
+    count = min(config.processes, len(store))
+    # spawn, not fork: a forked child would inherit the parent's threads' locks mid-use.
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    stop = context.Event()
+    workdir = Path(tempfile.mkdtemp(prefix="pdl-shards-"))
+    stem = Path(config.url).stem  # shard caches name the shards' archives, if any
+    processes = []
+    deltas = [workdir / f"verified{index + 1}.json" for index in range(count)]
+    try:
+        for index in range(count):
+            path = workdir / f"{stem}_shard{index + 1}.json"
+            save_cache(store.subset(range(index, len(store), count)), path)
+            shard_config = replace(
+                config,
+                url=str(path),
+                processes=1,
+                probe_resolution=False,
+                dry_run=False,
+                trace_path=None,
+            )
+            process = context.Process(
+                target=_shard_main,
+                args=(index, shard_config, queue, stop, thumbnails, deltas[index]),
+                name=f"pdl-shard-{index + 1}",
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+        sizes = [len(range(index, len(store), count)) for index in range(count)]
+        return _relay(processes, sizes, queue, stop, emit, should_cancel)
+    finally:
+        stop.set()  # a no-op for shards that already finished
+        for process in processes:
+            process.join(_JOIN_SECONDS)
+            if process.is_alive():
+                process.terminate()
+        # Each shard saved its verification outcomes apart; one writer updates the folder's.
+        merge_deltas(Path(config.output_dir), deltas)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _relay(
+    processes: list[multiprocessing.Process],
+    sizes: list[int],
+    queue: Any,
+    stop: Any,
+    emit: events.Sink,
+    should_cancel: Callable[[], bool],
+) -> ShardResult:
+    count = len(processes)
+    result = ShardResult()
+    # Each shard's latest (current, total) per phase; a shard that has not reported a
+    # phase yet counts as 0 of its share.
+    progress: dict[str, list[list[int]]] = {}
+    finished: set[int] = set()
+
+    def report(index: int, event: events.Event) -> None:
+        phase = event["phase"]
+        shares = progress.setdefault(phase, [[0, size] for size in sizes])
+        shares[index] = [event["current"], event["total"]]
+        current = sum(share[0] for share in shares)
+        emit(events.progress(phase, current, sum(share[1] for share in shares)))
+
+    while len(finished) < count:
+        if should_cancel():
+            stop.set()
+        try:
+            index, kind, payload = queue.get(timeout=_POLL_SECONDS)
+        except Empty:
+            for index, process in enumerate(processes):
+                if index not in finished and not process.is_alive():
+                    # Died without a terminal event (killed, or crashed in native code).
+                    finished.add(index)
+                    message = f"exited with code {process.exitcode}"
+                    result.errors.append(f"Shard {index + 1}/{count} {message}")
+            continue
+        if kind == "record":
+            result.records.append(payload)
+            result.failed += payload["counts"]["failed"]
+            metrics.BYTES.inc(payload["bytes"])
+            continue
+        event_type = payload["type"]
+        if event_type == "progress":
+            report(index, payload)
+        elif event_type == "log":
+            emit(events.log(payload["level"], f"[{index + 1}/{count}] {payload['message']}"))
+        elif event_type == "done":
+            finished.add(index)
+            result.downloaded += payload["downloaded"]
+            result.videos += payload["videos"]
+        elif event_type == "error":
+            finished.add(index)
+            result.errors.append(f"Shard {index + 1}/{count}: {payload['message']}")
+        elif event_type == "media":
+            # One media event per downloaded file; the shards' own metrics aren't served.
+            metrics.FILES["downloaded"].inc()
+            emit(payload)
+    return result
@@ -0,0 +1,88 @@
+"""Startup timing: per-import and per-phase spans from process launch to first paint.
+
+Import this module first in app.py so its clock starts as early as possible. Spans are
+always recorded (a handful of perf_counter calls), but the report is only rendered when
+PDL_PROFILE_STARTUP is set: "1" prints it to stderr, any other value is a path to write
+the report to as JSON.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Literal
+
+SpanKind = Literal["import", "phase", "mark"]
+
+_T0 = time.perf_counter()  # app start; interpreter boot before this is not counted
+_spans: list[tuple[str, SpanKind, float, float]] = []  # (name, kind, start_s, end_s) from _T0
+_reported = False
+
+
+def _now() -> float:
+    return time.perf_counter() - _T0
+
+
+@contextmanager
+def span(name: str, kind: SpanKind = "phase") -> Iterator[None]:
+    """Time a block of startup work, e.g. `with span("webview", "import"): import webview`."""
+    start = _now()
+    try:
+        yield
+    finally:
+        _spans.append((name, kind, start, _now()))
+
+
+def mark(name: str, at: float | None = None) -> None:
+    """Record an instant milestone. `at` back-dates it, in seconds since app start."""
+    moment = _now() if at is None else at
+    _spans.append((name, "mark", moment, moment))
+
+
+def elapsed() -> float:
+    """Seconds since app start, for callers that need to back-date a mark."""
+    return _now()
+
+
+def report() -> dict:
+    """Snapshot of every span so far, in milliseconds since app start."""
+    return {
+        "spans": [
+            {
+                "name": name,
+                "kind": kind,
+                "start_ms": round(start * 1000, 1),
+                "duration_ms": round((end - start) * 1000, 1),
+            }
+            for name, kind, start, end in _spans
+        ]
+    }
+
+
+def format_report(data: dict) -> str:
+    lines = ["Startup profile (ms since app start):"]
+    for entry in data["spans"]:
+        if entry["kind"] == "mark":
+            lines.append(f"  {entry['start_ms']:>8.1f}  * {entry['name']}")
+        else:
+            label = f"{entry['kind']} {entry['name']}"
+            lines.append(f"  {entry['start_ms']:>8.1f}  {label:<32} {entry['duration_ms']:>8.1f}")
+    return "\n".join(lines)
+
+
+def finish() -> None:
+    """Emit the report once, if profiling is enabled. Called when the first paint lands."""
+    global _reported
+    target = os.environ.get("PDL_PROFILE_STARTUP", "").strip()
+    if _reported or not target:
+        return
+    _reported = True
+    data = report()
+    if target == "1":
+        # The windowed build has no console; sys.stderr can be None there.
+        if sys.stderr is not None:
+            print(format_report(data), file=sys.stderr, flush=True)
+    else:
+        Path(target).write_text(json.dumps(data, indent=2), encoding="utf-8")
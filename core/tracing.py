@@ -0,0 +1,128 @@
+"""Optional per-thread tracing spans, exported as Chrome trace JSON.
+
+Off by default. A run turns it on when given a trace path (ScrapeConfig.trace_path,
+`cli.py run --trace`, or PDL_TRACE for the GUI) and writes the file when it finishes;
+open it in chrome://tracing or https://ui.perfetto.dev. While off, `span()` hands back
+one shared no-op context manager, so instrumented code pays a global read and a call.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NOOP = nullcontext()
+_enabled = False
+_origin = 0.0  # perf_counter at start(); trace timestamps are relative to it
+_events: list[dict] = []  # list.append is atomic under the GIL, so workers append lock-free
+_thread_names: dict[int, str] = {}
+
+
+def env_path() -> str | None:
+    """Trace destination from PDL_TRACE, for entry points without their own flag."""
+    return os.environ.get("PDL_TRACE", "").strip() or None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def start() -> None:
+    """Begin recording, discarding anything left over from a previous trace."""
+    global _enabled, _origin
+    _events.clear()
+    _thread_names.clear()
+    _origin = time.perf_counter()
+    _enabled = True
+
+
+def stop(path: str | Path) -> Path:
+    """Stop recording and write the collected spans to `path` as Chrome trace JSON."""
+    global _enabled
+    _enabled = False
+    pid = os.getpid()
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in _thread_names.items()
+    ]
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    trace = {"traceEvents": metadata + _events, "displayTimeUnit": "ms"}
+    target.write_text(json.dumps(trace), encoding="utf-8")
+    _events.clear()
+    return target
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name: str, category: str, args: dict) -> None:
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter()
+        thread = threading.current_thread()
+        _thread_names.setdefault(thread.ident or 0, thread.name)
+        event = {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",  # complete event: start + duration
+            "ts": (self.start - _origin) * 1e6,  # microseconds
+            "dur": (end - self.start) * 1e6,
+            "pid": os.getpid(),
+            "tid": thread.ident or 0,
+        }
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if self.args:
+            event["args"] = self.args
+        _events.append(event)
+
+
+def span(name: str, category: str = "run", **args: Any):
+    """Time a block as one span on the current thread; a no-op while tracing is off."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, category, args)
+
+
+def traced(name: str, category: str) -> Callable[[F], F]:
+    """Decorator form of span() for functions that are always instrumented."""
+
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def instrument(obj: object, method: str, name: str, category: str) -> None:
+    """Wrap a bound method on one library object so its calls show up as spans.
+
+    Used for pinterest_dl internals (page fetches, HLS segments, ffmpeg) that have no
+    hook of their own. Idempotent, so a long-lived object instrumented per run is
+    only wrapped once, and the wrapper checks the flag per call.
+    """
+    original = getattr(obj, method, None)
+    if original is None or getattr(original, "__traced__", False):
+        return
+    wrapper = traced(name, category)(original)
+    wrapper.__traced__ = True  # type: ignore[attr-defined]
+    setattr(obj, method, wrapper)
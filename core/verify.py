@@ -0,0 +1,219 @@
+"""Integrity checks for downloaded files, and a state file recording which files have
+passed one.
+"""
+
+import json
+import os
+import shutil
+import struct
+import subprocess
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import tracing
+from .atomic import atomic_write
+
+if TYPE_CHECKING:
+    from pinterest_dl import PinterestMedia
+
+STATE_FILE = ".pdl-verified.json"
+# A remuxed video shorter than this fraction of its metadata duration is truncated.
+_MIN_DURATION_RATIO = 0.9
+_VIDEO_SUFFIXES = (".mp4", ".ts")
+_PNG_END = b"IEND\xaeB`\x82"  # the IEND chunk type and its CRC; Pillow's verify() stops short
+
+
+class CorruptFileError(Exception):
+    """A downloaded file failed verification on every attempt."""
+
+
+def find_ffprobe(ffmpeg_path: str | None = None) -> str | None:
+    """ffprobe next to a custom ffmpeg first (they ship together), then PATH."""
+    if ffmpeg_path:
+        resolved = shutil.which(ffmpeg_path)
+        if resolved:
+            name = "ffprobe.exe" if resolved.lower().endswith(".exe") else "ffprobe"
+            sibling = Path(resolved).with_name(name)
+            if sibling.is_file():
+                return str(sibling)
+    return shutil.which("ffprobe")
+
+
+def _check_image(path: Path) -> str | None:
+    from PIL import Image  # deferred: runs without verification never load Pillow
+
+    try:
+        with Image.open(path) as img:
+            image_format = img.format
+            img.verify()
+    except Exception as e:  # Pillow raises a wide range of types for bad data
+        return f"unreadable image ({type(e).__name__}: {e})"
+    with path.open("rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(size - 64, 0))
+        tail = f.read()
+        f.seek(0)
+        head = f.read(12)
+    if image_format == "JPEG" and b"\xff\xd9" not in tail:
+        return "truncated JPEG (no end-of-image marker)"
+    if image_format == "PNG" and _PNG_END not in tail:
+        return "truncated PNG (no IEND chunk)"
+    if image_format == "GIF" and not tail.rstrip(b"\0").endswith(b";"):
+        return "truncated GIF (no trailer)"
+    if image_format == "WEBP" and struct.unpack("<I", head[4:8])[0] + 8 > size:
+        return "truncated WebP (shorter than its RIFF header says)"
+    return None
+
+
+def _check_video(path: Path, media: "PinterestMedia", ffprobe: str) -> str | None:
+    cmd = [ffprobe, "-v", "error", "-show_entries", "format=duration"]
+    cmd += ["-of", "default=noprint_wrappers=1:nokey=1", str(path)]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return f"ffprobe failed ({e})"
+    try:
+        duration = float(result.stdout.strip())
+    except ValueError:
+        error = result.stderr.strip().splitlines()
+        return f"unreadable video ({error[-1] if error else 'no duration'})"
+    stream = media.video_stream
+    expected = stream.duration / 1000 if stream is not None and stream.duration else 0
+    if duration <= 0 or duration < expected * _MIN_DURATION_RATIO:
+        return f"truncated video ({duration:.1f}s of {expected:.1f}s)"
+    return None
+
+
+class Verifier:
+    """Checks files on any thread; run_download records the outcomes on its own thread.
+
+    `root` is the output folder the state file lives in; with `persist` off (archive
+    output, where files only exist while staged) nothing is read or written.
+    """
+
+    def __init__(self, root: Path, ffprobe: str | None, persist: bool = True) -> None:
+        self.root = root
+        self.ffprobe = ffprobe
+        self.persist = persist
+        self.checked = 0
+        self.refetched = 0
+        self.corrupt = 0
+        self.videos_unchecked = 0
+        self._lock = threading.Lock()
+        self._verified: dict[str, list[int]] = {}
+        self._dropped: set[str] = set()  # failed this run; removed from the file on save
+        self._passed: set[str] = set()  # passed this run; all a delta has to carry
+        if persist:
+            try:
+                self._verified = json.loads((root / STATE_FILE).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pass  # no state yet, or a damaged one: everything is checked again
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    @staticmethod
+    def _stamp(path: Path) -> list[int]:
+        stat = path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_verified(self, path: Path) -> bool:
+        """Whether `path` passed a check and has not changed since."""
+        with self._lock:
+            stamp = self._verified.get(self._key(path))
+        try:
+            return stamp is not None and stamp == self._stamp(path)
+        except OSError:
+            return False
+
+    def check(self, media: "PinterestMedia", path: Path) -> str | None:
+        """Why `path` is corrupt, or None if it looks intact (or cannot be checked)."""
+        with tracing.span("verify", "verify", id=str(media.id)):
+            if path.suffix.lower() in _VIDEO_SUFFIXES:
+                if self.ffprobe is None:
+                    with self._lock:
+                        self.videos_unchecked += 1
+                    return None
+                return _check_video(path, media, self.ffprobe)
+            return _check_image(path)
+
+    def passed(self, path: Path) -> None:
+        self.checked += 1
+        unchecked = self.ffprobe is None and path.suffix.lower() in _VIDEO_SUFFIXES
+        if self.persist and not unchecked:
+            try:
+                stamp = self._stamp(path)
+            except OSError:
+                return
+            with self._lock:
+                key = self._key(path)
+                self._verified[key] = stamp
+                self._dropped.discard(key)
+                self._passed.add(key)
+
+    def failed(self, path: Path, final: bool) -> None:
+        self.checked += 1
+        if final:
+            self.corrupt += 1
+        else:
+            self.refetched += 1
+        path.unlink(missing_ok=True)
+        with self._lock:
+            key = self._key(path)
+            self._verified.pop(key, None)
+            self._dropped.add(key)
+            self._passed.discard(key)
+
+    def save(self, delta: Path | None = None) -> None:
+        """Write the state file atomically (a crash mid-write keeps the previous one).
+
+        With `delta`, only this run's outcomes are written there instead, for the parent
+        of a sharded download (core.shards) to fold in with merge_deltas() once every
+        shard has finished; shards never write the shared state file themselves.
+        """
+        if not self.persist:
+            return
+        with self._lock:
+            if delta is None:
+                verified = dict(self._verified)
+            else:
+                verified = {key: self._verified[key] for key in self._passed}
+            dropped = sorted(self._dropped)
+        if delta is not None:
+            with atomic_write(delta, encoding="utf-8") as f:
+                json.dump({"verified": verified, "dropped": dropped}, f)
+            return
+        _write_state(self.root, verified, dropped)
+
+
+def merge_deltas(root: Path, deltas: list[Path]) -> None:
+    """Fold the deltas saved by Verifier.save(delta) into `root`'s state file."""
+    verified: dict[str, list[int]] = {}
+    dropped: set[str] = set()
+    for path in deltas:
+        try:
+            delta = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue  # that shard saved nothing: verification off, or it died first
+        verified.update(delta["verified"])
+        dropped.update(delta["dropped"])
+    if verified or dropped:
+        _write_state(root, verified, dropped - verified.keys())
+
+
+def _write_state(root: Path, verified: dict[str, list[int]], dropped: Iterable[str]) -> None:
+    target = root / STATE_FILE
+    try:
+        state = json.loads(target.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+    state.update(verified)
+    for key in dropped:
+        state.pop(key, None)
+    with atomic_write(target, encoding="utf-8") as f:
+        f.write(json.dumps(state, separators=(",", ":")))
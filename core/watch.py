@@ -0,0 +1,336 @@
+"""Watch mode: keep a list of boards mirrored by re-checking each on its own interval
+and downloading only the pins above its persisted cursor.
+"""
+
+import dataclasses
+import heapq
+import json
+import random
+import re
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from . import events, history, runner
+from .atomic import atomic_write
+from .media_store import MediaStore
+from .scrape_config import ScrapeConfig
+from .session_pool import SessionPool
+
+# Ids kept per board. A check stops at any of them, so the board can lose its top few
+# pins (deleted, moved) between checks without the watcher re-downloading everything.
+_CURSOR_DEPTH = 50
+_RETRIES = 3  # checks that retry a pin whose download failed before it is given up on
+_MIN_INTERVAL = 60.0  # seconds; a watcher is a background mirror, not a poller
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def default_state_path() -> Path:
+    return history.state_dir() / "watch.json"
+
+
+def parse_interval(value: object) -> float:
+    """Seconds from a number of seconds or a string like "90s", "30m", "6h", "1d"."""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(value).lower())
+        if match is None:
+            raise ValueError(f"Invalid interval: {value!r} (expected e.g. 300, '30m', '6h')")
+        seconds = float(match[1]) * _UNITS[match[2] or "s"]
+    if seconds < _MIN_INTERVAL:
+        raise ValueError(f"Interval must be at least {_MIN_INTERVAL:.0f}s, got {value!r}")
+    return seconds
+
+
+@dataclasses.dataclass
+class Board:
+    url: str
+    interval: float  # seconds between checks, before jitter
+    config: ScrapeConfig
+
+
+def _board_dir(url: str) -> str:
+    # https://www.pinterest.com/user/board/ -> user_board
+    parts = [part for part in urlsplit(url).path.split("/") if part]
+    return "_".join(parts) or "board"
+
+
+def load_boards(path: str | Path, defaults: dict) -> list[Board]:
+    """Read a boards file. Raises ValueError with a user-facing message on bad input.
+
+    The file is a JSON list of boards, or an object with `boards` and optional `defaults`.
+    A board is a URL string or an object with `url`, `interval` and any RunPayload
+    fields; they override `defaults`, which override the caller's `defaults`. A board
+    without its own `output_dir` downloads into a per-board folder under the default one.
+    """
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    shared = dict(defaults)
+    if isinstance(raw, dict):
+        shared.update(raw.get("defaults", {}))
+        raw = raw.get("boards")
+    if not isinstance(raw, list) or not raw:
+        raise ValueError(f"No boards listed in {path}")
+
+    boards = []
+    for entry in raw:
+        entry = {"url": entry} if isinstance(entry, str) else dict(entry)
+        payload = {**shared, **entry, "mode": "scrape", "save_cache": False}
+        payload.setdefault("interval", "1h")
+        if "output_dir" not in entry:
+            payload["output_dir"] = str(Path(shared["output_dir"]) / _board_dir(payload["url"]))
+        config = ScrapeConfig.from_payload(payload)
+        if config.skip_download or config.dry_run:
+            raise ValueError(f"A watched board must download its pins: {config.url}")
+        boards.append(Board(config.url, parse_interval(payload["interval"]), config))
+    urls = [board.url for board in boards]
+    if len(set(urls)) != len(urls):
+        raise ValueError("A board is listed more than once.")
+    return boards
+
+
+class CursorStore:
+    """Per-board sync state in one JSON file, rewritten atomically after each check."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        try:
+            self._cursors: dict[str, dict] = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self._cursors = {}
+
+    def seen(self, url: str) -> set[str]:
+        return set(self._cursors.get(url, {}).get("recent", []))
+
+    def failed(self, url: str) -> set[str]:
+        """Pins of `url` whose downloads failed and are due for another try."""
+        return set(self._cursors.get(url, {}).get("failed", {}))
+
+    def is_new(self, url: str) -> bool:
+        return url not in self._cursors
+
+    def advance(
+        self, url: str, new_ids: Sequence[str], failed_ids: Sequence[str] = ()
+    ) -> list[str]:
+        """Record a completed check; `new_ids` are the pins it synced, top of board first.
+
+        `failed_ids` are pins the check found but could not download. They stay out of
+        the cursor and are retried by the next checks. Returns the ids given up on after
+        _RETRIES failed checks.
+        """
+        cursor = self._cursors.setdefault(url, {"recent": [], "synced": 0})
+        failed = cursor.setdefault("failed", {})
+        for pin_id in set(new_ids).difference(failed_ids):
+            failed.pop(pin_id, None)
+        given_up = []
+        for pin_id in failed_ids:
+            failed[pin_id] = failed.get(pin_id, 0) + 1
+            if failed[pin_id] >= _RETRIES:
+                del failed[pin_id]
+                given_up.append(pin_id)
+        # A given-up pin joins the cursor, so a check no longer pages down to look for it.
+        synced = [pin_id for pin_id in new_ids if pin_id not in failed_ids] + given_up
+        cursor["recent"] = (synced + cursor["recent"])[:_CURSOR_DEPTH]
+        cursor["synced"] += len(new_ids) - len(failed_ids)
+        cursor["checked_at"] = time.time()
+        self._save()
+        return given_up
+
+    def _save(self) -> None:
+        # A crash mid-write leaves the previous state intact.
+        with atomic_write(self.path, encoding="utf-8") as f:
+            f.write(json.dumps(self._cursors, indent=2))
+
+
+class RateBudget:
+    """Token bucket shared by every board's Pinterest API requests.
+
+    Refills at `per_minute` and holds at most ten seconds' worth, so boards that come
+    due together are spread out instead of bursting.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        if per_minute <= 0:
+            raise ValueError(f"Rate must be positive, got {per_minute}")
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: threading.Event) -> bool:
+        """Take one token, waiting for it if needed. False if `stop` is set while waiting."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop.wait(wait):
+                return False
+
+
+class Watcher:
+    """Schedules board checks and runs them one at a time on the calling thread."""
+
+    def __init__(
+        self,
+        boards: list[Board],
+        emit: events.Sink,
+        cursors: CursorStore,
+        rate_per_minute: float = 30.0,
+        jitter: float = 0.1,
+        history_store: history.HistoryStore | None = None,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError(f"Jitter must be between 0 and 1, got {jitter}")
+        self.boards = boards
+        self.emit = emit
+        self.cursors = cursors
+        self.budget = RateBudget(rate_per_minute)
+        self.jitter = jitter
+        self.history_store = history_store
+        self.sessions = SessionPool()
+        self._random = random.Random()
+
+    def _next_due(self, board: Board, now: float) -> float:
+        spread = board.interval * self.jitter
+        return now + board.interval + self._random.uniform(-spread, spread)
+
+    def run(self, stop: threading.Event, once: bool = False) -> None:
+        """Check boards as they come due until `stop` is set (or each once, with `once`)."""
+        now = time.monotonic()
+        due = []
+        for index, board in enumerate(self.boards):
+            # First checks are staggered across the jitter window rather than all at once.
+            stagger = 0.0 if once else self._random.uniform(0, board.interval * self.jitter)
+            due.append((now + stagger, index))
+        heapq.heapify(due)
+        try:
+            while due and not stop.is_set():
+                when, index = due[0]
+                if stop.wait(max(when - time.monotonic(), 0)):
+                    break
+                heapq.heappop(due)
+                board = self.boards[index]
+                self.check(board, stop)
+                if not once:
+                    heapq.heappush(due, (self._next_due(board, time.monotonic()), index))
+                    next_in = due[0][0] - time.monotonic()
+                    self.emit(events.log("info", f"Next check in {max(next_in, 0):.0f}s"))
+        finally:
+            self.sessions.close()
+
+    def check(self, board: Board, stop: threading.Event) -> None:
+        """One incremental sync of `board`: find pins above its cursor and download them."""
+        emit = self.emit
+        emit(events.log("info", f"Checking {board.url}"))
+        known = self.cursors.seen(board.url)
+        retry = self.cursors.failed(board.url)
+        first_sync = self.cursors.is_new(board.url)
+        try:
+            with events.forward_logs(emit):
+                new = self._new_pins(board, known, retry, stop)
+        except Exception as e:
+            emit(events.log("warn", f"Check failed for {board.url}: {type(e).__name__}: {e}"))
+            return
+        if stop.is_set():
+            return
+        if not new:
+            emit(events.log("info", "No new pins."))
+            self.cursors.advance(board.url, [])
+            return
+
+        label = "pins (first sync)" if first_sync else "new pins"
+        emit(events.log("info", f"Found {len(new)} {label}; downloading."))
+        outcome: list[str] = []
+        failed: list[str] = []  # pins whose download failed, not ones the run filtered out
+
+        def run_emit(event: events.Event) -> None:
+            if event["type"] in ("done", "error"):
+                outcome.append(event["type"])
+            emit(event)
+
+        runner.execute(
+            board.config,
+            run_emit,
+            stop.is_set,
+            thumbnails=False,
+            sessions=self.sessions,
+            history_store=self.history_store,
+            media=new,
+            on_failed=lambda media: failed.append(str(media.id)),
+        )
+        if outcome == ["done"] and not stop.is_set():
+            ids = [str(media.id) for media in new]
+            given_up = self.cursors.advance(board.url, ids, failed)
+            if len(failed) > len(given_up):
+                retried = len(failed) - len(given_up)
+                emit(events.log("info", f"{retried} failed pins will be retried next check"))
+            if given_up:
+                emit(
+                    events.log(
+                        "warn",
+                        f"Giving up on {len(given_up)} pins after {_RETRIES} failed checks: "
+                        + ", ".join(given_up),
+                    )
+                )
+
+    def _new_pins(
+        self, board: Board, known: set[str], retry: set[str], stop: threading.Event
+    ) -> MediaStore:
+        """Pins above the first seen one, then any failed pins further down the board."""
+        config = board.config
+        if not self.budget.acquire(stop):  # the board lookup
+            return MediaStore()
+        scraper = self.sessions.scraper(config)
+        self._throttle(scraper, stop)
+        new = MediaStore()
+        source = scraper.iter_scrape(
+            url=config.url,
+            min_resolution=config.min_resolution,
+            delay=config.delay,
+            caption_from_title=config.caption_from_title,
+        )
+        outstanding = set(retry)
+        past_seen = False
+        try:
+            for media in source:
+                if stop.is_set():
+                    break
+                pin_id = str(media.id)
+                if pin_id in known:
+                    past_seen = True
+                    if not outstanding:
+                        break
+                    continue
+                if past_seen and pin_id not in outstanding:
+                    continue  # below the cursor: synced earlier, only failed pins are due
+                outstanding.discard(pin_id)
+                new.append(media)
+        finally:
+            source.close()  # stop paging; no further pages are requested
+        return new
+
+    def _throttle(self, scraper, stop: threading.Event) -> None:
+        """Make every page fetch of this check's scraper take a token from the budget."""
+        from pinterest_dl.api.bookmark_manager import BookmarkManager
+
+        for method in ("_get_images", "_get_section_images"):
+            original = getattr(scraper, method)
+
+            def throttled(*args, _original=original, **kwargs):
+                if not self.budget.acquire(stop):
+                    # An empty last page: the library's paging loop ends without an error.
+                    passed = [*args, *kwargs.values()]
+                    bookmarks = next(a for a in passed if isinstance(a, BookmarkManager))
+                    bookmarks.add("-end-")
+                    return [], bookmarks
+                return _original(*args, **kwargs)
+
+            setattr(scraper, method, throttled)
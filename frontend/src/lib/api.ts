@@ -14,13 +14,73 @@ export interface CookieStatusResult {
     expiry: number | null; // Unix seconds of the earliest-expiring cookie, or null when unknown
 }
 
+export interface StartupSpan {
+    name: string;
+    kind: "import" | "phase" | "mark";
+    start_ms: number; // since the Python app started
+    duration_ms: number;
+}
+
+// One line of the run history store (core/history.py RunRecorder.record)
+export interface RunRecord {
+    id: string;
+    started_at: number; // unix seconds
+    duration_s: number;
+    outcome: "done" | "cancelled" | "error";
+    error: string | null;
+    config: RunPayload;
+    counts: { scraped: number; downloaded: number; videos: number; saved: number; failed: number };
+    phases: Record<string, number>; // seconds per phase: scrape, download, captions, ...
+    bytes: number;
+    files_per_s: number;
+    mb_per_s: number;
+    scrape_items_per_s: number;
+    failures: Record<string, number>; // "HTTP 404" / exception type -> count
+    peak_workers: number;
+}
+
+export type RunComparison =
+    | {
+          success: true;
+          base: string;
+          other: string;
+          metrics: Record<string, { base: number; other: number; change_pct: number | null }>;
+      }
+    | { success: false; message: string };
+
+// "estimate" measures the media before downloading: a dry run (core/preflight.py) or
+// the header probe (core/probe.py).
+export type RunPhase = "scrape" | "estimate" | "download";
+
 export type RunEvent = 
-    | { type: "progress"; phase: "scrape" | "download"; current: number; total: number }
+    | { type: "progress"; phase: RunPhase; current: number; total: number }
     | { type: "log"; level: "info" | "warn" | "error"; message: string }
+    // The GUI bridge sends rate-capped log counts instead of per-line `log` events; the
+    // console pages the lines themselves in with get_logs.
+    | { type: "logs"; total: number; warn: number; error: number }
     | { type: "media"; thumbnail: string; isVideo: boolean }
     | { type: "done"; scraped: number; downloaded: number; videos: number; saved: number }
     | { type: "error"; message: string };
 
+// One console line from the Python-side ring buffer (core/log_buffer.py)
+export interface LogLine {
+    t: number; // seconds since the run started
+    level: "info" | "warn" | "error";
+    phase: RunPhase | null; // the phase live when the line was logged
+    message: string;
+}
+
+export interface LogPage {
+    total: number; // matching lines since the run started, including dropped ones
+    start: number; // first position still held; earlier lines fell off the ring
+    offset: number; // position of lines[0]
+    lines: LogLine[];
+}
+
+// DOWNLOAD_ORDERS in core/scrape_config.py
+export const downloadOrders = ["scrape", "images_first", "smallest_first", "round_robin"] as const;
+export type DownloadOrder = (typeof downloadOrders)[number];
+
 // match the shape of ScrapeConfig in core/scrape_config.py
 export interface RunPayload {
     url: string;
@@ -31,6 +91,7 @@ export interface RunPayload {
     delay: number;
     timeout?: number;
     max_workers?: number;
+    processes?: number;
     cookies?: string;
     ensure_alt?: boolean;
     ffmpeg_path?: string;
@@ -41,17 +102,39 @@ export interface RunPayload {
     save_cache?: boolean;
     cache_path?: string;
     skip_download?: boolean;
+    dry_run?: boolean;
+    probe_resolution?: boolean;
+    download_order?: DownloadOrder;
+    layout?: string;
+    skip_existing?: boolean;
+    verify?: boolean;
+    archive?: string;
+    archive_max_mb?: number;
+    trace_path?: string;
 }
 
 export interface PinterestApi {
     get_core_version(): Promise<string>;
+    report_first_paint(msSincePaint: number): Promise<void>;
+    get_startup_report(): Promise<{ spans: StartupSpan[] }>;
+    prewarm(timeout: number, cookies: string | null): Promise<void>;
+    get_session_stats(): Promise<{
+        connections: number;
+        requests: number;
+        reused: number;
+        reuse_ratio: number;
+    }>;
+    list_runs(limit?: number, offset?: number): Promise<RunRecord[]>;
+    compare_runs(baseId: string, otherId: string): Promise<RunComparison>;
     check_ffmpeg(customPath: string | null): Promise<FfmpegResult>;
     capture_cookies(): Promise<CaptureCookiesResult>;
     check_cookie_status(path: string): Promise<CookieStatusResult>;
     start_run(config: RunPayload): Promise<{ started: boolean;}>;
+    get_logs(offset: number, limit: number, level: LogLine["level"] | null): Promise<LogPage>;
     terminate(): Promise<void>;
     select_cache_file(defaultPath: string): Promise<string>;
     select_json_file(defaultPath: string): Promise<string>;
+    select_cache_source(defaultPath: string): Promise<string>;
     select_folder(defaultPath: string): Promise<string>;
     select_file(defaultPath: string): Promise<string>;
 }
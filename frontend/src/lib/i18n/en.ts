@@ -23,6 +23,7 @@ export const en = {
 			target: "Target",
 			extraction: "Extraction Options",
 			metadataCache: "Metadata Cache",
+			output: "Output Folder",
 		},
 		// The single source field is relabelled per mode.
 		sourceLabel: {
@@ -40,6 +41,10 @@ export const en = {
 			title: "Minimum Resolution",
 			desc: "Discard assets smaller than dimensions (0 disables).",
 		},
+		probeResolution: {
+			title: "Check Real Resolution",
+			desc: "Read each image's size from its first few KB before downloading it.",
+		},
 		metadataStrategy: {
 			title: "Metadata Strategy",
 			desc: "Format for accompanying alt text/captions.",
@@ -55,6 +60,38 @@ export const en = {
 			json: "JSON Sidecar",
 			metadata: "Embed EXIF",
 		},
+		layout: {
+			title: "Folder Layout",
+			desc: "Split large outputs into subfolders so they stay fast to browse.",
+		},
+		// Keyed by the layout `value` in run.svelte.ts (layoutValues).
+		layouts: {
+			flat: "Flat",
+			id: "By pin ID",
+			hash: "By hash",
+		},
+		skipExisting: {
+			title: "Skip Existing Files",
+			desc: "Don't download pins already saved in the output folder.",
+		},
+		verify: {
+			title: "Verify Files",
+			desc: "Check each download for truncation and fetch corrupt files again.",
+		},
+		archive: {
+			title: "Archive Output",
+			desc: "Save into size-capped archives instead of loose files.",
+		},
+		dryRun: {
+			title: "Dry Run",
+			desc: "Report total size and expected time without downloading.",
+		},
+		// Keyed by the archive `value` in run.svelte.ts (archiveValues).
+		archives: {
+			none: "Loose files",
+			zip: "ZIP",
+			tar: "TAR",
+		},
 		saveCache: {
 			title: "Save Metadata Cache",
 			desc: "Write scraped records to a JSON file for reuse in Download mode.",
@@ -131,6 +168,22 @@ export const en = {
 				tooltip:
 					"How many files download in parallel. Higher is faster but higher risk of rate-limiting. (1-16, defaults to 8)",
 			},
+			processes: {
+				label: "Download Processes",
+				tooltip:
+					"Download mode only. Splits a large cache file across this many processes, each with its own concurrent downloads. (1-16, defaults to 1)",
+			},
+			downloadOrder: {
+				label: "Download Order",
+				tooltip:
+					"Which files download first. Images first or smallest first fill the preview strip sooner when a board has large videos.",
+				options: {
+					scrape: "Scrape order",
+					images_first: "Images first",
+					smallest_first: "Smallest first",
+					round_robin: "Round-robin by source",
+				},
+			},
 		},
 	},
 	console: {
@@ -142,8 +195,15 @@ export const en = {
 			done: "Done",
 			error: "Error",
 			downloading: "Downloading",
+			estimating: "Sizing",
 			scraping: "Scraping",
 		},
+		filter: {
+			all: "All",
+			warn: "Warnings",
+			error: "Errors",
+		},
+		dropped: (count: number) => `${count} earlier lines dropped`,
 	},
 	statusBar: {
 		ready: "READY",
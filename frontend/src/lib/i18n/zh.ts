@@ -18,6 +18,7 @@ export const zh: PartialMessages<Messages> = {
 			target: "目标",
 			extraction: "提取选项",
 			metadataCache: "元数据缓存",
+			output: "输出目录",
 		},
 		// The single source field is relabelled per mode.
 		sourceLabel: {
@@ -35,6 +36,10 @@ export const zh: PartialMessages<Messages> = {
 			title: "最小分辨率",
 			desc: "过滤小于该尺寸的图片, 设为 0 则关闭。",
 		},
+		probeResolution: {
+			title: "校验实际分辨率",
+			desc: "下载前读取图片开头几 KB, 获取真实尺寸。",
+		},
 		metadataStrategy: {
 			title: "文字描述",
 			desc: "如何保存图片的标题、描述等文字信息。",
@@ -50,6 +55,36 @@ export const zh: PartialMessages<Messages> = {
 			json: "保存为 JSON",
 			metadata: "嵌入 EXIF",
 		},
+		layout: {
+			title: "目录结构",
+			desc: "将大量文件分散到子文件夹, 浏览时更流畅。",
+		},
+		layouts: {
+			flat: "不分文件夹",
+			id: "按 Pin ID",
+			hash: "按哈希",
+		},
+		skipExisting: {
+			title: "跳过已有文件",
+			desc: "输出目录中已存在的内容不再重复下载。",
+		},
+		verify: {
+			title: "校验文件",
+			desc: "检查每个下载文件是否完整, 损坏的文件会重新下载。",
+		},
+		archive: {
+			title: "打包输出",
+			desc: "直接写入按大小分卷的压缩包, 不生成散落文件。",
+		},
+		dryRun: {
+			title: "试运行",
+			desc: "只统计总大小和预计耗时, 不下载文件。",
+		},
+		archives: {
+			none: "不打包",
+			zip: "ZIP",
+			tar: "TAR",
+		},
 		saveCache: {
 			title: "保存元数据",
 			desc: "将抓取结果保存为 JSON 文件, 供下载模式复用。",
@@ -126,6 +161,22 @@ export const zh: PartialMessages<Messages> = {
 				tooltip:
 					"同时下载的文件数量。数值越大速度越快, 但限流风险也越高。范围 1-16, 默认 8。",
 			},
+			processes: {
+				label: "下载进程数",
+				tooltip:
+					"仅用于下载模式。将大型缓存文件拆分给多个进程, 每个进程各自并发下载。范围 1-16, 默认 1。",
+			},
+			downloadOrder: {
+				label: "下载顺序",
+				tooltip:
+					"决定先下载哪些文件。画板中有大视频时, 选择图片优先或小文件优先可更快显示预览。",
+				options: {
+					scrape: "抓取顺序",
+					images_first: "图片优先",
+					smallest_first: "小文件优先",
+					round_robin: "按来源轮流",
+				},
+			},
 		},
 	},
 	console: {
@@ -137,8 +188,15 @@ export const zh: PartialMessages<Messages> = {
 			done: "完成",
 			error: "错误",
 			downloading: "下载中",
+			estimating: "估算中",
 			scraping: "抓取中",
 		},
+		filter: {
+			all: "全部",
+			warn: "警告",
+			error: "错误",
+		},
+		dropped: (count: number) => `已丢弃 ${count} 行较早的日志`,
 	},
 	statusBar: {
 		ready: "就绪",
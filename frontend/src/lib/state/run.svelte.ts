@@ -11,8 +11,14 @@ interface RunConfig {
 	fetchVideos: boolean;
 	resW: number;
 	resH: number;
+	probeResolution: boolean; // check real image dimensions before downloading
 	caption: string;
 	strictAlt: boolean;
+	layout: string; // output folder layout, one of layoutValues
+	skipExisting: boolean;
+	verify: boolean; // check downloaded files and re-fetch corrupt ones
+	archive: string; // "none" or an archive format, one of archiveValues
+	dryRun: boolean; // size everything and report instead of downloading
 	// Output: scrape/search can persist records to a cache JSON, and optionally stop there.
 	saveCache: boolean;
 	cachePath: string; // empty -> auto metadata_<timestamp>.json under the output dir
@@ -28,8 +34,14 @@ export const run = $state<RunConfig>({
 	fetchVideos: false,
 	resW: 0,
 	resH: 0,
+	probeResolution: false,
 	caption: "none",
 	strictAlt: false,
+	layout: "flat",
+	skipExisting: false,
+	verify: false,
+	archive: "none",
+	dryRun: false,
 	saveCache: false,
 	cachePath: "",
 	skipDownload: false,
@@ -37,3 +49,9 @@ export const run = $state<RunConfig>({
 
 // Caption strategy values. Labels are localized via i18n (config.captions, keyed by value).
 export const captionValues = ["none", "txt", "json", "metadata"] as const;
+
+// Output folder layouts (LAYOUTS in core/scrape_config.py). Labels via i18n (config.layouts).
+export const layoutValues = ["flat", "id", "hash"] as const;
+
+// Archive output (ARCHIVES in core/scrape_config.py). Labels via i18n (config.archives).
+export const archiveValues = ["none", "zip", "tar"] as const;
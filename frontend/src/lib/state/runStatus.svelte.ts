@@ -1,12 +1,13 @@
-import { onRunEvent, type RunEvent } from "$lib/api";
+import { onRunEvent, type RunEvent, type RunPhase } from "$lib/api";
+export type { LogLine, RunPhase } from "$lib/api";
 export type RunStatusValue =  "idle" | "running" | "done" | "error";
-export type RunPhase = "scrape" | "download";
 
-export interface LogLine {
-    time: string;
-    level: "info" | "warn" | "error";
-    phase: RunPhase | null;  // null for logs not associated with a phase
-    message: string;
+// Log lines live in Python's ring buffer; the console only tracks how many there are
+// and pages the visible ones in (see ConsolePanel).
+export interface LogCounts {
+    total: number;
+    warn: number;
+    error: number;
 }
 
 export interface Preview {
@@ -19,24 +20,22 @@ interface RunStatus {
     phase: RunPhase | null;  // null when not running
     current: number;
     total: number;
-    logs: LogLine[];
+    logs: LogCounts;
     previews: Preview[];
     counts: {
         downloaded: number;
         videos: number;
         saved: number;  // records written to a metadata cache; drives the "Saved" tile
     }
-    startedAt: number;
 }
 export const runStatus = $state<RunStatus>({
     status: "idle",
     phase: null,
     current: 0,
     total: 0,
-    logs: [],
+    logs: { total: 0, warn: 0, error: 0 },
     previews: [],
     counts: { downloaded: 0, videos: 0, saved: 0 },
-    startedAt: 0,
 });
 
 /** Clear prior state and arm a fresh run. Called by ConfigPanel on Execute, before start_run. */
@@ -45,18 +44,9 @@ export function resetRun(): void {
     runStatus.phase = "scrape";
     runStatus.current = 0;
     runStatus.total = 0;
-    runStatus.logs = [];
+    runStatus.logs = { total: 0, warn: 0, error: 0 };
     runStatus.previews = [];
     runStatus.counts = { downloaded: 0, videos: 0, saved: 0 };
-    runStatus.startedAt = Date.now();  // log timestamps are relative to this
-}
-
-// [mm:ss] since the run armed -- the frontend owns timestamps (Python sends none).
-function elapsed(): string {
-    const seconds = Math.floor((Date.now() - runStatus.startedAt) / 1000);
-    const mm = String(Math.floor(seconds / 60)).padStart(2, "0");
-    const ss = String(seconds % 60).padStart(2, "0");
-    return `[${mm}:${ss}]`;
 }
 
 /** Apply a run event to the status. Subscribed once at module level for the app's lifetime. */
@@ -68,12 +58,10 @@ function apply(event: RunEvent): void {
             runStatus.total = event.total;
             break;
         case "log":
-            runStatus.logs.push({
-                time: elapsed(),
-                level: event.level,
-                phase: runStatus.phase,  // tag the line with whatever phase is live
-                message: event.message,
-            });
+            // Only the headless sinks receive per-line events; the bridge sends `logs`.
+            break;
+        case "logs":
+            runStatus.logs = { total: event.total, warn: event.warn, error: event.error };
             break;
         case "media":
             runStatus.previews.push({ thumbnail: event.thumbnail, isVideo: event.isVideo });
@@ -93,8 +81,7 @@ function apply(event: RunEvent): void {
             break;
         case "error":
             runStatus.status = "error";
-            runStatus.phase = null;
-            runStatus.logs.push({ time: elapsed(), level: "error", phase: null, message: event.message });
+            runStatus.phase = null;  // the message itself is already in the log buffer
             break;
         default:
             event satisfies never;  // compile-time exhaustiveness: a new variant won't compile until handled
@@ -1,4 +1,4 @@
-import { getApi, onBridgeReady } from "$lib/api";
+import { downloadOrders, getApi, onBridgeReady, type DownloadOrder } from "$lib/api";
 
 export type FfmpegStatus = "unknown" | "checking" | "found" | "missing";
 export type CookieStatus = "unknown" | "checking" | "valid" | "expired";
@@ -13,6 +13,8 @@ interface Settings {
 	delay: number;
 	timeout: number;
 	maxWorkers: number; // concurrent download threads, clamped 1-16 by the Python boundary
+	processes: number; // Download mode: worker processes the cache is split across
+	downloadOrder: DownloadOrder; // which files the download workers take first
 }
 
 const STORAGE_KEY = "pdl.settings";
@@ -27,6 +29,8 @@ export const settings = $state<Settings>({
 	delay: 0.2,
 	timeout: 10,
 	maxWorkers: 8,
+	processes: 1,
+	downloadOrder: "scrape",
 });
 
 // Restore durable fields synchronously at module init (before any component renders).
@@ -39,6 +43,9 @@ if (raw) {
 		if (typeof saved.delay === "number") settings.delay = saved.delay;
 		if (typeof saved.timeout === "number") settings.timeout = saved.timeout;
 		if (typeof saved.maxWorkers === "number") settings.maxWorkers = saved.maxWorkers;
+		if (typeof saved.processes === "number") settings.processes = saved.processes;
+		if (downloadOrders.includes(saved.downloadOrder as DownloadOrder))
+			settings.downloadOrder = saved.downloadOrder as DownloadOrder;
 	} catch {
 		// Corrupt JSON in localStorage - keep defaults rather than failing startup.
 	}
@@ -54,6 +61,8 @@ $effect.root(() => {
 			delay: settings.delay,
 			timeout: settings.timeout,
 			maxWorkers: settings.maxWorkers,
+			processes: settings.processes,
+			downloadOrder: settings.downloadOrder,
 		};
 		localStorage.setItem(STORAGE_KEY, JSON.stringify(durable));
 	});
@@ -64,6 +73,9 @@ $effect.root(() => {
 onBridgeReady(() => {
 	checkFfmpeg();
 	checkCookieStatus();
+	// Open connections for the saved timeout/cookies now, so the first run skips the
+	// DNS/TLS setup. Runs in the background on the Python side.
+	void getApi()?.prewarm(settings.timeout, settings.cookies || null);
 });
 
 // Resolve FFmpeg via the Python bridge. Under `vite dev` (no pywebview) the status stays
@@ -1,9 +1,21 @@
 import { mount } from 'svelte'
 import './app.css'
 import App from './App.svelte'
+import { getApi, onBridgeReady } from '$lib/api'
 
 const app = mount(App, {
   target: document.getElementById('app')!,
 })
 
+// Startup profiler: the frame after the first rAF is the first one painted with the app
+// mounted. The bridge may not be up yet, so report how long ago that was once it is.
+requestAnimationFrame(() => {
+  requestAnimationFrame(() => {
+    const paintedAt = performance.now()
+    onBridgeReady(() => {
+      void getApi()?.report_first_paint(performance.now() - paintedAt)
+    })
+  })
+})
+
 export default app
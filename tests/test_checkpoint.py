@@ -0,0 +1,115 @@
+import json
+import time
+from dataclasses import replace
+
+from pinterest_dl import PinterestMedia
+
+from core import checkpoint
+from core.checkpoint import ScrapeCheckpoint, source_key
+from core.downloader import _collect_pages
+from core.scrape_config import ScrapeConfig
+
+CONFIG = ScrapeConfig(
+    url="https://www.pinterest.com/user/board/",
+    num=100,
+    output_dir="out",
+    min_resolution=(0, 0),
+    delay=0.2,
+    download_streams=False,
+)
+
+
+def pin(pin_id: int) -> PinterestMedia:
+    src = f"https://i.pinimg.com/originals/{pin_id}.jpg"
+    return PinterestMedia(pin_id, src, None, None, (1, 1))
+
+
+def test_source_key_ignores_num_but_not_source():
+    assert source_key(replace(CONFIG, num=5000)) == source_key(CONFIG)
+    assert source_key(replace(CONFIG, url=" " + CONFIG.url)) == source_key(CONFIG)
+    assert source_key(replace(CONFIG, min_resolution=(200, 200))) != source_key(CONFIG)
+    assert source_key(replace(CONFIG, mode="search")) != source_key(CONFIG)
+
+
+def test_load_resumes_saved_pages(tmp_path):
+    saved = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    saved.save([pin(1), pin(2)], ["page2"])
+    saved.save([pin(3)], ["page3"])
+
+    loaded = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    assert loaded.load() == 3
+    assert loaded.bookmarks == ["page3"]
+    assert [record["id"] for record in loaded.records] == [1, 2, 3]
+
+    # Pages saved after a resume append to the same records.
+    loaded.save([pin(4)], ["page4"])
+    again = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    assert again.load() == 4
+    assert again.bookmarks == ["page4"]
+
+
+def test_load_drops_records_past_the_state(tmp_path):
+    saved = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    saved.save([pin(1)], ["page2"])
+    # A crash after the records were written but before state.json was replaced.
+    with open(saved.folder / checkpoint._RECORDS, "ab") as f:
+        f.write(b'{"id": 2}\n{"id": 3')
+
+    loaded = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    assert loaded.load() == 1
+    assert (saved.folder / checkpoint._RECORDS).read_bytes().count(b"\n") == 1
+
+
+def test_load_ignores_missing_stale_and_foreign_checkpoints(tmp_path):
+    assert ScrapeCheckpoint.for_config(CONFIG, tmp_path).load() == 0
+
+    saved = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    saved.save([pin(1)], ["page2"])
+    state_path = saved.folder / checkpoint._STATE
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+
+    state_path.write_text(json.dumps({**state, "updated": time.time() - 2 * checkpoint._MAX_AGE}))
+    assert ScrapeCheckpoint.for_config(CONFIG, tmp_path).load() == 0
+
+    state_path.write_text(json.dumps({**state, "version": checkpoint._VERSION + 1}))
+    assert ScrapeCheckpoint.for_config(CONFIG, tmp_path).load() == 0
+
+    other = replace(CONFIG, url="https://www.pinterest.com/user/other/")
+    assert ScrapeCheckpoint.for_config(other, tmp_path).load() == 0
+
+
+def test_clear_removes_the_checkpoint(tmp_path):
+    saved = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    saved.save([pin(1)], ["page2"])
+    saved.clear()
+    assert not saved.folder.exists()
+    assert ScrapeCheckpoint.for_config(CONFIG, tmp_path).load() == 0
+
+
+def pages(*bookmarks: str, first: int = 1):
+    """One two-pin page per bookmark, as core.downloader._pages yields them."""
+    for number, bookmark in enumerate(bookmarks):
+        pin_id = first + 2 * number
+        yield [pin(pin_id), pin(pin_id + 1)], [bookmark]
+
+
+def test_interrupted_scrape_keeps_its_checkpoint(tmp_path):
+    saved = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    # _pages gave up after an API error: its last page did not end the stream.
+    store = _collect_pages(saved, pages("page2", "page3"), num=100, on_progress=None)
+    assert len(store) == 4
+
+    resumed = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    assert resumed.load() == 4
+    assert resumed.bookmarks == ["page3"]
+
+    store = _collect_pages(resumed, pages("page4", "-end-", first=5), 100, None)
+    assert [media.id for media in store] == list(range(1, 9))
+    assert not resumed.folder.exists()
+
+
+def test_scrape_reaching_num_clears_its_checkpoint(tmp_path):
+    saved = ScrapeCheckpoint.for_config(CONFIG, tmp_path)
+    store = _collect_pages(saved, pages("page2", "page3"), num=3, on_progress=None)
+    assert len(store) == 3
+    assert not saved.folder.exists()
@@ -0,0 +1,75 @@
+import pytest
+from pinterest_dl import PinterestMedia
+from pinterest_dl.domain.media import VideoStreamInfo
+
+from core.download_order import ordered
+from core.media_store import MediaStore
+
+
+def pin(
+    pin_id: int,
+    resolution: tuple[int, int] = (100, 100),
+    duration: int | None = None,
+    origin: str | None = None,
+    size: int | None = None,
+) -> PinterestMedia:
+    video = None
+    if duration is not None:
+        video = VideoStreamInfo("https://v.pinimg.com/x.m3u8", resolution, duration)
+    src = f"https://i.pinimg.com/{pin_id}.jpg"
+    media = PinterestMedia(pin_id, src, None, origin, resolution, video)
+    if size is not None:
+        media.size = size
+    return media
+
+
+def ids(media_list, order: str, download_videos: bool = True) -> list[int]:
+    return [media.id for media in ordered(media_list, order, download_videos)]
+
+
+def test_scrape_order_is_unchanged():
+    media = [pin(3), pin(1), pin(2)]
+    assert ids(media, "scrape") == [3, 1, 2]
+
+
+def test_images_first_keeps_scrape_order_within_each_kind():
+    media = [pin(1, duration=5000), pin(2), pin(3, duration=1000), pin(4)]
+    assert ids(media, "images_first") == [2, 4, 1, 3]
+    # Without video downloads every pin saves an image.
+    assert ids(media, "images_first", download_videos=False) == [1, 2, 3, 4]
+
+
+def test_smallest_first():
+    media = [
+        pin(1, resolution=(2000, 2000)),
+        pin(2, duration=60_000),
+        pin(3, resolution=(0, 0)),  # unknown size: last of the images
+        pin(4, resolution=(100, 100)),
+        pin(5, duration=5_000),
+        pin(6, resolution=(4000, 4000), size=10),  # measured by a pre-flight
+    ]
+    assert ids(media, "smallest_first") == [6, 4, 1, 3, 5, 2]
+
+
+def test_round_robin_alternates_sources():
+    a, b = "https://www.pinterest.com/a/board/", "https://www.pinterest.com/b/board/"
+    pin_page = "https://www.pinterest.com/pin/"
+    media = [
+        pin(1, origin=a),
+        pin(2, origin=a),
+        pin(3, origin=a),
+        pin(4, origin=b),
+        pin(5, origin=f"{pin_page}5/"),
+        pin(6, origin=f"{pin_page}6/"),  # pin pages all count as one source
+    ]
+    assert ids(media, "round_robin") == [1, 4, 5, 2, 6, 3]
+
+
+def test_ordered_reads_a_media_store():
+    store = MediaStore([pin(1, duration=1000), pin(2)])
+    assert ids(store, "images_first") == [2, 1]
+
+
+def test_unknown_order():
+    with pytest.raises(ValueError, match="Invalid download order"):
+        list(ordered([pin(1)], "newest_first", True))
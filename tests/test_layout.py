@@ -0,0 +1,80 @@
+import hashlib
+
+import pytest
+from pinterest_dl import PinterestMedia
+
+from core.layout import OutputIndex, expected_names, media_dir, migrate, shard
+
+
+def pin(pin_id: int, src: str = "https://i.pinimg.com/originals/ab/x.PNG") -> PinterestMedia:
+    return PinterestMedia(pin_id, src, None, None, (1, 1))
+
+
+def test_shard():
+    assert shard("123456", "flat") == ""
+    assert shard("123456", "id") == "56"
+    assert shard("7", "id") == "07"
+    assert shard("123456", "hash") == hashlib.md5(b"123456").hexdigest()[:2]
+    with pytest.raises(ValueError, match="Invalid layout"):
+        shard("123456", "date")
+
+
+def test_media_dir(tmp_path):
+    assert media_dir(tmp_path, "123456", "flat") == tmp_path
+    assert media_dir(tmp_path, "123456", "id") == tmp_path / "56"
+
+
+def test_expected_names():
+    assert expected_names(pin(1), download_videos=True) == ("1.png",)
+    assert expected_names(pin(2, "https://i.pinimg.com/originals/ab/x"), False) == ("2.jpg",)
+
+
+def test_output_index_finds_files_in_any_layout(tmp_path):
+    (tmp_path / "56").mkdir()
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "100.jpg").write_bytes(b"")
+    (tmp_path / "56" / "123456.mp4").write_bytes(b"")
+    (tmp_path / "notes" / "200.jpg").write_bytes(b"")  # not a shard folder
+
+    index = OutputIndex.scan(tmp_path)
+    assert len(index) == 2
+    assert index.find(("100.jpg",)) == tmp_path / "100.jpg"
+    assert index.find(("123456.ts", "123456.mp4")) == tmp_path / "56" / "123456.mp4"
+    assert index.find(("200.jpg",)) is None
+
+
+def test_output_index_of_a_missing_folder(tmp_path):
+    assert len(OutputIndex.scan(tmp_path / "missing")) == 0
+
+
+def test_migrate_moves_pin_files_and_skips_conflicts(tmp_path):
+    (tmp_path / "123456.jpg").write_bytes(b"")
+    (tmp_path / "123456.jpg.txt").write_bytes(b"")
+    (tmp_path / "metadata.json").write_bytes(b"")
+    (tmp_path / "56").mkdir()
+    (tmp_path / "56" / "99956.jpg").write_bytes(b"")
+    (tmp_path / "99956.jpg").write_bytes(b"")
+
+    assert migrate(tmp_path, "id", dry_run=True) == {
+        "moved": 2,
+        "in_place": 1,
+        "conflicts": 1,
+        "ignored": 1,
+    }
+    assert (tmp_path / "123456.jpg").exists()
+
+    migrate(tmp_path, "id")
+    assert (tmp_path / "56" / "123456.jpg").exists()
+    assert (tmp_path / "56" / "123456.jpg.txt").exists()
+    assert (tmp_path / "99956.jpg").exists()  # its destination was taken
+
+    (tmp_path / "99956.jpg").unlink()
+    assert migrate(tmp_path, "flat")["moved"] == 3
+    assert not (tmp_path / "56").exists()
+
+
+def test_migrate_rejects_an_unknown_layout(tmp_path):
+    (tmp_path / "123456.jpg").write_bytes(b"")
+    with pytest.raises(ValueError):
+        migrate(tmp_path, "date")
+    assert (tmp_path / "123456.jpg").exists()
@@ -0,0 +1,73 @@
+from core.log_buffer import LogBuffer, levels_from
+
+
+def messages(page: dict) -> list[str]:
+    return [line["message"] for line in page["lines"]]
+
+
+def test_levels_from():
+    assert levels_from(None) == ("info", "warn", "error")
+    assert levels_from("info") == ("info", "warn", "error")
+    assert levels_from("warn") == ("warn", "error")
+    assert levels_from("error") == ("error",)
+    assert levels_from("debug") == ("info", "warn", "error")
+
+
+def test_get_pages_from_an_offset():
+    buffer = LogBuffer(capacity=100, spill_path="")
+    for i in range(10):
+        buffer.append("info", f"line {i}")
+
+    page = buffer.get(offset=3, limit=4)
+    assert page["total"] == 10
+    assert page["start"] == 0
+    assert page["offset"] == 3
+    assert messages(page) == ["line 3", "line 4", "line 5", "line 6"]
+
+    assert messages(buffer.get(offset=-2, limit=2)) == ["line 8", "line 9"]
+    assert messages(buffer.get(offset=-50, limit=1)) == ["line 0"]
+    assert buffer.get(offset=10)["lines"] == []
+
+
+def test_dropped_lines_keep_positions_stable():
+    buffer = LogBuffer(capacity=5, spill_path="")
+    for i in range(8):
+        buffer.append("info", f"line {i}")
+
+    page = buffer.get(offset=0, limit=4)
+    assert page["total"] == 8
+    assert page["start"] == 3
+    assert page["offset"] == 3
+    assert messages(page) == ["line 3"]
+    assert messages(buffer.get(offset=6, limit=10)) == ["line 6", "line 7"]
+
+
+def test_get_filters_by_level_with_its_own_positions():
+    buffer = LogBuffer(capacity=4, spill_path="")
+    for i, level in enumerate(["warn", "info", "error", "info", "info", "warn", "info"]):
+        buffer.append(level, f"{level} {i}")
+
+    page = buffer.get(offset=0, level="warn")
+    # "warn 0" and "error 2" fell off the ring, but still count towards the positions.
+    assert page["total"] == 3
+    assert page["start"] == 2
+    assert page["offset"] == 2
+    assert messages(page) == ["warn 5"]
+    assert buffer.summary() == {"total": 7, "warn": 2, "error": 1}
+
+
+def test_reset_starts_a_new_run_and_spills(tmp_path):
+    spill = tmp_path / "run.log"
+    buffer = LogBuffer(capacity=2, spill_path=str(spill))
+    buffer.reset()
+    for i in range(3):
+        buffer.append("info", f"line {i}")
+    buffer.reset()
+    assert buffer.get()["total"] == 0
+    assert buffer.summary() == {"total": 0, "warn": 0, "error": 0}
+
+    buffer.append("warn", "next run")
+    buffer.flush()
+    text = spill.read_text(encoding="utf-8")
+    assert text.count("--- run started") == 2
+    assert "line 0" in text and "WARN  next run" in text
@@ -0,0 +1,69 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from core import service
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDL_HISTORY", str(tmp_path / "history.jsonl"))
+    server = service.ServiceServer(("127.0.0.1", 0), service.RunService())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method: str, path: str, body: bytes = b"", headers: dict | None = None):
+    port = server.server_address[1]
+    headers = {"Host": f"127.0.0.1:{port}", **(headers or {})}
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def post_run(server, **headers: str):
+    body = json.dumps({"url": ""}).encode("utf-8")  # invalid, so nothing is queued
+    headers = {"Content-Type": "application/json", **headers}
+    return request(server, "POST", "/runs", body, headers)
+
+
+def test_json_post_from_a_local_client_reaches_the_service(server):
+    port = str(server.server_address[1])
+    status, body = post_run(server)
+    assert status == 400
+    assert "Source URL" in body["message"]
+
+    status, _ = post_run(server, Origin="http://localhost:5173", Host="localhost:" + port)
+    assert status == 400
+
+
+@pytest.mark.parametrize("content_type", ["text/plain", "application/x-www-form-urlencoded"])
+def test_post_runs_rejects_non_json_bodies(server, content_type):
+    status, _ = request(server, "POST", "/runs", b"{}", {"Content-Type": content_type})
+    assert status == 415
+
+
+def test_rejects_a_foreign_host(server):
+    # What a DNS-rebound page at attacker.example:<port> sends.
+    port = server.server_address[1]
+    status, _ = post_run(server, Host=f"attacker.example:{port}")
+    assert status == 403
+    status, _ = request(server, "GET", "/runs", headers={"Host": f"attacker.example:{port}"})
+    assert status == 403
+
+
+@pytest.mark.parametrize("origin", ["https://attacker.example", "null"])
+def test_rejects_a_foreign_origin(server, origin):
+    status, _ = post_run(server, Origin=origin)
+    assert status == 403
+    status, _ = request(server, "POST", "/terminate", headers={"Origin": origin})
+    assert status == 403
@@ -0,0 +1,101 @@
+import json
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from pinterest_dl import PinterestMedia
+
+from core.verify import STATE_FILE, Verifier, merge_deltas
+
+PIN = PinterestMedia(1, "https://i.pinimg.com/originals/ab/1.jpg", None, None, (8, 8))
+
+
+def image_bytes(image_format: str) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("name", "image_format"),
+    [("1.jpg", "JPEG"), ("1.png", "PNG"), ("1.gif", "GIF"), ("1.webp", "WEBP")],
+)
+def test_check_passes_intact_and_fails_truncated_images(tmp_path, name, image_format):
+    data = image_bytes(image_format)
+    path = tmp_path / name
+    verifier = Verifier(tmp_path, ffprobe=None, persist=False)
+
+    path.write_bytes(data)
+    assert verifier.check(PIN, path) is None
+
+    path.write_bytes(data[: len(data) - 3])
+    assert verifier.check(PIN, path) is not None
+
+
+def test_check_fails_a_page_saved_as_an_image(tmp_path):
+    path = tmp_path / "1.jpg"
+    path.write_bytes(b"<html>503 Service Unavailable</html>")
+    assert Verifier(tmp_path, None, persist=False).check(PIN, path).startswith("unreadable")
+
+
+def test_videos_go_unchecked_without_ffprobe(tmp_path):
+    path = tmp_path / "1.mp4"
+    path.write_bytes(b"not a video")
+    verifier = Verifier(tmp_path, ffprobe=None)
+    assert verifier.check(PIN, path) is None
+    assert verifier.videos_unchecked == 1
+
+    verifier.passed(path)
+    verifier.save()
+    assert not Verifier(tmp_path, ffprobe=None).is_verified(path)
+
+
+def test_passed_files_are_remembered_until_they_change(tmp_path):
+    path = tmp_path / "1.jpg"
+    path.write_bytes(image_bytes("JPEG"))
+    verifier = Verifier(tmp_path, ffprobe=None)
+    verifier.passed(path)
+    assert verifier.is_verified(path)
+    verifier.save()
+
+    assert Verifier(tmp_path, ffprobe=None).is_verified(path)
+    path.write_bytes(image_bytes("JPEG") + b"\0")
+    assert not Verifier(tmp_path, ffprobe=None).is_verified(path)
+
+
+def test_failed_files_are_deleted_and_forgotten(tmp_path):
+    path = tmp_path / "1.jpg"
+    path.write_bytes(image_bytes("JPEG"))
+    first = Verifier(tmp_path, ffprobe=None)
+    first.passed(path)
+    first.save()
+
+    second = Verifier(tmp_path, ffprobe=None)
+    second.failed(path, final=False)
+    assert not path.exists()
+    assert (second.checked, second.refetched, second.corrupt) == (1, 1, 0)
+    second.save()
+    state = json.loads((tmp_path / STATE_FILE).read_text(encoding="utf-8"))
+    assert "1.jpg" not in state
+
+
+def test_merge_deltas_folds_in_every_shard(tmp_path):
+    kept, dropped = tmp_path / "1.jpg", tmp_path / "2.jpg"
+    for path in (kept, dropped):
+        path.write_bytes(image_bytes("JPEG"))
+    earlier = Verifier(tmp_path, ffprobe=None)
+    earlier.passed(dropped)
+    earlier.save()
+
+    shards = [Verifier(tmp_path, ffprobe=None) for _ in range(2)]
+    shards[0].passed(kept)
+    shards[1].failed(dropped, final=True)
+    deltas = [tmp_path / "delta1.json", tmp_path / "delta2.json", tmp_path / "missing.json"]
+    for shard, delta in zip(shards, deltas):
+        shard.save(delta)
+    # A shard never writes the shared state file itself.
+    assert not Verifier(tmp_path, ffprobe=None).is_verified(kept)
+
+    merge_deltas(tmp_path, deltas)
+    state = json.loads((tmp_path / STATE_FILE).read_text(encoding="utf-8"))
+    assert set(state) == {"1.jpg"}
@@ -0,0 +1,110 @@
+import json
+import threading
+
+import pytest
+from pinterest_dl import PinterestMedia
+
+from core import events, watch
+from core.media_store import MediaStore
+from core.scrape_config import ScrapeConfig
+from core.watch import CursorStore, parse_interval
+
+BOARD = "https://www.pinterest.com/user/board/"
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [
+        (300, 300.0),
+        (90.5, 90.5),
+        ("120", 120.0),
+        ("90s", 90.0),
+        ("30m", 1800.0),
+        ("1.5h", 5400.0),
+        (" 6H ", 21600.0),
+        ("1d", 86400.0),
+    ],
+)
+def test_parse_interval(value, seconds):
+    assert parse_interval(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["", "soon", "5 minutes", "-30m", "1w"])
+def test_parse_interval_rejects_malformed(value):
+    with pytest.raises(ValueError, match="Invalid interval"):
+        parse_interval(value)
+
+
+def test_parse_interval_enforces_the_minimum():
+    with pytest.raises(ValueError, match="at least"):
+        parse_interval("1s")
+
+
+def test_advance_tracks_the_board_top(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    assert cursors.is_new(BOARD)
+
+    assert cursors.advance(BOARD, ["3", "2", "1"]) == []
+    assert not cursors.is_new(BOARD)
+    assert cursors.seen(BOARD) == {"1", "2", "3"}
+
+    cursors.advance(BOARD, ["5", "4"])
+    reloaded = CursorStore(tmp_path / "cursors.json")
+    assert reloaded.seen(BOARD) == {"1", "2", "3", "4", "5"}
+    state = json.loads((tmp_path / "cursors.json").read_text(encoding="utf-8"))
+    assert state[BOARD]["recent"][:2] == ["5", "4"]
+    assert state[BOARD]["synced"] == 5
+
+
+def test_advance_caps_the_cursor_depth(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch, "_CURSOR_DEPTH", 3)
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursors.advance(BOARD, ["2", "1"])
+    cursors.advance(BOARD, ["4", "3"])
+    assert cursors.seen(BOARD) == {"4", "3", "2"}
+
+
+def test_advance_retries_failed_pins_then_gives_up(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    assert cursors.advance(BOARD, ["3", "2", "1"], failed_ids=["2"]) == []
+    assert cursors.failed(BOARD) == {"2"}
+    assert cursors.seen(BOARD) == {"3", "1"}
+
+    for _ in range(watch._RETRIES - 2):
+        assert cursors.advance(BOARD, ["2"], failed_ids=["2"]) == []
+        assert cursors.failed(BOARD) == {"2"}
+    assert cursors.advance(BOARD, ["2"], failed_ids=["2"]) == ["2"]
+    assert cursors.failed(BOARD) == set()
+    assert "2" in cursors.seen(BOARD)
+
+
+def test_advance_clears_a_pin_once_its_retry_succeeds(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursors.advance(BOARD, ["2", "1"], failed_ids=["1"])
+    cursors.advance(BOARD, ["1"])
+    assert cursors.failed(BOARD) == set()
+    assert cursors.seen(BOARD) == {"1", "2"}
+    state = json.loads((tmp_path / "cursors.json").read_text(encoding="utf-8"))
+    assert state[BOARD]["synced"] == 2
+
+
+def test_check_retries_failed_downloads_but_not_filtered_pins(tmp_path, monkeypatch):
+    def pin(pin_id: int) -> PinterestMedia:
+        return PinterestMedia(pin_id, f"https://i.pinimg.com/{pin_id}.jpg", None, None, (1, 1))
+
+    def execute(config, emit, should_cancel, thumbnails, media, on_failed, **kwargs):
+        # Pin 3 downloads, pin 2 fails, and the resolution probe drops pin 1 unattempted.
+        on_failed(media[1])
+        emit(events.done(len(media), 1, 0))
+
+    config = ScrapeConfig(BOARD, 0, str(tmp_path), (0, 0), 0.0, False)
+    cursors = CursorStore(tmp_path / "cursors.json")
+    logs = []
+    watcher = watch.Watcher([], lambda event: logs.append(event.get("message")), cursors)
+    monkeypatch.setattr(watch.runner, "execute", execute)
+    monkeypatch.setattr(watcher, "_new_pins", lambda *args: MediaStore([pin(3), pin(2), pin(1)]))
+
+    watcher.check(watch.Board(BOARD, 300.0, config), threading.Event())
+    assert cursors.failed(BOARD) == {"2"}
+    assert cursors.seen(BOARD) == {"3", "1"}
+    assert "1 failed pins will be retried next check" in logs